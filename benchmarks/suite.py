@@ -0,0 +1,242 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import tempfile
+import time
+from importlib import metadata
+from io import BytesIO
+from itertools import product
+import numpy as np
+from PIL import Image
+from core.generator import QRGenerator, encode_matrix
+from core.logo_handler import LogoAsset, add_logo
+from core.render import RenderJob
+from core.vector import svg_document, write_pdf
+from core.verify import verify_render
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+EC_LEVELS = ('L', 'M', 'Q', 'H')
+SIZES = ('short', 'url', 'text', 'v40')
+STYLES = ('rounded', 'square')
+STAGES = ('encode', 'encode_qrcode', 'draw', 'draw_styled', 'add_logo', 'verify', 'pil_to_qpixmap', 'save_png', 'save_svg', 'save_pdf')
+# Per-code latency goals for the vector exports, by stage or stage/size; any
+# case above its goal fails the run. Version 40 gets its own budget: a PDF of
+# it deflates close to a megabyte of path operators, which alone takes longer
+# than the 10 ms the smaller codes meet.
+TARGETS = {'save_svg': 0.010, 'save_pdf': 0.010, 'save_svg/v40': 0.020, 'save_pdf/v40': 0.050}
+QUICK = {'sizes': ('short', 'v40'), 'levels': ('M', 'H'), 'repeat': 3}
+# Byte-mode capacity of version 40; lowercase text stays in byte mode, so the
+# 'v40' payload always fills the largest symbol for its level.
+V40_BYTES = {'L': 2953, 'M': 2331, 'Q': 1663, 'H': 1273}
+PACKAGES = ('qrcode', 'Pillow', 'numpy', 'PyQt6')
+
+_qt_app = None
+
+
+def payload(size: str, level: str) -> str:
+    if size == 'short':
+        return 'https://exemplo.com'
+    if size == 'url':
+        return 'https://exemplo.com/produtos/categoria/item?id=1234567890&ref=campanha-de-lancamento'
+    if size == 'text':
+        return ('Void QR Code: gerador de QR Codes com logos, cores e payloads Pix. ' * 6)[:400]
+    return ''.join(chr(97 + index * 7 % 26) for index in range(V40_BYTES[level]))
+
+
+def sample_logo(size: int=256) -> Image.Image:
+    (y, x) = np.mgrid[0:size, 0:size]
+    rgba = np.zeros((size, size, 4), dtype=np.uint8)
+    rgba[..., 0] = x * 255 // size
+    rgba[..., 1] = y * 255 // size
+    rgba[..., 2] = 160
+    rgba[..., 3] = np.where((x - size / 2) ** 2 + (y - size / 2) ** 2 <= (size / 2) ** 2, 255, 0)
+    return Image.fromarray(rgba, 'RGBA')
+
+
+def qt_converter():
+    global _qt_app
+    try:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt6.QtWidgets import QApplication
+        from core.qt_image import to_qpixmap
+    except ImportError as e:
+        logger.warning('Skipping pil_to_qpixmap: %s', e)
+        return None
+    _qt_app = QApplication.instance() or QApplication([])
+    return to_qpixmap
+
+
+def measure(fn, repeat: int=5, budget: float=1.0, setup=None) -> float:
+    # setup, when given, runs untimed before every call and its result is
+    # passed to fn (e.g. a fresh copy for a stage that edits its input).
+    arguments = lambda: () if setup is None else (setup(),)
+    fn(*arguments())
+    samples = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < repeat and (len(samples) < 3 or time.perf_counter() < deadline):
+        args = arguments()
+        start_time = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start_time)
+    return statistics.median(samples)
+
+
+def environment() -> dict:
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'system': platform.system(), 'cpus': os.cpu_count(), 'packages': versions, 'created': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def run_suite(sizes=SIZES, levels=EC_LEVELS, styles=STYLES, logos=(False, True), stages=STAGES, repeat: int=5, budget: float=1.0) -> dict:
+    generator = QRGenerator()
+    styled = QRGenerator(renderer='styled')
+    logo = LogoAsset.from_image(sample_logo())
+    convert = qt_converter() if 'pil_to_qpixmap' in stages else None
+    results = {}
+
+    def record(stage, case, fn, setup=None):
+        if stage in stages:
+            results[f'{stage}/{case}'] = measure(fn, repeat, budget, setup)
+            logger.debug('%s/%s: %.2fms', stage, case, results[f'{stage}/{case}'] * 1000)
+    with tempfile.TemporaryDirectory() as directory:
+        pdf_path = os.path.join(directory, 'benchmark.pdf')
+        for (size, level) in product(sizes, levels):
+            data = payload(size, level)
+            matrix = encode_matrix(data, level)
+            record('encode', f'{size}/{level}', lambda: encode_matrix.__wrapped__(data, level, 'optimal'))
+            record('encode_qrcode', f'{size}/{level}', lambda: encode_matrix.__wrapped__(data, level, 'qrcode'))
+            for style in styles:
+                job = RenderJob(data=data, error_correction=level, rounded_modules=style == 'rounded')
+                render = lambda renderer: renderer.render(matrix, job.box_size, job.border, job.fill_color, job.back_color, job.rounded_modules)
+                record('draw', f'{size}/{level}/{style}', lambda: render(generator))
+                record('draw_styled', f'{size}/{level}/{style}', lambda: render(styled))
+                base = render(generator)
+                for with_logo in logos:
+                    case = f'{size}/{level}/{style}/{"logo" if with_logo else "plain"}'
+                    image = base
+                    if with_logo:
+                        overlay = lambda canvas: add_logo(canvas, logo, job.logo_size, job.logo_opacity, position=job.logo_position, border_width=job.logo_border, back_color=job.back_color)
+                        record('add_logo', case, overlay, base.copy)
+                        image = overlay(base.copy())
+                    record('verify', case, lambda: verify_render(image, matrix, job.box_size, job.border, (0, 0, 0), (255, 255, 255)))
+                    if convert is not None:
+                        record('pil_to_qpixmap', case, lambda: convert(image))
+                    record('save_png', case, lambda: image.save(BytesIO(), 'PNG'))
+                    record('save_svg', case, lambda: svg_document(job, matrix, logo if with_logo else None))
+                    record('save_pdf', case, lambda: write_pdf(job, pdf_path, matrix, logo if with_logo else None))
+    return results
+
+
+def compare(baseline: dict, current: dict, threshold: float=1.5, min_delta: float=0.002) -> list:
+    regressions = []
+    for (key, seconds) in current.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if seconds > reference * threshold and seconds - reference > min_delta:
+            regressions.append({'stage': key, 'baseline_ms': reference * 1000, 'current_ms': seconds * 1000, 'ratio': seconds / reference})
+    return sorted(regressions, key=lambda item: -item['ratio'])
+
+
+def target_for(key: str, targets: dict) -> float | None:
+    (stage, size) = (key.split('/') + [''])[:2]
+    return targets.get(f'{stage}/{size}', targets.get(stage))
+
+
+def over_target(results: dict, targets: dict=TARGETS) -> list:
+    missed = []
+    for (key, seconds) in results.items():
+        target = target_for(key, targets)
+        if target is not None and seconds > target:
+            missed.append((key, seconds, target))
+    return sorted(missed, key=lambda item: -item[1] / item[2])
+
+
+def load_baseline(path: str) -> dict | None:
+    try:
+        with open(path, encoding='utf-8') as stream:
+            return json.load(stream)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path: str, results: dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as stream:
+        json.dump({'environment': environment(), 'results': results}, stream, indent=2, sort_keys=True)
+        stream.write('\n')
+
+
+def stage_totals(results: dict) -> dict:
+    totals = {}
+    for (key, seconds) in results.items():
+        stage = key.split('/', 1)[0]
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return totals
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='benchmarks', description='Mede cada etapa do pipeline (codificação, desenho, logo, conversão para Qt, PNG/SVG/PDF) e compara com uma linha de base em JSON.')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Arquivo JSON da linha de base')
+    parser.add_argument('--save', action='store_true', help='Grava o resultado como nova linha de base em vez de comparar')
+    parser.add_argument('-o', '--output', help='Grava também o resultado desta execução neste JSON')
+    parser.add_argument('--quick', action='store_true', help='Conjunto reduzido (payload curto e v40, níveis M e H)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES), help='Etapas a medir')
+    parser.add_argument('--repeat', type=int, default=None, help='Repetições por medição (mediana)')
+    parser.add_argument('--threshold', type=float, default=1.5, help='Razão sobre a linha de base considerada regressão (padrão: 1.5)')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0, help='Diferença absoluta mínima, em ms, para contar como regressão')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Exibe cada medição')
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='[%(asctime)s] [%(levelname)s] - %(message)s', datefmt='%H:%M:%S')
+    logger.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+    options = dict(QUICK) if args.quick else {'repeat': 5}
+    if args.repeat:
+        options['repeat'] = args.repeat
+    start_time = time.time()
+    results = run_suite(stages=args.stages, **options)
+    logger.info('Benchmark: %s measurements in %.1fs', len(results), time.time() - start_time)
+    for (stage, seconds) in stage_totals(results).items():
+        print(f'{stage:<16} {seconds * 1000:10.2f}ms')
+    missed = over_target(results, TARGETS)
+    for (key, seconds, target) in missed:
+        print(f'ACIMA DA META {key}: {seconds * 1000:.2f}ms (meta: {target * 1000:.0f}ms)')
+    if missed:
+        logger.error('%s measurements above their latency target', len(missed))
+    status = 1 if missed else 0
+    if args.output:
+        save_baseline(args.output, results)
+    if args.save:
+        save_baseline(args.baseline, results)
+        logger.info('Baseline saved to: %s', args.baseline)
+        return status
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        logger.warning('No baseline at %s; run with --save to create one', args.baseline)
+        return status
+    for (package, version) in environment()['packages'].items():
+        previous = baseline.get('environment', {}).get('packages', {}).get(package)
+        if previous != version:
+            logger.info('%s: %s -> %s', package, previous, version)
+    regressions = compare(baseline['results'], results, args.threshold, args.min_delta_ms / 1000)
+    for item in regressions:
+        print(f"REGRESSÃO {item['stage']}: {item['baseline_ms']:.2f}ms -> {item['current_ms']:.2f}ms ({item['ratio']:.2f}x)")
+    if regressions:
+        logger.error('%s stages regressed past %.2fx the baseline', len(regressions), args.threshold)
+        return 1
+    logger.info('No regressions against %s', args.baseline)
+    return status
@@ -0,0 +1,291 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from functools import lru_cache
+from typing import Iterable, Iterator
+from core.cache import RenderCache
+from core.ec_policy import DEFAULT_MARGIN, resolve_error_correction
+from core.generator import QRGenerator
+from core.labels import PAGE_SIZES, LabelSheet, SheetLayout
+from core.logger import log_levels, setup_logging, stop_logging
+from core.metrics import metrics
+from core.payloads import PixBuilder, WifiPayload, SocialPayload
+from core.pool import RenderPool
+from core.render import RenderJob, load_logo, render_job, save_render
+from core.verify import verify_job
+
+logger = logging.getLogger(__name__)
+
+TRUE_VALUES = ('1', 'true', 'yes', 'sim', 's', 'y')
+ROW_STYLE_FIELDS = {'ec': 'error_correction', 'fill_color': 'fill_color', 'back_color': 'back_color'}
+
+
+def _require(row: dict, *fields: str) -> list:
+    values = []
+    for field in fields:
+        value = str(row.get(field) or '').strip()
+        if not value:
+            raise ValueError(f"missing required field '{field}'")
+        values.append(value)
+    return values
+
+
+def _as_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in TRUE_VALUES
+
+
+@lru_cache(maxsize=64)
+def pix_builder(key: str, name: str, city: str) -> PixBuilder:
+    return PixBuilder(key, name, city)
+
+
+def build_payload(row: dict) -> str:
+    if '__error__' in row:
+        raise ValueError(row['__error__'])
+    kind = str(row.get('type') or 'text').strip().lower()
+    if kind in ('text', 'url', 'raw'):
+        (data,) = _require(row, 'data')
+        return data
+    if kind == 'wifi':
+        (ssid,) = _require(row, 'ssid')
+        encryption = str(row.get('encryption') or 'WPA').strip()
+        return WifiPayload(ssid, str(row.get('password') or ''), encryption, _as_bool(row.get('hidden'))).to_string()
+    if kind == 'pix':
+        (key, name, city) = _require(row, 'key', 'name', 'city')
+        return pix_builder(key, name, city).build(row.get('amount') or None, row.get('txid') or '***')
+    if kind == 'social':
+        (platform, value) = _require(row, 'platform', 'value')
+        return SocialPayload.for_platform(platform, value)
+    raise ValueError(f"unknown row type '{kind}'")
+
+
+def row_to_job(row: dict, index: int, output_dir: str, defaults: dict) -> RenderJob:
+    options = dict(defaults)
+    for (field, option) in ROW_STYLE_FIELDS.items():
+        value = str(row.get(field) or '').strip()
+        if value:
+            options[option] = value
+    if row.get('logo'):
+        options['logo_path'] = str(row['logo']).strip()
+    filename = str(row.get('filename') or '').strip() or f'{index:06d}.png'
+    output_path = os.path.join(output_dir, filename)
+    return RenderJob(data=build_payload(row), output_path=output_path, **options)
+
+
+def read_rows(path: str, fmt: str=None) -> Iterator[dict]:
+    if fmt is None:
+        fmt = 'jsonl' if path.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+    stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+    try:
+        if fmt == 'csv':
+            yield from csv.DictReader(stream)
+        else:
+            for (line_number, line) in enumerate(stream, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    row = {'__error__': f'invalid JSON on line {line_number}: {e}'}
+                if not isinstance(row, dict):
+                    row = {'__error__': f'line {line_number} is not a JSON object'}
+                yield row
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def iter_jobs(rows: Iterable[dict], output_dir: str, defaults: dict) -> Iterator[tuple]:
+    for (index, row) in enumerate(rows, start=1):
+        try:
+            yield (index, row_to_job(row, index, output_dir, defaults), None)
+        except ValueError as e:
+            yield (index, None, str(e))
+
+
+def run_batch(rows: Iterable[dict], output_dir: str, defaults: dict, logo=None, workers: int=1, cache: RenderCache=None, ec_margin: float=DEFAULT_MARGIN, verify: bool=True) -> tuple:
+    (done, failed, cached) = (0, 0, 0)
+    (auto, saved, unreadable) = (0, 0, 0)
+
+    def check(job, scan):
+        nonlocal unreadable
+        if scan is not None and not scan.readable:
+            logger.warning('%s may not scan: %s', job.output_path, '; '.join(scan.issues))
+            metrics.increment('unreadable')
+            unreadable += 1
+
+    def valid_jobs():
+        nonlocal failed, auto, saved
+        for (index, job, error) in iter_jobs(rows, output_dir, defaults):
+            if not error:
+                try:
+                    (job, choice) = resolve_error_correction(job, logo, ec_margin)
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+            if error:
+                logger.error('Row %s: %s', index, error)
+                failed += 1
+                continue
+            if choice is not None:
+                auto += 1
+                saved += choice.saved_modules
+                metrics.increment(f'ec_{choice.level}')
+            yield job
+    if workers > 1:
+        cache_bytes = cache.max_bytes if cache is not None else 0
+        cache_dir = cache.disk_dir if cache is not None else None
+        with RenderPool(workers=workers, logo=logo, cache_bytes=cache_bytes, cache_dir=cache_dir) as pool:
+            for result in pool.imap(valid_jobs(), ordered=False, save=True, verify=verify):
+                if result.ok:
+                    done += 1
+                    check(result.job, result.scan)
+                    cached += result.cached
+                    # Stage spans stay in the worker processes; the parent
+                    # records each job's end-to-end time instead.
+                    metrics.observe('job', result.elapsed)
+                    metrics.increment('cache_hit' if result.cached else 'cache_miss')
+                else:
+                    logger.error('%s: %s', result.job.output_path, result.error)
+                    failed += 1
+        if cache is not None:
+            logger.info('Render cache: %s hits out of %s codes', cached, done)
+        _log_report(auto, saved, unreadable)
+        return (done, failed)
+    generator = QRGenerator()
+    for job in valid_jobs():
+        try:
+            with metrics.span('job'):
+                img = render_job(job, generator, logo, cache)
+                scan = verify_job(job, img, generator) if verify else None
+                save_render(job, img)
+            done += 1
+            check(job, scan)
+        except Exception as e:
+            logger.error('%s: %s', job.output_path, e)
+            failed += 1
+    if cache is not None:
+        logger.info('Render cache: %s', cache.stats())
+    _log_report(auto, saved, unreadable)
+    return (done, failed)
+
+
+def _log_report(auto: int, saved: int, unreadable: int):
+    if auto:
+        logger.info('Automatic error correction: %s codes, %s modules fewer than level H', auto, saved)
+    if unreadable:
+        logger.warning('Scan check: %s codes may not scan', unreadable)
+
+
+def run_sheet(rows: Iterable[dict], path: str, defaults: dict, layout: SheetLayout, logo=None, caption_field: str='caption', ec_margin: float=DEFAULT_MARGIN) -> tuple:
+    (done, failed) = (0, 0)
+    with LabelSheet(path, layout, logo) as sheet:
+        for (index, row) in enumerate(rows, start=1):
+            try:
+                (job, _) = resolve_error_correction(row_to_job(row, index, '', defaults), logo, ec_margin)
+                sheet.add(job, str(row.get(caption_field) or '').strip() or None)
+                done += 1
+            except Exception as e:
+                logger.error('Row %s: %s', index, e)
+                failed += 1
+    return (done, failed)
+
+
+def _grid(value: str) -> tuple:
+    try:
+        (rows, cols) = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"grade inválida '{value}' (use LINHASxCOLUNAS, ex.: 5x4)")
+    if rows < 1 or cols < 1:
+        raise argparse.ArgumentTypeError(f"grade inválida '{value}'")
+    return (rows, cols)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='batch', description='Gera QR Codes em lote a partir de CSV/JSONL, sem interface gráfica.')
+    parser.add_argument('input', help="Arquivo CSV ou JSONL ('-' para stdin)")
+    parser.add_argument('-o', '--output-dir', default='qrcodes', help='Diretório de saída')
+    parser.add_argument('--format', choices=('csv', 'jsonl'), help='Formato da entrada (padrão: pela extensão)')
+    parser.add_argument('--ec', type=str.upper, choices=('L', 'M', 'Q', 'H', 'AUTO'), default='H', help="Nível de correção de erro ('auto' escolhe o menor que a área da logo permite)")
+    parser.add_argument('--ec-margin', type=float, default=DEFAULT_MARGIN, help='Fração da capacidade de correção de cada bloco reservada além da logo, com --ec auto (padrão: 0.3)')
+    parser.add_argument('--box-size', type=int, default=10, help='Tamanho de cada módulo em pixels')
+    parser.add_argument('--border', type=int, default=4, help='Borda em módulos')
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--size-px', type=int, help='Lado exato da imagem em pixels (escolhe a caixa e a borda inteiras que cabem, sem reamostrar)')
+    size.add_argument('--size-mm', type=float, help='Lado físico da imagem em mm, convertido em pixels pelo --dpi')
+    parser.add_argument('--dpi', type=int, help='Resolução gravada no PNG/PDF (padrão com --size-mm: 300)')
+    parser.add_argument('--palette', action='store_true', help='PNG com paleta: sem logo, 2 cores (1 bit) com --square ou box-size + 1 tons de borda suavizada com módulos arredondados; paleta adaptativa com logo')
+    parser.add_argument('--logo-colors', type=int, default=64, choices=range(2, 257), metavar='2-256', help='Cores da paleta adaptativa quando há logo (padrão: 64)')
+    parser.add_argument('--compress-level', type=int, choices=range(10), metavar='0-9', help='Nível de compressão zlib do PNG (padrão do Pillow: 6)')
+    parser.add_argument('--optimize', action='store_true', help='Passada extra do otimizador de PNG (arquivos menores, gravação mais lenta)')
+    parser.add_argument('--no-verify', dest='verify', action='store_false', help='Não confere a leitura de cada código (contraste, padrões de posição e codewords sob a logo)')
+    parser.add_argument('--fill-color', default='black', help='Cor dos módulos')
+    parser.add_argument('--back-color', default='white', help='Cor do fundo')
+    parser.add_argument('--square', action='store_true', help='Módulos quadrados em vez de arredondados')
+    parser.add_argument('--logo', help='Logo aplicada a todos os códigos')
+    parser.add_argument('--logo-size', type=int, default=15, help='Tamanho da logo (%% do QR Code)')
+    parser.add_argument('--logo-opacity', type=int, default=100, help='Opacidade da logo (0-100)')
+    parser.add_argument('--logo-pos', default='center', help='Posição da logo')
+    parser.add_argument('--logo-pad', type=int, default=0, help='Módulos livres a mais em volta da logo (padrão: 0)')
+    parser.add_argument('--no-knockout', dest='knockout', action='store_false', help='Desenha os módulos sob a logo em vez de deixá-los em branco')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1, help='Processos de renderização em paralelo (padrão: núcleos da CPU)')
+    parser.add_argument('--cache-dir', help='Diretório do cache de renderização em disco (reaproveitado entre execuções)')
+    parser.add_argument('--cache-mb', type=int, default=64, help='Memória do cache de renderização por processo, em MB (0 desativa)')
+    parser.add_argument('--sheet', metavar='PDF', help='Gera uma folha de etiquetas em PDF (várias páginas) em vez de imagens soltas')
+    parser.add_argument('--page', choices=tuple(PAGE_SIZES), default='A4', help='Tamanho da página da folha de etiquetas')
+    parser.add_argument('--grid', type=_grid, default=(5, 4), help='Etiquetas por página, LINHASxCOLUNAS (padrão: 5x4)')
+    parser.add_argument('--margin-mm', type=float, default=10.0, help='Margem da página em mm')
+    parser.add_argument('--caption-field', default='caption', help='Coluna usada como legenda de cada etiqueta')
+    parser.add_argument('--metrics', metavar='ARQUIVO', help='Grava latências por etapa e contadores ao final (.prom para Prometheus, senão JSON)')
+    parser.add_argument('--log-level', type=log_levels, metavar='MÓDULO=NÍVEL', help='Níveis de log por módulo, separados por vírgula (ex.: core.pool=DEBUG,core.cache=INFO)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Exibe logs detalhados')
+    return parser
+
+
+def job_defaults(args: argparse.Namespace) -> dict:
+    return {'error_correction': args.ec, 'box_size': args.box_size, 'border': args.border, 'fill_color': args.fill_color, 'back_color': args.back_color, 'rounded_modules': not args.square, 'logo_size': args.logo_size, 'logo_opacity': args.logo_opacity, 'logo_position': args.logo_pos, 'logo_knockout': args.knockout, 'logo_pad': args.logo_pad, 'size_px': args.size_px, 'size_mm': args.size_mm, 'dpi': args.dpi, 'palette': args.palette, 'logo_colors': args.logo_colors, 'png_compress_level': args.compress_level, 'png_optimize': args.optimize}
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    setup_logging('batch', verbose=args.verbose, levels=args.log_level)
+    try:
+        return _run(args)
+    finally:
+        stop_logging()
+
+
+def _run(args: argparse.Namespace) -> int:
+    logo = None
+    if args.logo:
+        logo = load_logo(args.logo)
+        if logo is None:
+            return 2
+    if args.metrics:
+        metrics.enabled = True
+    cache = None
+    if args.cache_mb > 0 or args.cache_dir:
+        cache = RenderCache(max_bytes=args.cache_mb * 1024 * 1024, disk_dir=args.cache_dir)
+    start_time = time.time()
+    if args.sheet:
+        layout = SheetLayout(page=args.page, rows=args.grid[0], cols=args.grid[1], margin_mm=args.margin_mm)
+        (done, failed) = run_sheet(read_rows(args.input, args.format), args.sheet, job_defaults(args), layout, logo, args.caption_field, args.ec_margin)
+    else:
+        (done, failed) = run_batch(read_rows(args.input, args.format), args.output_dir, job_defaults(args), logo, workers=max(1, args.workers), cache=cache, ec_margin=args.ec_margin, verify=args.verify)
+    elapsed = time.time() - start_time
+    rate = done / elapsed if elapsed > 0 else 0.0
+    logger.info('Batch finished: %s generated, %s failed in %.2fs (%.1f codes/s)', done, failed, elapsed, rate)
+    if args.metrics:
+        metrics.write(args.metrics)
+        logger.info('Metrics saved to: %s', args.metrics)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 2
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+_logo_digests = {}
+
+
+def logo_digest(logo: Image.Image) -> str:
+    entry = _logo_digests.get(id(logo))
+    if entry is not None and entry[0]() is logo:
+        return entry[1]
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{logo.mode}:{logo.size}'.encode())
+    digest.update(logo.tobytes())
+    value = digest.hexdigest()
+    key = id(logo)
+    _logo_digests[key] = (weakref.ref(logo, lambda _ref: _logo_digests.pop(key, None)), value)
+    return value
+
+
+def render_key(params: dict, logo_digest: str=None) -> str:
+    params = dict(params)
+    if logo_digest is None:
+        params = {name: value for (name, value) in params.items() if not name.startswith('logo_')}
+    else:
+        params['logo_digest'] = logo_digest
+    params['cache_version'] = CACHE_VERSION
+    payload = json.dumps(params, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+
+def image_nbytes(img: Image.Image) -> int:
+    return img.width * img.height * len(img.getbands())
+
+
+class RenderCache:
+
+    def __init__(self, max_bytes: int=DEFAULT_MAX_BYTES, disk_dir: str=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.current_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key: str) -> Image.Image | None:
+        with self._lock:
+            img = self._entries.get(key)
+            if img is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return img
+        img = self._load_from_disk(key)
+        with self._lock:
+            if img is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, img)
+        return img
+
+    def put(self, key: str, img: Image.Image, persist: bool=True):
+        with self._lock:
+            self._store(key, img)
+        if persist and self.disk_dir:
+            self._save_to_disk(key, img)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {'entries': len(self._entries), 'bytes': self.current_bytes, 'max_bytes': self.max_bytes, 'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses, 'evictions': self.evictions, 'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0}
+
+    def _store(self, key: str, img: Image.Image):
+        size = image_nbytes(img)
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.current_bytes -= image_nbytes(previous)
+        self._entries[key] = img
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            (_, evicted) = self._entries.popitem(last=False)
+            self.current_bytes -= image_nbytes(evicted)
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f'{key}.png')
+
+    def _load_from_disk(self, key: str) -> Image.Image | None:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with Image.open(path) as img:
+                img.load()
+                return img.copy()
+        except Exception as e:
+            logger.warning('Discarding unreadable cache entry %s: %s', path, e)
+            return None
+
+    def _save_to_disk(self, key: str, img: Image.Image):
+        path = self._disk_path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            img.save(tmp_path, 'PNG', compress_level=1)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning('Could not write cache entry %s: %s', path, e)
+
+
+render_cache = RenderCache()
@@ -0,0 +1,100 @@
+import logging
+from dataclasses import dataclass, replace
+import numpy as np
+from core.encoder import EC_LEVELS, block_layout, codeword_blocks, data_positions, plan_segments
+from core.layout import knocks_out, logo_area
+
+logger = logging.getLogger(__name__)
+
+AUTO = 'AUTO'
+LEVEL_ORDER = ('L', 'M', 'Q', 'H')
+# Share of each block's error budget left unused by the logo, for print
+# blur, glare and partial occlusion on top of the covered modules.
+DEFAULT_MARGIN = 0.3
+# Small symbols spend some EC codewords on misdecode protection (ISO/IEC
+# 18004, table 9); those cannot correct errors.
+MISDECODE_RESERVE = {(1, 'L'): 3, (1, 'M'): 2, (1, 'Q'): 1, (1, 'H'): 1, (2, 'L'): 2, (3, 'L'): 1}
+
+
+@dataclass(frozen=True)
+class EcChoice:
+    level: str
+    version: int
+    baseline_version: int
+    damaged: int = 0
+    safe: bool = True
+
+    @property
+    def modules(self) -> int:
+        return (self.version * 4 + 17) ** 2
+
+    @property
+    def saved_modules(self) -> int:
+        return (self.baseline_version * 4 + 17) ** 2 - self.modules
+
+
+def covers_finder(count: int, area: tuple) -> bool:
+    (top, left, bottom, right) = area
+    # Finder, separator and format information around each of the three corners.
+    corners = ((0, 0, 9, 9), (0, count - 8, 9, count), (count - 8, 0, count, 9))
+    return any(top < low and bottom > high and left < end and right > start for (high, start, low, end) in corners)
+
+
+def block_errors(version: int, level: str, bits: np.ndarray) -> np.ndarray:
+    code = EC_LEVELS[level]
+    blocks = codeword_blocks(version, code)
+    # bits: indices into the placement order of data_positions.
+    hit = bits // 8
+    hit = np.unique(hit[hit < len(blocks)])
+    return np.bincount(blocks[hit], minlength=block_layout(version, code)[0].shape[0])
+
+
+def damaged_codewords(version: int, level: str, area: tuple) -> np.ndarray:
+    (rows, cols) = data_positions(version)
+    (top, left, bottom, right) = area
+    inside = (rows >= top) & (rows < bottom) & (cols >= left) & (cols < right)
+    return block_errors(version, level, np.flatnonzero(inside))
+
+
+def correctable(version: int, level: str, margin: float=DEFAULT_MARGIN) -> int:
+    ec_count = block_layout(version, EC_LEVELS[level])[2]
+    budget = (ec_count - MISDECODE_RESERVE.get((version, level), 0)) // 2
+    return int(budget * (1 - margin))
+
+
+def choose_error_correction(data: str, logo_size: int=0, position: str='center', box_size: int=10, border: int=4, logo_border: int=40, size_px: int=None, margin: float=DEFAULT_MARGIN, pad: int=0) -> EcChoice:
+    # Only the version matters here: codeword placement, and so what the logo
+    # hides, depends on version and level but not on the data itself.
+    versions = {level: plan_segments(data, EC_LEVELS[level])[0] for level in LEVEL_ORDER}
+    baseline = versions['H']
+    if not logo_size:
+        return EcChoice('L', versions['L'], baseline)
+    worst = 0
+    for level in LEVEL_ORDER:
+        version = versions[level]
+        count = version * 4 + 17
+        area = logo_area(count, logo_size, position, box_size, border, logo_border, size_px, pad)
+        if area is None:
+            return EcChoice(level, version, baseline)
+        # A larger version shrinks the modules under the same logo, so a
+        # covered finder at one level can clear at the next.
+        if covers_finder(count, area):
+            worst = None
+            continue
+        worst = int(damaged_codewords(version, level, area).max())
+        if worst <= correctable(version, level, margin):
+            return EcChoice(level, version, baseline, worst)
+    if worst is None:
+        logger.warning('Logo at %s covers a finder pattern even at level H', position)
+        return EcChoice('H', baseline, baseline, safe=False)
+    logger.warning('Logo hides %s codewords per block, past the %.0f%% margin even at level H', worst, margin * 100)
+    return EcChoice('H', baseline, baseline, worst, safe=False)
+
+
+def resolve_error_correction(job, logo=None, margin: float=DEFAULT_MARGIN) -> tuple:
+    if str(job.error_correction).upper() != AUTO:
+        return (job, None)
+    has_logo = logo is not None or bool(job.logo_path)
+    choice = choose_error_correction(job.data, job.logo_size if has_logo else 0, job.logo_position, job.box_size, job.border, job.logo_border, job.target_px, margin, job.logo_pad if knocks_out(job) else 0)
+    logger.debug('Auto error correction: %s at version %s (H needs version %s, %s modules saved)', choice.level, choice.version, choice.baseline_version, choice.saved_modules)
+    return (replace(job, error_correction=choice.level), choice)
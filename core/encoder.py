@@ -0,0 +1,384 @@
+import re
+from functools import lru_cache
+from bisect import bisect_left
+import numpy as np
+from qrcode import base, util
+from qrcode.exceptions import DataOverflowError
+
+# Drop-in replacement for qrcode's QRCode.make(fit=True): same segmentation,
+# version fit, Reed-Solomon bytes and mask choice (including its first-lowest
+# tie break), so the resulting matrices are bit-identical. The heavy parts run
+# on lookup tables and NumPy arrays instead of per-module Python loops.
+EC_LEVELS = {'L': 1, 'M': 0, 'Q': 3, 'H': 2}
+OPTIMIZE_MINIMUM = 20
+# plan_segments is asked once per level by the EC policy and again by the
+# encoder, so each payload has a few entries.
+PLAN_CACHE_SIZE = 1024
+PAD_BYTES = (0xEC, 0x11)
+# Version ranges sharing the same character-count field widths.
+VERSION_CLASSES = ((1, 9), (10, 26), (27, 40))
+SEGMENT_MODES = (util.MODE_8BIT_BYTE, util.MODE_ALPHA_NUM, util.MODE_NUMBER)
+# Per-character cost of each mode in sixths of a bit (8, 5.5 and 3.33 bits).
+CHAR_COSTS = (48, 33, 20)
+NUMERIC_CHARS = b'0123456789'
+NUMERIC_BYTES = frozenset(NUMERIC_CHARS)
+BYTE_RUNS = re.compile(b'([^' + re.escape(util.ALPHA_NUM) + b']+)|.', re.DOTALL)
+BYTE_ONLY = (0, 0, 0)
+ALPHA_VALUES = {char: index for (index, char) in enumerate(util.ALPHA_NUM)}
+FINDER_PATTERNS = (np.array([1, 0, 1, 1, 1, 0, 1, 0, 0, 0, 0], dtype=bool), np.array([0, 0, 0, 0, 1, 0, 1, 1, 1, 0, 1], dtype=bool))
+
+GF_EXP = np.zeros(512, dtype=np.int32)
+GF_LOG = np.zeros(256, dtype=np.int32)
+_value = 1
+for _power in range(255):
+    GF_EXP[_power] = _value
+    GF_LOG[_value] = _power
+    _value <<= 1
+    if _value & 0x100:
+        _value ^= 0x11D
+GF_EXP[255:510] = GF_EXP[:255]
+GF_MUL = np.zeros((256, 256), dtype=np.uint8)
+GF_MUL[1:, 1:] = GF_EXP[GF_LOG[1:, None] + GF_LOG[None, 1:]]
+
+CAPACITY_BITS = {level: [0] + [8 * sum(block.data_count for block in base.rs_blocks(version, level)) for version in range(1, 41)] for level in EC_LEVELS.values()}
+
+
+@lru_cache(maxsize=None)
+def rs_generator(ec_count: int) -> np.ndarray:
+    poly = [1]
+    for power in range(ec_count):
+        factor = int(GF_EXP[power])
+        product = poly + [0]
+        for (index, coefficient) in enumerate(poly):
+            product[index + 1] ^= int(GF_MUL[coefficient, factor])
+        poly = product
+    return np.array(poly[1:], dtype=np.uint8)
+
+
+def rs_remainders(blocks: np.ndarray, ec_count: int) -> np.ndarray:
+    generator = rs_generator(ec_count)
+    remainder = np.zeros((blocks.shape[0], ec_count), dtype=np.uint8)
+    for column in blocks.T:
+        factor = column ^ remainder[:, 0]
+        remainder[:, :-1] = remainder[:, 1:]
+        remainder[:, -1] = 0
+        remainder ^= GF_MUL[factor[:, None], generator[None, :]]
+    return remainder
+
+
+@lru_cache(maxsize=None)
+def block_layout(version: int, level: int) -> tuple:
+    blocks = base.rs_blocks(version, level)
+    data_counts = [block.data_count for block in blocks]
+    ec_count = blocks[0].total_count - blocks[0].data_count
+    longest = max(data_counts)
+    # RS runs on blocks left-padded to the same length (leading zeros don't
+    # change the remainder); interleaving reads them left-aligned.
+    source = np.full((len(blocks), longest), -1, dtype=np.int64)
+    aligned = np.full((len(blocks), longest), -1, dtype=np.int64)
+    offset = 0
+    for (index, count) in enumerate(data_counts):
+        source[index, longest - count:] = np.arange(offset, offset + count)
+        aligned[index, :count] = np.arange(offset, offset + count)
+        offset += count
+    order = aligned.T[aligned.T >= 0]
+    return (source, order, ec_count)
+
+
+@lru_cache(maxsize=None)
+def codeword_blocks(version: int, level: int) -> np.ndarray:
+    (source, order, ec_count) = block_layout(version, level)
+    count = source.shape[0]
+    # Data indices run block by block; the EC part interleaves one byte per block.
+    owners = np.repeat(np.arange(count), (source >= 0).sum(axis=1))
+    blocks = np.concatenate([owners[order], np.tile(np.arange(count), ec_count)])
+    blocks.flags.writeable = False
+    return blocks
+
+
+def segment_bits(segment, size_class: dict) -> int:
+    length = len(segment.data)
+    if segment.mode == util.MODE_NUMBER:
+        payload = 10 * (length // 3) + (0, 4, 7)[length % 3]
+    elif segment.mode == util.MODE_ALPHA_NUM:
+        payload = 11 * (length // 2) + 6 * (length % 2)
+    else:
+        payload = 8 * length
+    return 4 + size_class[segment.mode] + payload
+
+
+def fit_version(segments: list, level: int) -> int:
+    start = 1
+    while True:
+        size_class = util.mode_sizes_for_version(start)
+        needed = sum(segment_bits(segment, size_class) for segment in segments)
+        version = bisect_left(CAPACITY_BITS[level], needed, start)
+        if version == 41:
+            raise DataOverflowError()
+        if util.mode_sizes_for_version(version) is size_class:
+            return version
+        start = version
+
+
+def optimal_segments(data: bytes, size_class: dict) -> list:
+    head = [(4 + size_class[mode]) * 6 for mode in SEGMENT_MODES]
+    costs = list(head)
+    # modes[i][m]: mode of byte i on the cheapest path that ends in mode m.
+    modes = []
+    for run in BYTE_RUNS.finditer(data):
+        if run.lastindex == 1:
+            # Bytes outside the alphanumeric set only fit byte mode, so the
+            # whole run extends the byte path in one step.
+            length = run.end() - run.start()
+            byte_cost = costs[0] + CHAR_COSTS[0] * length
+            costs = [byte_cost, (byte_cost + 5) // 6 * 6 + head[1], (byte_cost + 5) // 6 * 6 + head[2]]
+            modes.extend([BYTE_ONLY] * length)
+            continue
+        byte = data[run.start()]
+        allowed = (True, True, byte in NUMERIC_BYTES)
+        current = [costs[m] + CHAR_COSTS[m] if allowed[m] else None for m in range(3)]
+        chosen = [m if allowed[m] else None for m in range(3)]
+        for target in range(3):
+            for source in range(3):
+                if chosen[source] is None:
+                    continue
+                switched = (current[source] + 5) // 6 * 6 + head[target]
+                if chosen[target] is None or switched < current[target]:
+                    current[target] = switched
+                    chosen[target] = chosen[source]
+        modes.append(chosen)
+        costs = current
+    mode = costs.index(min(costs))
+    path = [0] * len(data)
+    for index in range(len(data) - 1, -1, -1):
+        mode = modes[index][mode]
+        path[index] = mode
+    segments = []
+    start = 0
+    for index in range(1, len(data) + 1):
+        if index == len(data) or path[index] != path[start]:
+            segments.append(util.QRData(data[start:index], mode=SEGMENT_MODES[path[start]], check_data=False))
+            start = index
+    return segments
+
+
+def minimum_bits(data: bytes) -> int:
+    digits = len(data) - len(data.translate(None, NUMERIC_CHARS))
+    alphanumeric = len(data) - len(data.translate(None, util.ALPHA_NUM)) - digits
+    return (CHAR_COSTS[2] * digits + CHAR_COSTS[1] * alphanumeric + CHAR_COSTS[0] * (len(data) - digits - alphanumeric)) // 6
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def class_segments(data: bytes, low: int) -> tuple:
+    # The segmentation only depends on the field widths of the version class,
+    # so every level whose fit falls in the same class shares it.
+    size_class = util.mode_sizes_for_version(low)
+    segments = tuple(optimal_segments(data, size_class))
+    return (segments, sum(segment_bits(segment, size_class) for segment in segments))
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def plan_segments(data, level: int) -> tuple:
+    data = util.to_bytestring(data)
+    floor = minimum_bits(data)
+    for (low, high) in VERSION_CLASSES:
+        if floor > CAPACITY_BITS[level][high]:
+            continue
+        (segments, needed) = class_segments(data, low)
+        version = bisect_left(CAPACITY_BITS[level], needed, low)
+        if version <= high:
+            return (version, segments)
+    raise DataOverflowError()
+
+
+def data_codewords(segments: list, version: int, level: int) -> bytes:
+    size_class = util.mode_sizes_for_version(version)
+    (value, length) = (0, 0)
+
+    def put(number, bits):
+        nonlocal value, length
+        value = value << bits | number
+        length += bits
+    for segment in segments:
+        data = segment.data
+        put(segment.mode, 4)
+        put(len(data), size_class[segment.mode])
+        if segment.mode == util.MODE_NUMBER:
+            for index in range(0, len(data), 3):
+                chunk = data[index:index + 3]
+                put(int(chunk), util.NUMBER_LENGTH[len(chunk)])
+        elif segment.mode == util.MODE_ALPHA_NUM:
+            for index in range(0, len(data) - 1, 2):
+                put(ALPHA_VALUES[data[index]] * 45 + ALPHA_VALUES[data[index + 1]], 11)
+            if len(data) % 2:
+                put(ALPHA_VALUES[data[-1]], 6)
+        else:
+            put(int.from_bytes(data, 'big'), 8 * len(data))
+    limit = CAPACITY_BITS[level][version]
+    if length > limit:
+        raise DataOverflowError(f'Code length overflow. Data size ({length}) > size available ({limit})')
+    put(0, min(limit - length, 4))
+    if length % 8:
+        put(0, 8 - length % 8)
+    stream = value.to_bytes(length // 8, 'big') if length else b''
+    fill = (limit - length) // 8
+    return stream + bytes(PAD_BYTES[index % 2] for index in range(fill))
+
+
+def codewords(segments: list, version: int, level: int) -> np.ndarray:
+    (source, order, ec_count) = block_layout(version, level)
+    data = np.frombuffer(data_codewords(segments, version, level), dtype=np.uint8)
+    grid = np.where(source >= 0, data[np.maximum(source, 0)], 0).astype(np.uint8)
+    remainders = rs_remainders(grid, ec_count)
+    return np.concatenate([data[order], remainders.T.reshape(-1)])
+
+
+@lru_cache(maxsize=None)
+def function_patterns(version: int) -> tuple:
+    count = version * 4 + 17
+    modules = np.zeros((count, count), dtype=bool)
+    reserved = np.zeros((count, count), dtype=bool)
+    finder = np.zeros((7, 7), dtype=bool)
+    finder[[0, 6], :] = True
+    finder[:, [0, 6]] = True
+    finder[2:5, 2:5] = True
+    for (row, col) in ((0, 0), (count - 7, 0), (0, count - 7)):
+        modules[row:row + 7, col:col + 7] = finder
+        reserved[max(row - 1, 0):row + 8, max(col - 1, 0):col + 8] = True
+    adjust = np.ones((5, 5), dtype=bool)
+    adjust[1:4, 1:4] = False
+    adjust[2, 2] = True
+    positions = util.pattern_position(version)
+    for row in positions:
+        for col in positions:
+            if reserved[row, col]:
+                continue
+            modules[row - 2:row + 3, col - 2:col + 3] = adjust
+            reserved[row - 2:row + 3, col - 2:col + 3] = True
+    timing = np.arange(8, count - 8)
+    free = ~reserved[timing, 6]
+    modules[timing[free], 6] = timing[free] % 2 == 0
+    reserved[timing, 6] = True
+    free = ~reserved[6, timing]
+    modules[6, timing[free]] = timing[free] % 2 == 0
+    reserved[6, timing] = True
+    for (row, col) in format_positions(count):
+        reserved[row, col] = True
+    reserved[count - 8, 8] = True
+    if version >= 7:
+        for (row, col) in version_positions(count):
+            reserved[row, col] = True
+    modules.flags.writeable = False
+    reserved.flags.writeable = False
+    return (modules, reserved)
+
+
+def format_positions(count: int) -> list:
+    positions = []
+    for i in range(15):
+        row = i if i < 6 else i + 1 if i < 8 else count - 15 + i
+        positions.append((row, 8))
+    for i in range(15):
+        col = count - i - 1 if i < 8 else 15 - i if i < 9 else 15 - i - 1
+        positions.append((8, col))
+    return positions
+
+
+def version_positions(count: int) -> list:
+    positions = [(i // 3, i % 3 + count - 11) for i in range(18)]
+    return positions + [(i % 3 + count - 11, i // 3) for i in range(18)]
+
+
+@lru_cache(maxsize=None)
+def data_positions(version: int) -> tuple:
+    (_, reserved) = function_patterns(version)
+    count = reserved.shape[0]
+    rows = []
+    cols = []
+    upward = True
+    for right in range(count - 1, 0, -2):
+        if right <= 6:
+            right -= 1
+        span = range(count - 1, -1, -1) if upward else range(count)
+        for row in span:
+            for col in (right, right - 1):
+                if not reserved[row, col]:
+                    rows.append(row)
+                    cols.append(col)
+        upward = not upward
+    return (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp))
+
+
+@lru_cache(maxsize=None)
+def mask_stack(version: int) -> np.ndarray:
+    count = version * 4 + 17
+    (i, j) = np.indices((count, count))
+    masks = np.stack([(i + j) % 2 == 0, i % 2 == 0, j % 3 == 0, (i + j) % 3 == 0, (i // 2 + j // 3) % 2 == 0, i * j % 2 + i * j % 3 == 0, (i * j % 2 + i * j % 3) % 2 == 0, (i * j % 3 + (i + j) % 2) % 2 == 0])
+    masks &= ~function_patterns(version)[1]
+    masks.flags.writeable = False
+    return masks
+
+
+def _run_penalty(candidates: np.ndarray) -> np.ndarray:
+    same = candidates[..., 1:] == candidates[..., :-1]
+    windows = same[..., :-3] & same[..., 1:-2] & same[..., 2:-1] & same[..., 3:]
+    starts = windows.copy()
+    starts[..., 1:] &= ~same[..., :-4]
+    # A run of length L >= 5 holds L - 4 five-module windows and costs L - 2.
+    return windows.sum(axis=(1, 2)) + 2 * starts.sum(axis=(1, 2))
+
+
+def _finder_penalty(candidates: np.ndarray) -> np.ndarray:
+    width = candidates.shape[-1] - 10
+    total = np.zeros(candidates.shape[0], dtype=np.int64)
+    for pattern in FINDER_PATTERNS:
+        found = np.ones(candidates.shape[:-1] + (width,), dtype=bool)
+        for (offset, dark) in enumerate(pattern):
+            window = candidates[..., offset:offset + width]
+            found &= window if dark else ~window
+        total += found.sum(axis=(1, 2))
+    return total
+
+
+def penalty_scores(candidates: np.ndarray) -> list:
+    count = candidates.shape[-1]
+    transposed = candidates.transpose(0, 2, 1)
+    score = _run_penalty(candidates) + _run_penalty(transposed)
+    block = candidates[:, :-1, :-1]
+    uniform = (block == candidates[:, :-1, 1:]) & (block == candidates[:, 1:, :-1]) & (block == candidates[:, 1:, 1:])
+    score += 3 * uniform.sum(axis=(1, 2))
+    score += 40 * (_finder_penalty(candidates) + _finder_penalty(transposed))
+    scores = []
+    for (points, dark_count) in zip(score.tolist(), candidates.sum(axis=(1, 2)).tolist()):
+        percent = float(dark_count) / count ** 2
+        scores.append(points + int(abs(percent * 100 - 50) / 5) * 10)
+    return scores
+
+
+def encode_modules(data, error_correction: str='H', mask_pattern: int=None, optimal: bool=False) -> tuple:
+    level = EC_LEVELS.get(error_correction, EC_LEVELS['H'])
+    if optimal:
+        (version, segments) = plan_segments(data, level)
+    else:
+        segments = list(util.optimal_data_chunks(data, minimum=OPTIMIZE_MINIMUM))
+        version = fit_version(segments, level)
+    (template, _) = function_patterns(version)
+    (rows, cols) = data_positions(version)
+    bits = np.unpackbits(codewords(segments, version, level))
+    placed = np.zeros_like(template)
+    placed[rows[:len(bits)], cols[:len(bits)]] = bits[:len(rows)].astype(bool)
+    candidates = (template | placed) ^ mask_stack(version)
+    if mask_pattern is None:
+        scores = penalty_scores(candidates)
+        mask_pattern = scores.index(min(scores))
+    modules = candidates[mask_pattern].copy()
+    count = modules.shape[0]
+    format_bits = util.BCH_type_info(level << 3 | mask_pattern)
+    for (i, (row, col)) in enumerate(format_positions(count)):
+        modules[row, col] = format_bits >> i % 15 & 1
+    modules[count - 8, 8] = True
+    if version >= 7:
+        version_bits = util.BCH_type_number(version)
+        for (i, (row, col)) in enumerate(version_positions(count)):
+            modules[row, col] = version_bits >> i % 18 & 1
+    return (version, modules)
@@ -1,48 +1,126 @@
 import qrcode
 import logging
-import time
-from qrcode.image.styledpil import StyledPilImage
-from qrcode.image.styles.moduledrawers import RoundedModuleDrawer, SquareModuleDrawer
-from qrcode.image.styles.colormasks import SolidFillColorMask
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
 from PIL import Image
+from core.encoder import encode_modules
+from core.metrics import metrics
+from core.renderer import render_modules
 
 logger = logging.getLogger(__name__)
 
+EC_MAP = {'L': qrcode.constants.ERROR_CORRECT_L, 'M': qrcode.constants.ERROR_CORRECT_M, 'Q': qrcode.constants.ERROR_CORRECT_Q, 'H': qrcode.constants.ERROR_CORRECT_H}
+MATRIX_CACHE_SIZE = 256
+MM_PER_INCH = 25.4
+DEFAULT_DPI = 300
+QUIET_ZONE = 4
+
+
+@dataclass(frozen=True, eq=False)
+class QRMatrix:
+    data: str
+    error_correction: str
+    version: int
+    modules: np.ndarray
+    cleared: int = 0
+
+    @property
+    def size(self) -> int:
+        return self.modules.shape[0]
+
+
+@lru_cache(maxsize=MATRIX_CACHE_SIZE)
+def encode_matrix(data: str, error_correction: str='H', engine: str='optimal') -> QRMatrix:
+    if engine in ('fast', 'optimal'):
+        (version, modules) = encode_modules(data, error_correction, optimal=engine == 'optimal')
+    else:
+        qr = qrcode.QRCode(version=None, error_correction=EC_MAP.get(error_correction, qrcode.constants.ERROR_CORRECT_H), border=0)
+        qr.add_data(data)
+        qr.make(fit=True)
+        (version, modules) = (qr.version, np.array(qr.modules, dtype=bool))
+    modules.flags.writeable = False
+    logger.debug('Encoded %s chars as version %s-%s (%s engine)', len(data), version, error_correction, engine)
+    return QRMatrix(data=data, error_correction=error_correction, version=version, modules=modules)
+
+
+def target_pixels(size_px: int=None, size_mm: float=None, dpi: int=None) -> int | None:
+    if size_px:
+        return int(size_px)
+    if size_mm:
+        return max(1, round(size_mm / MM_PER_INCH * (dpi or DEFAULT_DPI)))
+    return None
+
+
+def fit_scale(modules: int, size_px: int, min_border: int=QUIET_ZONE) -> tuple:
+    box_size = max(1, size_px // (modules + 2 * min_border))
+    border = max(min_border, (size_px // box_size - modules) // 2)
+    return (box_size, border)
+
+
 class QRGenerator:
 
-    def __init__(self):
-        pass
+    def __init__(self, renderer: str='numpy', engine: str='optimal'):
+        self.renderer = renderer
+        self.engine = engine
 
     def _hex_to_rgb(self, color: str) -> tuple:
         if color.startswith('#'):
             return tuple(int(color.lstrip('#')[i:i + 2], 16) for i in (0, 2, 4))
         return (0, 0, 0) if color == 'black' else (255, 255, 255)
 
-    def generate_qr(self, data: str, error_correction: str='H', box_size: int=10, border: int=4, fill_color: str='black', back_color: str='white', rounded_modules: bool=True) -> Image.Image:
-        start_time = time.time()
-        ec_map = {'L': qrcode.constants.ERROR_CORRECT_L, 'M': qrcode.constants.ERROR_CORRECT_M, 'Q': qrcode.constants.ERROR_CORRECT_Q, 'H': qrcode.constants.ERROR_CORRECT_H}
-        qr = qrcode.QRCode(version=None, error_correction=ec_map.get(error_correction, qrcode.constants.ERROR_CORRECT_H), box_size=box_size, border=border)
-        qr.add_data(data)
-        qr.make(fit=True)
-        module_drawer = RoundedModuleDrawer() if rounded_modules else SquareModuleDrawer()
+    @metrics.timed('encode')
+    def encode(self, data: str, error_correction: str='H') -> QRMatrix:
+        return encode_matrix(data, error_correction, self.engine)
+
+    @metrics.timed('draw')
+    def render(self, matrix: QRMatrix, box_size: int=10, border: int=4, fill_color: str='black', back_color: str='white', rounded_modules: bool=True, palette: bool=False) -> Image.Image:
         if not fill_color:
             fill_color = 'black'
         if not back_color:
             back_color = 'white'
         back_rgb = self._hex_to_rgb(back_color)
         fill_rgb = self._hex_to_rgb(fill_color)
-        img = qr.make_image(image_factory=StyledPilImage, module_drawer=module_drawer, color_mask=SolidFillColorMask(back_color=back_rgb, front_color=fill_rgb))
-        gen_time = time.time() - start_time
-        logger.debug(f'QR code generation: {gen_time*1000:.2f}ms')
-        if hasattr(img, '_img'):
-            return img._img
+        if self.renderer == 'numpy':
+            img = render_modules(matrix.modules, box_size, border, fill_rgb, back_rgb, rounded_modules, palette)
+        else:
+            img = self._render_styled(matrix, box_size, border, fill_rgb, back_rgb, rounded_modules)
         return img
 
-    def generate_svg(self, data: str, error_correction: str='H', border: int=4, rounded_modules: bool=True) -> str:
-        import qrcode.image.svg
-        ec_map = {'L': qrcode.constants.ERROR_CORRECT_L, 'M': qrcode.constants.ERROR_CORRECT_M, 'Q': qrcode.constants.ERROR_CORRECT_Q, 'H': qrcode.constants.ERROR_CORRECT_H}
-        qr = qrcode.QRCode(version=None, error_correction=ec_map.get(error_correction, qrcode.constants.ERROR_CORRECT_H), border=border)
-        qr.add_data(data)
-        qr.make(fit=True)
-        img = qr.make_image(image_factory=qrcode.image.svg.SvgPathImage)
-        return img.to_string(encoding='unicode')
\ No newline at end of file
+    def render_to_size(self, matrix: QRMatrix, size_px: int, min_border: int=QUIET_ZONE, fill_color: str='black', back_color: str='white', rounded_modules: bool=True, palette: bool=False) -> Image.Image:
+        # Whole-pixel modules only; what is left after the last full module
+        # of border is split evenly as background, never resampled.
+        (box_size, border) = fit_scale(matrix.size, size_px, min_border)
+        needed = (matrix.size + 2 * min_border) * box_size
+        if needed > size_px:
+            raise ValueError(f'version {matrix.version} code needs at least {needed}px, larger than the requested {size_px}px')
+        img = self.render(matrix, box_size, border, fill_color, back_color, rounded_modules, palette)
+        if img.width < size_px:
+            canvas = Image.new(img.mode, (size_px, size_px), 0 if img.mode == 'P' else self._hex_to_rgb(back_color or 'white'))
+            if img.mode == 'P':
+                canvas.putpalette(img.getpalette())
+            offset = (size_px - img.width) // 2
+            canvas.paste(img, (offset, offset))
+            img = canvas
+        return img
+
+    def _render_styled(self, matrix: QRMatrix, box_size: int, border: int, fill_rgb: tuple, back_rgb: tuple, rounded_modules: bool) -> Image.Image:
+        from qrcode.image.styledpil import StyledPilImage
+        from qrcode.image.styles.colormasks import SolidFillColorMask
+        from qrcode.image.styles.moduledrawers import RoundedModuleDrawer, SquareModuleDrawer
+        qr = qrcode.QRCode(version=matrix.version, error_correction=EC_MAP.get(matrix.error_correction, qrcode.constants.ERROR_CORRECT_H), box_size=box_size, border=border)
+        qr.modules = matrix.modules.tolist()
+        qr.modules_count = matrix.size
+        qr.data_cache = ()
+        module_drawer = RoundedModuleDrawer() if rounded_modules else SquareModuleDrawer()
+        img = qr.make_image(image_factory=StyledPilImage, module_drawer=module_drawer, color_mask=SolidFillColorMask(back_color=back_rgb, front_color=fill_rgb))
+        return img._img
+
+    def generate_qr(self, data: str, error_correction: str='H', box_size: int=10, border: int=4, fill_color: str='black', back_color: str='white', rounded_modules: bool=True) -> Image.Image:
+        return self.render(self.encode(data, error_correction), box_size, border, fill_color, back_color, rounded_modules)
+
+    def generate_svg(self, data: str, error_correction: str='H', border: int=4, rounded_modules: bool=True, fill_color: str='black', back_color: str='white') -> str:
+        from core.render import RenderJob
+        from core.vector import svg_document
+        job = RenderJob(data=data, error_correction=error_correction, border=border, fill_color=fill_color, back_color=back_color, rounded_modules=rounded_modules)
+        return svg_document(job, self.encode(data, error_correction))
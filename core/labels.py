@@ -0,0 +1,165 @@
+import logging
+import os
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Iterable
+from PIL import Image
+from core.generator import encode_matrix
+from core.logo_handler import LogoAsset
+from core.pdf import PdfWriter
+from core.render import RenderJob, resolve_logo
+from core.vector import logo_placement, pdf_qr_content
+
+logger = logging.getLogger(__name__)
+
+MM = 72 / 25.4
+PAGE_SIZES = {'A4': (595.28, 841.89), 'Letter': (612.0, 792.0)}
+CAPTION_FONT = 'Helvetica'
+CAPTION_LEADING = 1.6
+# Helvetica advance widths (1/1000 em) for ASCII 32-126, from the standard AFM.
+HELVETICA_WIDTHS = (278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278, 556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556, 1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778, 667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556, 333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556, 556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584)
+DEFAULT_WIDTH = 556
+
+
+@dataclass(frozen=True)
+class SheetLayout:
+    page: str = 'A4'
+    rows: int = 5
+    cols: int = 4
+    margin_mm: float = 10.0
+    gap_mm: float = 4.0
+    caption_size: float = 8.0
+
+    @property
+    def page_size(self) -> tuple:
+        if self.page not in PAGE_SIZES:
+            raise ValueError(f"unknown page size '{self.page}'")
+        return PAGE_SIZES[self.page]
+
+    @property
+    def per_page(self) -> int:
+        return self.rows * self.cols
+
+    def cell(self, slot: int) -> tuple:
+        (width, height) = self.page_size
+        margin = self.margin_mm * MM
+        gap = self.gap_mm * MM
+        cell_width = (width - 2 * margin - (self.cols - 1) * gap) / self.cols
+        cell_height = (height - 2 * margin - (self.rows - 1) * gap) / self.rows
+        (row, col) = divmod(slot, self.cols)
+        left = margin + col * (cell_width + gap)
+        top = height - margin - row * (cell_height + gap)
+        return (left, top, cell_width, cell_height)
+
+
+def text_width(text: str, size: float) -> float:
+    total = 0
+    for char in text:
+        base = unicodedata.normalize('NFKD', char)[:1] or char
+        code = ord(base)
+        total += HELVETICA_WIDTHS[code - 32] if 32 <= code <= 126 else DEFAULT_WIDTH
+    return total * size / 1000
+
+
+def fit_caption(text: str, size: float, width: float) -> str:
+    text = ' '.join(str(text).split())
+    if text_width(text, size) <= width:
+        return text
+    while text and text_width(text + '...', size) > width:
+        text = text[:-1]
+    return text.rstrip() + '...' if text else ''
+
+
+def pdf_string(text: str) -> str:
+    raw = text.encode('cp1252', errors='replace').decode('latin-1')
+    return '(' + raw.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+class LabelSheet:
+
+    def __init__(self, path: str, layout: SheetLayout=SheetLayout(), logo=None):
+        self.path = path
+        self.layout = layout
+        self.logo = LogoAsset.from_image(logo) if isinstance(logo, Image.Image) else logo
+        self.labels = 0
+        self.pages = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._stream = open(path, 'wb')
+        self._writer = PdfWriter(self._stream)
+        self._pages_id = self._writer.reserve()
+        self._font_id = self._writer.add(f'<< /Type /Font /Subtype /Type1 /BaseFont /{CAPTION_FONT} /Encoding /WinAnsiEncoding >>')
+        self._page_ids = []
+        self._images = {}
+        self._content = []
+        self._page_images = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add(self, job: RenderJob, caption: str=None):
+        slot = self.labels % self.layout.per_page
+        (left, top, cell_width, cell_height) = self.layout.cell(slot)
+        caption_height = self.layout.caption_size * CAPTION_LEADING if caption else 0
+        size = max(min(cell_width, cell_height - caption_height), 0)
+        matrix = encode_matrix(job.data, job.error_correction)
+        total = matrix.size + 2 * job.border
+        placement = logo_placement(job, resolve_logo(job, self.logo), total)
+        name = self._image_name(placement[0]) if placement is not None else 'Logo'
+        scale = size / total
+        x = left + (cell_width - size) / 2
+        self._content.append(f'q {scale:.5f} 0 0 {-scale:.5f} {x:.3f} {top:.3f} cm\n'.encode('latin-1') + pdf_qr_content(job, matrix, placement, name) + b'Q\n')
+        if caption:
+            text = fit_caption(caption, self.layout.caption_size, cell_width)
+            baseline = top - size - self.layout.caption_size * 1.2
+            offset = left + (cell_width - text_width(text, self.layout.caption_size)) / 2
+            self._content.append(f'BT 0 g /F1 {self.layout.caption_size:g} Tf {offset:.3f} {baseline:.3f} Td {pdf_string(text)} Tj ET\n'.encode('latin-1'))
+        self.labels += 1
+        if slot == self.layout.per_page - 1:
+            self._flush_page()
+
+    def close(self):
+        if self._stream.closed:
+            return
+        if self._content or not self._page_ids:
+            self._flush_page()
+        kids = ' '.join(f'{page_id} 0 R' for page_id in self._page_ids)
+        self._writer.add(f'<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>', self._pages_id)
+        self._writer.close(self._writer.add(f'<< /Type /Catalog /Pages {self._pages_id} 0 R >>'))
+        self._stream.close()
+        logger.info('Label sheet saved to: %s (%s labels, %s pages)', self.path, self.labels, self.pages)
+
+    def _image_name(self, image) -> str:
+        # Logo variants come from the LogoAsset cache, so the same object is
+        # handed back for every label and its XObject is written only once.
+        entry = self._images.get(id(image))
+        if entry is None:
+            entry = (image, f'Logo{len(self._images)}', self._writer.add_image(image))
+            self._images[id(image)] = entry
+        self._page_images[entry[1]] = entry[2]
+        return entry[1]
+
+    def _flush_page(self):
+        (width, height) = self.layout.page_size
+        content_id = self._writer.add_stream('', b''.join(self._content))
+        xobjects = ' '.join(f'/{name} {obj_id} 0 R' for (name, obj_id) in self._page_images.items())
+        resources = f'/Font << /F1 {self._font_id} 0 R >> /XObject << {xobjects} >>'
+        self._page_ids.append(self._writer.add(f'<< /Type /Page /Parent {self._pages_id} 0 R /MediaBox [0 0 {width:g} {height:g}] /Resources << {resources} >> /Contents {content_id} 0 R >>'))
+        self._content = []
+        self._page_images = {}
+        self.pages += 1
+
+
+def write_label_sheet(items: Iterable, path: str, layout: SheetLayout=SheetLayout(), logo=None) -> int:
+    start_time = time.time()
+    with LabelSheet(path, layout, logo) as sheet:
+        for item in items:
+            (job, caption) = item if isinstance(item, tuple) else (item, None)
+            sheet.add(job, caption)
+    logger.info('Label sheet: %s labels in %.2fs', sheet.labels, time.time() - start_time)
+    return sheet.pages
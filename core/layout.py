@@ -0,0 +1,51 @@
+import numpy as np
+from core.encoder import function_patterns
+from core.generator import QRMatrix, fit_scale
+from core.logo_handler import logo_origin
+
+
+def logo_area(count: int, logo_size: int, position: str='center', box_size: int=10, border: int=4, logo_border: int=40, size_px: int=None, pad: int=0) -> tuple | None:
+    if size_px:
+        (box, quiet) = fit_scale(count, size_px, border)
+        logo_border = logo_border * box // box_size
+        width = max(size_px, (count + 2 * quiet) * box)
+        offset = (width - (count + 2 * quiet) * box) // 2 + quiet * box
+    else:
+        box = box_size
+        width = (count + 2 * border) * box
+        offset = border * box
+    logo_px = int(width * (logo_size / 100))
+    if logo_px == 0:
+        return None
+    (pos_x, pos_y) = logo_origin(width, width, logo_px, position, logo_border)
+    # Every module the logo square touches, even partially, counts as lost.
+    (top, left) = (max((pos_y - offset) // box - pad, 0), max((pos_x - offset) // box - pad, 0))
+    (bottom, right) = (min(-((offset - pos_y - logo_px) // box) + pad, count), min(-((offset - pos_x - logo_px) // box) + pad, count))
+    if top >= bottom or left >= right:
+        return None
+    return (top, left, bottom, right)
+
+
+def knockout(matrix: QRMatrix, area: tuple | None) -> QRMatrix:
+    if area is None:
+        return matrix
+    (top, left, bottom, right) = area
+    # Finder, timing, alignment and format modules stay: clearing them would
+    # cost readability without making room for the logo.
+    cleared = np.zeros_like(matrix.modules)
+    cleared[top:bottom, left:right] = True
+    cleared &= ~function_patterns(matrix.version)[1]
+    modules = matrix.modules & ~cleared
+    modules.flags.writeable = False
+    return QRMatrix(data=matrix.data, error_correction=matrix.error_correction, version=matrix.version, modules=modules, cleared=int(cleared.sum()))
+
+
+def knocks_out(job) -> bool:
+    # A translucent logo lets the modules show through, so they stay drawn.
+    return job.logo_knockout and job.logo_opacity >= 100
+
+
+def knockout_logo(matrix: QRMatrix, job, size_px: int=None) -> QRMatrix:
+    if not knocks_out(job):
+        return matrix
+    return knockout(matrix, logo_area(matrix.size, job.logo_size, job.logo_position, job.box_size, job.border, job.logo_border, size_px, job.logo_pad))
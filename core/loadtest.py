@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import math
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def request_paths(unique: int, fmt: str='png', logo: str=None) -> list:
+    paths = []
+    for index in range(max(1, unique)):
+        params = {'type': 'text', 'data': f'https://exemplo.com/carga/{index}', 'format': fmt}
+        if logo:
+            params['logo'] = logo
+        paths.append('/qr?' + urlencode(params))
+    return paths
+
+
+async def _fetch(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, path: str) -> int:
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n'.encode('latin-1'))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        (name, _, value) = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(host: str, port: int, paths: list, counter: list, total: int, latencies: list, statuses: Counter):
+    (reader, writer) = await asyncio.open_connection(host, port)
+    try:
+        while counter[0] < total:
+            index = counter[0]
+            counter[0] += 1
+            start_time = time.perf_counter()
+            try:
+                status = await _fetch(reader, writer, host, paths[index % len(paths)])
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+                statuses['error'] += 1
+                writer.close()
+                (reader, writer) = await asyncio.open_connection(host, port)
+                continue
+            latencies.append(time.perf_counter() - start_time)
+            statuses[status] += 1
+    finally:
+        writer.close()
+
+
+async def run_load(url: str, requests: int=1000, concurrency: int=16, paths: list=None) -> dict:
+    target = urlsplit(url)
+    (host, port) = (target.hostname or '127.0.0.1', target.port or 80)
+    paths = paths or request_paths(50)
+    latencies = []
+    statuses = Counter()
+    counter = [0]
+    start_time = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, paths, counter, requests, latencies, statuses) for _ in range(max(1, concurrency))))
+    elapsed = time.perf_counter() - start_time
+    return {'requests': len(latencies), 'elapsed_s': round(elapsed, 3), 'rps': round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0, 'p50_ms': round(percentile(latencies, 50) * 1000, 2), 'p90_ms': round(percentile(latencies, 90) * 1000, 2), 'p99_ms': round(percentile(latencies, 99) * 1000, 2), 'max_ms': round(max(latencies, default=0) * 1000, 2), 'statuses': {str(status): count for (status, count) in sorted(statuses.items(), key=str)}}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='loadtest', description='Teste de carga do serviço HTTP de QR Codes (server.py).')
+    parser.add_argument('--url', default='http://127.0.0.1:8080', help='Endereço do servidor')
+    parser.add_argument('-n', '--requests', type=int, default=1000, help='Total de requisições')
+    parser.add_argument('-c', '--concurrency', type=int, default=16, help='Conexões simultâneas')
+    parser.add_argument('--unique', type=int, default=50, help='Quantidade de payloads distintos (menos = mais acertos de cache)')
+    parser.add_argument('--format', choices=('png', 'svg'), default='png', help='Formato pedido')
+    parser.add_argument('--logo', help='Nome da logo no --logo-dir do servidor')
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    report = asyncio.run(run_load(args.url, args.requests, args.concurrency, request_paths(args.unique, args.format, args.logo)))
+    print(f"{report['requests']} requisições em {report['elapsed_s']:.2f}s: {report['rps']:.1f} req/s")
+    print(f"latência p50 {report['p50_ms']:.2f}ms | p90 {report['p90_ms']:.2f}ms | p99 {report['p99_ms']:.2f}ms | máx {report['max_ms']:.2f}ms")
+    print('status: ' + ', '.join(f'{status}={count}' for (status, count) in report['statuses'].items()))
+    ok = report['statuses'].get('200', 0) + report['statuses'].get('304', 0)
+    return 0 if ok == report['requests'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,25 +1,87 @@
+import argparse
+import atexit
 import logging
-import sys
+import multiprocessing
 import os
-from logging.handlers import RotatingFileHandler
-
-def setup_logging():
-    logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
-    if logger.hasHandlers():
-        logger.handlers.clear()
-    log_format = '[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)d] - %(message)s'
-    date_format = '%H:%M:%S'
-    formatter = logging.Formatter(log_format, datefmt=date_format)
-    log_file = os.path.join(os.getcwd(), 'app.log')
-    file_handler = RotatingFileHandler(log_file, maxBytes=5 * 1024 * 1024, backupCount=2, encoding='utf-8')
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG)
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FORMAT = '[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)d] - %(message)s'
+CLI_FORMAT = '[%(asctime)s] [%(levelname)s] - %(message)s'
+DATE_FORMAT = '%H:%M:%S'
+LEVELS_ENV = 'VOID_QR_LOG_LEVELS'
+# Modules that log per rendered code; batch and server runs keep them quiet
+# unless -v is given or a level is set explicitly.
+HOT_MODULES = ('core.generator', 'core.logo_handler', 'core.logo_cache', 'core.render', 'core.cache', 'core.vector', 'core.worker')
+MODE_LEVELS = {'gui': {'PIL': logging.INFO}, 'batch': {name: logging.WARNING for name in HOT_MODULES + ('PIL',)}, 'server': {name: logging.WARNING for name in HOT_MODULES + ('PIL',)}}
+
+_listener = None
+_queue_handler = None
+_worker_listener = None
+_worker_queue = None
+_levels = {}
+_atexit_registered = False
+
+
+def parse_levels(spec: str) -> dict:
+    levels = {}
+    for item in (part.strip() for part in (spec or '').split(',')):
+        if not item:
+            continue
+        (name, _, level) = item.rpartition('=')
+        value = logging.getLevelName(level.strip().upper())
+        if not isinstance(value, int):
+            raise ValueError(f"invalid log level '{level.strip()}'")
+        levels[name.strip()] = value
+    return levels
+
+
+def log_levels(value: str) -> dict:
+    try:
+        return parse_levels(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def setup_logging(mode: str='gui', verbose: bool=False, levels: dict=None, log_file: str=None) -> QueueListener:
+    global _listener, _queue_handler, _levels, _atexit_registered
+    stop_logging()
+    handlers = []
+    if mode == 'gui':
+        formatter = logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
+        log_file = log_file or os.path.join(os.getcwd(), 'app.log')
+        console_handler = logging.StreamHandler(sys.stdout)
+    else:
+        formatter = logging.Formatter(CLI_FORMAT, datefmt=DATE_FORMAT)
+        console_handler = logging.StreamHandler(sys.stderr)
+    if log_file:
+        file_handler = RotatingFileHandler(log_file, maxBytes=5 * 1024 * 1024, backupCount=2, encoding='utf-8')
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
     console_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
+    # Render threads only enqueue records; one background thread formats
+    # them and does the console and file writes.
+    records = queue.SimpleQueue()
+    _queue_handler = QueueHandler(records)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(logging.DEBUG if verbose or mode == 'gui' else logging.INFO)
+    quiet = MODE_LEVELS.get(mode, {})
+    module_levels = dict.fromkeys(quiet, logging.NOTSET) if verbose else dict(quiet)
+    module_levels.update(parse_levels(os.environ.get(LEVELS_ENV, '')))
+    module_levels.update(levels or {})
+    for (name, level) in module_levels.items():
+        logging.getLogger(name or None).setLevel(level)
+    _levels = {'': root.level, **module_levels}
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    if not _atexit_registered:
+        atexit.register(stop_logging)
+        _atexit_registered = True
 
     def handle_exception(exc_type, exc_value, exc_traceback):
         if issubclass(exc_type, KeyboardInterrupt):
@@ -27,4 +89,47 @@ def setup_logging():
             return
         logging.critical('Uncaught exception', exc_info=(exc_type, exc_value, exc_traceback))
     sys.excepthook = handle_exception
-    logging.info('Logging system initialized successfully.')
\ No newline at end of file
+    logging.getLogger(__name__).debug('Logging initialized (%s mode, %d handlers)', mode, len(handlers))
+    return _listener
+
+
+def worker_logging() -> tuple:
+    global _worker_listener, _worker_queue
+    if _listener is None:
+        return (None, {})
+    # Pool processes cannot reach the thread queue above (a forked child
+    # inherits a copy nobody drains), so they get a process queue whose
+    # records go to the same handlers.
+    if _worker_queue is None:
+        _worker_queue = multiprocessing.Queue()
+        _worker_listener = QueueListener(_worker_queue, *_listener.handlers, respect_handler_level=True)
+        _worker_listener.start()
+    return (_worker_queue, dict(_levels))
+
+
+def setup_worker_logging(records, levels: dict):
+    if records is None:
+        return
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(records))
+    for (name, level) in levels.items():
+        logging.getLogger(name or None).setLevel(level)
+
+
+def stop_logging():
+    global _listener, _queue_handler, _worker_listener, _worker_queue
+    if _worker_listener is not None:
+        _worker_listener.stop()
+        _worker_queue.close()
+        _worker_queue.join_thread()
+        (_worker_listener, _worker_queue) = (None, None)
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
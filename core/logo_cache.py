@@ -0,0 +1,60 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image
+from core.logo_handler import LogoAsset
+
+logger = logging.getLogger(__name__)
+
+
+def open_logo(path: str) -> Image.Image:
+    with Image.open(path) as logo:
+        return logo.convert('RGBA')
+
+
+class LogoCache:
+
+    def __init__(self, max_assets: int=16):
+        self.max_assets = max_assets
+        self.hits = 0
+        self.misses = 0
+        self._assets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, path: str, raster_size: int=None, loader=None) -> LogoAsset | None:
+        if not path:
+            return None
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError as e:
+            logger.error('Error loading logo %s: %s', path, e)
+            return None
+        key = f'{os.path.abspath(path)}:{mtime}:{raster_size}'
+        with self._lock:
+            asset = self._assets.get(key)
+            if asset is not None:
+                self._assets.move_to_end(key)
+                self.hits += 1
+                return asset
+            self.misses += 1
+        try:
+            image = (loader or open_logo)(path)
+        except Exception as e:
+            logger.error('Error loading logo %s: %s', path, e)
+            return None
+        if image is None:
+            return None
+        asset = LogoAsset(image, key)
+        with self._lock:
+            self._assets[key] = asset
+            while len(self._assets) > self.max_assets:
+                self._assets.popitem(last=False)
+        return asset
+
+    def clear(self):
+        with self._lock:
+            self._assets.clear()
+
+
+logo_cache = LogoCache()
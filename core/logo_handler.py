@@ -1,90 +1,182 @@
 from PIL import Image, ImageDraw, ImageFilter
+import hashlib
+import io
 import logging
-import time
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from core.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
-def add_logo(qr_image: Image.Image, logo_source: object, size_percent: int, opacity: int, position: str='center', border_width: int=0, back_color: str='white') -> Image.Image:
-    start_time = time.time()
-    
-    if not logo_source:
-        return qr_image
-    try:
-        qr_image = qr_image.convert('RGBA')
-        if isinstance(logo_source, str):
-            logo = Image.open(logo_source).convert('RGBA')
-        elif isinstance(logo_source, Image.Image):
-            logo = logo_source.convert('RGBA')
-        else:
-            logger.error(f'Invalid logo source type: {type(logo_source)}')
-            return qr_image
-    except Exception as e:
-        logger.error(f'Error loading logo: {e}')
-        return qr_image
-    
-    load_time = time.time() - start_time
-    logger.debug(f'Logo load time: {load_time*1000:.2f}ms')
-    
-    process_start = time.time()
-    qr_width, qr_height = qr_image.size
-    logo_size = int(min(qr_width, qr_height) * (size_percent / 100))
-    if logo_size == 0:
-        return qr_image
-    
+MAX_VARIANTS = 8
+# Alpha to paste mask for palette images: any visible logo pixel replaces
+# the base index outright, since indices cannot be blended.
+VISIBLE = [0] + [255] * 255
+
+
+@lru_cache(maxsize=None)
+def opacity_table(opacity: int) -> tuple:
+    return tuple(value * opacity // 100 for value in range(256))
+
+
+def prepare_logo(logo: Image.Image, logo_size: int, opacity: int) -> Image.Image:
     logo = logo.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
-    
-    to_paste = logo
-    paste_size = logo_size
-    
     if opacity < 100:
-        alpha_channel = logo.split()[3]
-        alpha_channel = alpha_channel.point(lambda p: p * (opacity / 100))
-        logo.putalpha(alpha_channel)
-        to_paste = logo
-    
-    process_time = time.time() - process_start
-    logger.debug(f'Logo processing time: {process_time*1000:.2f}ms')
-    
-    paste_start = time.time()
+        logo.putalpha(logo.getchannel('A').point(opacity_table(opacity)))
+    return logo
+
+
+class LogoAsset:
+
+    def __init__(self, source: Image.Image, key: str):
+        self.source = source if source.mode == 'RGBA' else source.convert('RGBA')
+        self.key = key
+        self.digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+        self._variants = OrderedDict()
+        self._encoded = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_image(cls, image: Image.Image) -> 'LogoAsset':
+        from core.cache import logo_digest
+        return cls(image, f'image:{logo_digest(image)}')
+
+    def variant(self, logo_size: int, opacity: int) -> Image.Image:
+        key = (logo_size, opacity)
+        with self._lock:
+            logo = self._variants.get(key)
+            if logo is not None:
+                self._variants.move_to_end(key)
+                return logo
+        logo = prepare_logo(self.source, logo_size, opacity)
+        with self._lock:
+            self._variants[key] = logo
+            while len(self._variants) > MAX_VARIANTS:
+                self._variants.popitem(last=False)
+        return logo
+
+    def encoded(self, logo_size: int, opacity: int, encoder):
+        # Exports embed the same variant over and over; keep the encoder's
+        # output per variant instead of compressing it again every time.
+        key = (logo_size, opacity, encoder)
+        with self._lock:
+            data = self._encoded.get(key)
+            if data is not None:
+                self._encoded.move_to_end(key)
+                return data
+        data = encoder(self.variant(logo_size, opacity))
+        with self._lock:
+            self._encoded[key] = data
+            while len(self._encoded) > MAX_VARIANTS:
+                self._encoded.popitem(last=False)
+        return data
+
+    def png(self, logo_size: int, opacity: int) -> bytes:
+        return self.encoded(logo_size, opacity, png_bytes)
+
+
+def png_bytes(img: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def logo_origin(qr_width: int, qr_height: int, logo_size: int, position: str='center', border_width: int=0) -> tuple:
     safe_margin = border_width + 10
     padding = max(int(qr_width * 0.05), safe_margin)
-    
     if position == 'center':
-        pos_x = (qr_width - paste_size) // 2
-        pos_y = (qr_height - paste_size) // 2
+        pos_x = (qr_width - logo_size) // 2
+        pos_y = (qr_height - logo_size) // 2
     elif position == 'top-left':
         pos_x = padding
         pos_y = padding
     elif position == 'top':
-        pos_x = (qr_width - paste_size) // 2
+        pos_x = (qr_width - logo_size) // 2
         pos_y = padding
     elif position == 'top-right':
-        pos_x = qr_width - paste_size - padding
+        pos_x = qr_width - logo_size - padding
         pos_y = padding
     elif position == 'left':
         pos_x = padding
-        pos_y = (qr_height - paste_size) // 2
+        pos_y = (qr_height - logo_size) // 2
     elif position == 'right':
-        pos_x = qr_width - paste_size - padding
-        pos_y = (qr_height - paste_size) // 2
+        pos_x = qr_width - logo_size - padding
+        pos_y = (qr_height - logo_size) // 2
     elif position == 'bottom-left':
         pos_x = padding
-        pos_y = qr_height - paste_size - padding
+        pos_y = qr_height - logo_size - padding
     elif position == 'bottom':
-        pos_x = (qr_width - paste_size) // 2
-        pos_y = qr_height - paste_size - padding
+        pos_x = (qr_width - logo_size) // 2
+        pos_y = qr_height - logo_size - padding
     elif position == 'bottom-right':
-        pos_x = qr_width - paste_size - padding
-        pos_y = qr_height - paste_size - padding
+        pos_x = qr_width - logo_size - padding
+        pos_y = qr_height - logo_size - padding
     else:
-        pos_x = (qr_width - paste_size) // 2
-        pos_y = (qr_height - paste_size) // 2
-    
-    qr_with_logo = qr_image.copy()
-    qr_with_logo.paste(to_paste, (pos_x, pos_y), to_paste)
+        pos_x = (qr_width - logo_size) // 2
+        pos_y = (qr_height - logo_size) // 2
+    return (pos_x, pos_y)
+
+
+def paste_indexed(image: Image.Image, logo: Image.Image, origin: tuple, colors: int=64):
+    box = (origin[0], origin[1], origin[0] + logo.width, origin[1] + logo.height)
+    region = image.crop(box).convert('RGB')
+    region.paste(logo, (0, 0), logo)
+    palette = image.getpalette() or []
+    used = len(palette) // 3
+    free = min(colors, 256) - used
+    if free < 2:
+        indexed = region.quantize(palette=image, dither=Image.Dither.NONE)
+    else:
+        # The logo gets its own palette entries after the module colours, so
+        # pixels outside the logo keep their exact index and colour.
+        indexed = region.quantize(colors=free, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+        extra = indexed.getpalette()[:free * 3]
+        image.putpalette(palette + extra)
+        indexed = indexed.point([min(index + used, 255) for index in range(256)])
+    image.paste(indexed, box, logo.getchannel('A').point(VISIBLE))
+
+
+# Draws the logo onto qr_image itself and returns it (a converted copy only
+# for modes other than RGB, RGBA and P); pass a copy if the caller still
+# needs the bare code.
+@metrics.timed('add_logo')
+def add_logo(qr_image: Image.Image, logo_source: object, size_percent: int, opacity: int, position: str='center', border_width: int=0, back_color: str='white', palette_colors: int=64) -> Image.Image:
+    if not logo_source:
+        return qr_image
+    try:
+        if isinstance(logo_source, LogoAsset):
+            asset = logo_source
+        elif isinstance(logo_source, str):
+            asset = LogoAsset(Image.open(logo_source), logo_source)
+        elif isinstance(logo_source, Image.Image):
+            asset = LogoAsset(logo_source, 'inline')
+        else:
+            logger.error('Invalid logo source type: %s', type(logo_source))
+            return qr_image
+    except Exception as e:
+        logger.error('Error loading logo: %s', e)
+        return qr_image
     
-    paste_time = time.time() - paste_start
-    total_time = time.time() - start_time
-    logger.info(f'add_logo total: {total_time*1000:.2f}ms (load: {load_time*1000:.2f}ms, process: {process_time*1000:.2f}ms, paste: {paste_time*1000:.2f}ms)')
+    qr_width, qr_height = qr_image.size
+    logo_size = int(min(qr_width, qr_height) * (size_percent / 100))
+    if logo_size == 0:
+        return qr_image
     
-    return qr_with_logo
\ No newline at end of file
+    to_paste = asset.variant(logo_size, opacity)
+    (pos_x, pos_y) = logo_origin(qr_width, qr_height, logo_size, position, border_width)
+
+    # Composited in place over the logo's bounding box only; the rest of the
+    # image keeps its pixels and its mode (RGB or palette).
+    if qr_image.mode == 'P':
+        paste_indexed(qr_image, to_paste, (pos_x, pos_y), palette_colors)
+    elif qr_image.mode == 'RGB':
+        qr_image.paste(to_paste, (pos_x, pos_y), to_paste)
+    else:
+        if qr_image.mode != 'RGBA':
+            qr_image = qr_image.convert('RGBA')
+        # alpha_composite rejects negative offsets on older Pillow; drop the
+        # part of the logo that falls outside instead.
+        (left, top) = (max(-pos_x, 0), max(-pos_y, 0))
+        qr_image.alpha_composite(to_paste, (pos_x + left, pos_y + top), (left, top))
+    return qr_image
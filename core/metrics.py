@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Log-spaced latency buckets from 10us to ~60s, four per octave, so a
+# percentile read back from the buckets is within ~19% of the true value.
+BUCKETS = tuple(1e-05 * 2 ** (index / 4) for index in range(91))
+PERCENTILES = (50, 95, 99)
+ENV_FLAG = 'VOID_QR_METRICS'
+
+
+class Histogram:
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for (index, bucket_count) in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return min(BUCKETS[index], self.max) if index < len(BUCKETS) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        summary = {'count': self.count, 'sum': self.total, 'max': self.max}
+        for q in PERCENTILES:
+            summary[f'p{q}'] = self.percentile(q)
+        return summary
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class _Span:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: 'Metrics', name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+
+    def __init__(self, enabled: bool=False):
+        self.enabled = enabled
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str):
+        return _Span(self, name) if self.enabled else NULL_SPAN
+
+    def timed(self, name: str):
+
+        def decorator(fn):
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def observe(self, name: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name: str, value: int=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {'counters': dict(sorted(self._counters.items())), 'stages': {name: histogram.summary() for (name, histogram) in sorted(self._histograms.items())}}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix: str='void_qr') -> str:
+        lines = [f'# TYPE {prefix}_events_total counter']
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = [(name, list(histogram.counts), histogram.count, histogram.total) for (name, histogram) in sorted(self._histograms.items())]
+        for (name, value) in counters:
+            lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        lines.append(f'# TYPE {prefix}_stage_seconds histogram')
+        for (name, counts, count, total) in histograms:
+            cumulative = 0
+            for (bound, bucket_count) in zip(BUCKETS, counts):
+                cumulative += bucket_count
+                if bucket_count:
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {total:.9g}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str):
+        text = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(text)
+
+    def summary_lines(self) -> list:
+        snapshot = self.snapshot()
+        lines = []
+        for (name, stage) in snapshot['stages'].items():
+            lines.append(f"{name:<18} n={stage['count']:<5} p50 {stage['p50'] * 1000:7.2f}  p95 {stage['p95'] * 1000:7.2f}  p99 {stage['p99'] * 1000:7.2f} ms")
+        for (name, value) in snapshot['counters'].items():
+            lines.append(f'{name:<18} {value}')
+        return lines
+
+
+metrics = Metrics(enabled=os.environ.get(ENV_FLAG, '').strip().lower() in ('1', 'true', 'yes', 'sim'))
@@ -1,20 +1,20 @@
+import binascii
 import re
+from typing import Iterable, Iterator
 
 class CRC16:
+    # CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF). binascii.crc_hqx is the
+    # table-driven implementation of this exact CRC in C and can be resumed
+    # from a previous value, which lets PixBuilder checksum only the suffix.
+    INITIAL = 65535
+
+    @staticmethod
+    def update(data: bytes, crc: int=INITIAL) -> int:
+        return binascii.crc_hqx(data, crc)
 
     @staticmethod
     def calculate(payload: str) -> str:
-        crc = 65535
-        polynomial = 4129
-        payload += '6304'
-        for byte in payload.encode('utf-8'):
-            crc ^= byte << 8
-            for _ in range(8):
-                if crc & 32768:
-                    crc = crc << 1 ^ polynomial
-                else:
-                    crc <<= 1
-            crc &= 65535
+        crc = CRC16.update(payload.encode('utf-8') + b'6304')
         return f'{crc:04X}'
 
 class PixPayload:
@@ -59,6 +59,36 @@ class PixPayload:
     def _build_additional_data_field(self) -> str:
         return self._format_field('05', self.txid)
 
+class PixBuilder:
+
+    def __init__(self, key: str, name: str, city: str):
+        merchant = PixPayload(key=key, name=name, city=city)
+        head = [merchant._format_field('00', '01'), merchant._format_field('26', merchant._build_merchant_account_info()), merchant._format_field('52', '0000'), merchant._format_field('53', '986')]
+        tail = [merchant._format_field('58', 'BR'), merchant._format_field('59', merchant.name), merchant._format_field('60', merchant.city)]
+        self.prefix = ''.join(head)
+        self.middle = ''.join(tail)
+        self._prefix_crc = CRC16.update(self.prefix.encode('utf-8'))
+        self._middle_bytes = self.middle.encode('utf-8')
+
+    def build(self, amount=None, txid: str='***') -> str:
+        amount_field = ''
+        if amount:
+            try:
+                value = f'{float(amount):.2f}'
+                amount_field = f'54{len(value):02d}{value}'
+            except ValueError:
+                pass
+        txid = txid or '***'
+        additional = f'05{len(txid):02d}{txid}'
+        txid_field = f'62{len(additional):02d}{additional}'
+        crc = CRC16.update(amount_field.encode('utf-8') + self._middle_bytes + txid_field.encode('utf-8') + b'6304', self._prefix_crc)
+        return f'{self.prefix}{amount_field}{self.middle}{txid_field}6304{crc:04X}'
+
+    def build_many(self, rows: Iterable[tuple]) -> Iterator[str]:
+        build = self.build
+        for (amount, txid) in rows:
+            yield build(amount, txid)
+
 class WifiPayload:
 
     def __init__(self, ssid: str, password: str, encryption: str='WPA', hidden: bool=False):
@@ -145,4 +175,32 @@ class SocialPayload:
 
     @staticmethod
     def pinterest(username):
-        return f'https://pinterest.com/{SocialPayload._clean_user(username)}'
\ No newline at end of file
+        return f'https://pinterest.com/{SocialPayload._clean_user(username)}'
+    @staticmethod
+    def for_platform(platform, value):
+        platform_key = (platform or '').lower().replace('-', '')
+        if 'email' in platform_key:
+            return SocialPayload.email(value)
+        elif 'whatsapp' in platform_key:
+            return SocialPayload.whatsapp(value)
+        elif 'instagram' in platform_key:
+            return SocialPayload.instagram(value)
+        elif 'twitter' in platform_key or 'x' == platform_key:
+            return SocialPayload.twitter(value)
+        elif 'facebook' in platform_key:
+            return SocialPayload.facebook(value)
+        elif 'linkedin' in platform_key:
+            return SocialPayload.linkedin(value)
+        elif 'github' in platform_key:
+            return SocialPayload.github(value)
+        elif 'youtube' in platform_key:
+            return SocialPayload.youtube(value)
+        elif 'discord' in platform_key:
+            return SocialPayload.discord(value)
+        elif 'telegram' in platform_key:
+            return SocialPayload.telegram(value)
+        elif 'steam' in platform_key:
+            return SocialPayload.steam(value)
+        elif 'pinterest' in platform_key:
+            return SocialPayload.pinterest(value)
+        return value
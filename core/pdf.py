@@ -0,0 +1,75 @@
+import zlib
+import numpy as np
+from PIL import Image
+
+
+def pdf_color(rgb: tuple) -> str:
+    return ' '.join(f'{channel / 255:.4g}' for channel in rgb)
+
+
+def image_streams(img: Image.Image, compress_level: int=1) -> tuple:
+    # Compressed pixel and soft mask data of an image XObject, reusable
+    # across files (see LogoAsset.encoded).
+    img = img.convert('RGBA') if img.mode not in ('RGB', 'RGBA') else img
+    alpha = None
+    if img.mode == 'RGBA':
+        channel = np.asarray(img)[:, :, 3]
+        if (channel < 255).any():
+            alpha = zlib.compress(channel.tobytes(), compress_level)
+        img = img.convert('RGB')
+    return (img.width, img.height, zlib.compress(img.tobytes(), compress_level), alpha)
+
+
+class PdfWriter:
+
+    def __init__(self, stream, compress_level: int=1):
+        self._stream = stream
+        self.compress_level = compress_level
+        self._offsets = {}
+        self._next_id = 1
+        self._position = 0
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def _write(self, data: bytes):
+        self._stream.write(data)
+        self._position += len(data)
+
+    def reserve(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def add(self, body: str, obj_id: int=None) -> int:
+        if obj_id is None:
+            obj_id = self.reserve()
+        self._offsets[obj_id] = self._position
+        self._write(f'{obj_id} 0 obj\n{body}\nendobj\n'.encode('latin-1'))
+        return obj_id
+
+    def add_stream(self, dictionary: str, data: bytes, compress: bool=True, obj_id: int=None) -> int:
+        if obj_id is None:
+            obj_id = self.reserve()
+        if compress:
+            data = zlib.compress(data, self.compress_level)
+            dictionary = f'{dictionary} /Filter /FlateDecode'
+        self._offsets[obj_id] = self._position
+        self._write(f'{obj_id} 0 obj\n<< {dictionary} /Length {len(data)} >>\nstream\n'.encode('latin-1'))
+        self._write(data)
+        self._write(b'\nendstream\nendobj\n')
+        return obj_id
+
+    def add_image(self, img: Image.Image, streams: tuple=None) -> int:
+        (width, height, rgb, alpha) = streams or image_streams(img, self.compress_level)
+        smask = ''
+        if alpha is not None:
+            mask_id = self.add_stream(f'/Type /XObject /Subtype /Image /Width {width} /Height {height} /ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode', alpha, compress=False)
+            smask = f' /SMask {mask_id} 0 R'
+        return self.add_stream(f'/Type /XObject /Subtype /Image /Width {width} /Height {height} /ColorSpace /DeviceRGB /BitsPerComponent 8{smask} /Filter /FlateDecode', rgb, compress=False)
+
+    def close(self, root_id: int):
+        xref_offset = self._position
+        lines = [f'xref\n0 {self._next_id}\n', '0000000000 65535 f \n']
+        for obj_id in range(1, self._next_id):
+            lines.append(f'{self._offsets.get(obj_id, 0):010d} 00000 n \n')
+        lines.append(f'trailer\n<< /Size {self._next_id} /Root {root_id} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n')
+        self._write(''.join(lines).encode('latin-1'))
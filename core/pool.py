@@ -0,0 +1,124 @@
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable, Iterator
+from PIL import Image
+from core.cache import RenderCache
+from core.generator import QRGenerator
+from core.logger import setup_worker_logging, worker_logging
+from core.logo_handler import LogoAsset
+from core.render import RenderJob, render_job, save_render
+from core.verify import ScanReport, verify_job
+
+logger = logging.getLogger(__name__)
+
+_generator = None
+_logo = None
+_cache = None
+
+
+@dataclass
+class RenderResult:
+    index: int
+    job: RenderJob
+    image: Image.Image | None = None
+    path: str | None = None
+    error: str | None = None
+    cached: bool = False
+    elapsed: float = 0.0
+    scan: ScanReport | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _init_worker(logo: Image.Image | None, cache_bytes: int, cache_dir: str | None, log_queue=None, log_levels: dict=None):
+    global _generator, _logo, _cache
+    setup_worker_logging(log_queue, log_levels or {})
+    _generator = QRGenerator()
+    _logo = LogoAsset.from_image(logo) if logo is not None else None
+    _cache = RenderCache(max_bytes=cache_bytes, disk_dir=cache_dir) if cache_bytes or cache_dir else None
+
+
+def _render_chunk(chunk: list, save: bool, verify: bool=False) -> list:
+    results = []
+    for (index, job) in chunk:
+        start_time = time.perf_counter()
+        try:
+            hits = _cache.hits + _cache.disk_hits if _cache is not None else 0
+            img = render_job(job, _generator, _logo, _cache)
+            cached = _cache is not None and _cache.hits + _cache.disk_hits > hits
+            scan = verify_job(job, img, _generator) if verify else None
+            if save:
+                results.append(RenderResult(index, job, path=save_render(job, img), cached=cached, elapsed=time.perf_counter() - start_time, scan=scan))
+            else:
+                results.append(RenderResult(index, job, image=img, cached=cached, elapsed=time.perf_counter() - start_time, scan=scan))
+        except Exception as e:
+            results.append(RenderResult(index, job, error=str(e)))
+    return results
+
+
+class RenderPool:
+
+    def __init__(self, workers: int=None, logo: Image.Image=None, chunk_size: int=4, max_pending: int=None, cache_bytes: int=0, cache_dir: str=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.max_pending = max_pending or self.workers * 4
+        self.logo = logo.source if isinstance(logo, LogoAsset) else logo
+        self.cache_bytes = cache_bytes
+        self.cache_dir = cache_dir
+        self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown(cancel=exc_type is not None)
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.logo, self.cache_bytes, self.cache_dir, *worker_logging()))
+            logger.info('Render pool started with %s workers', self.workers)
+
+    def shutdown(self, cancel: bool=False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=cancel)
+            self._executor = None
+
+    def imap(self, jobs: Iterable[RenderJob], ordered: bool=True, save: bool=False, verify: bool=False) -> Iterator[RenderResult]:
+        self.start()
+        chunks = self._chunks(jobs)
+        pending = deque()
+        for chunk in islice(chunks, self.max_pending):
+            pending.append(self._executor.submit(_render_chunk, chunk, save, verify))
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                (finished, _) = wait(pending, return_when=FIRST_COMPLETED)
+                done = [future for future in pending if future in finished]
+                for future in done:
+                    pending.remove(future)
+            for future in done:
+                for result in future.result():
+                    yield result
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.append(self._executor.submit(_render_chunk, chunk, save, verify))
+
+    def map(self, jobs: Iterable[RenderJob], save: bool=False, verify: bool=False) -> list:
+        return list(self.imap(jobs, ordered=True, save=save, verify=verify))
+
+    def _chunks(self, jobs: Iterable[RenderJob]) -> Iterator[list]:
+        numbered = enumerate(jobs)
+        while True:
+            chunk = list(islice(numbered, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
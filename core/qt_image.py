@@ -0,0 +1,38 @@
+from PyQt6.QtGui import QImage, QPixmap
+from PIL import Image
+
+# Pillow modes Qt can display straight from the raw buffer, with the Pillow
+# rawmode to read and the bytes per pixel (0 for packed 1-bit rows).
+NATIVE_FORMATS = {'RGBA': (QImage.Format.Format_RGBA8888, 'RGBA', 4), 'RGB': (QImage.Format.Format_RGB888, 'RGB', 3), 'L': (QImage.Format.Format_Grayscale8, 'L', 1), '1': (QImage.Format.Format_Mono, '1', 0), 'P': (QImage.Format.Format_Indexed8, 'P', 1)}
+MONO_COLORS = [4278190080, 4294967295]
+
+
+def native_mode(image: Image.Image) -> str:
+    if image.mode == 'P' and 'transparency' in image.info:
+        return 'RGBA'
+    if image.mode in NATIVE_FORMATS:
+        return image.mode
+    return 'RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB'
+
+
+def to_qimage(image: Image.Image) -> QImage:
+    mode = native_mode(image)
+    if mode != image.mode:
+        image = image.convert(mode)
+    (qt_format, rawmode, depth) = NATIVE_FORMATS[mode]
+    (width, height) = image.size
+    stride = (width + 7) // 8 if depth == 0 else width * depth
+    data = image.tobytes('raw', rawmode)
+    qimage = QImage(data, width, height, stride, qt_format)
+    # QImage reads the Pillow bytes in place; they must outlive the wrapper.
+    qimage._buffer = data
+    if mode == '1':
+        qimage.setColorTable(MONO_COLORS)
+    elif mode == 'P':
+        palette = image.getpalette('RGB') or []
+        qimage.setColorTable([4278190080 | palette[index] << 16 | palette[index + 1] << 8 | palette[index + 2] for index in range(0, len(palette), 3)])
+    return qimage
+
+
+def to_qpixmap(image: Image.Image) -> QPixmap:
+    return QPixmap.fromImage(to_qimage(image))
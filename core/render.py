@@ -0,0 +1,139 @@
+import logging
+import os
+from dataclasses import asdict, dataclass, replace
+from PIL import Image
+from core.cache import RenderCache, logo_digest, render_key
+from core.generator import DEFAULT_DPI, QRGenerator, fit_scale, target_pixels
+from core.layout import knockout_logo
+from core.logo_cache import logo_cache
+from core.logo_handler import LogoAsset, add_logo
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCancelled(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    data: str
+    error_correction: str = 'H'
+    box_size: int = 10
+    border: int = 4
+    fill_color: str = 'black'
+    back_color: str = 'white'
+    rounded_modules: bool = True
+    logo_path: str | None = None
+    logo_size: int = 15
+    logo_opacity: int = 100
+    logo_position: str = 'center'
+    logo_border: int = 40
+    logo_knockout: bool = True
+    logo_pad: int = 0
+    output_path: str | None = None
+    size_px: int | None = None
+    size_mm: float | None = None
+    dpi: int | None = None
+    palette: bool = False
+    logo_colors: int = 64
+    png_compress_level: int | None = None
+    png_optimize: bool = False
+
+    @property
+    def target_px(self) -> int | None:
+        return target_pixels(self.size_px, self.size_mm, self.dpi)
+
+    @property
+    def output_dpi(self) -> int | None:
+        return self.dpi or (DEFAULT_DPI if self.size_mm else None)
+
+
+def preview_job(job: RenderJob, modules: int, target_px: int) -> RenderJob:
+    box_size = fit_scale(modules, target_px, job.border)[0]
+    if box_size == job.box_size and job.target_px is None:
+        return job
+    # logo_border is in pixels of the full-size render; keep it proportional.
+    return replace(job, box_size=box_size, logo_border=job.logo_border * box_size // job.box_size, output_path=None, size_px=None, size_mm=None)
+
+
+def load_logo(path: str) -> LogoAsset | None:
+    return logo_cache.load(path)
+
+
+def resolve_logo(job: RenderJob, logo=None) -> LogoAsset | Image.Image | None:
+    if job.logo_path:
+        return load_logo(job.logo_path)
+    return logo
+
+
+def job_key(job: RenderJob, logo=None) -> str:
+    params = asdict(job)
+    del params['output_path']
+    del params['logo_path']
+    del params['png_compress_level']
+    del params['png_optimize']
+    if logo is None:
+        return render_key(params)
+    return render_key(params, logo.digest if isinstance(logo, LogoAsset) else logo_digest(logo))
+
+
+def _checkpoint(should_cancel):
+    if should_cancel is not None and should_cancel():
+        raise RenderCancelled()
+
+
+@metrics.timed('render')
+def render_job(job: RenderJob, generator: QRGenerator=None, logo=None, cache: RenderCache=None, should_cancel=None) -> Image.Image:
+    logo = resolve_logo(job, logo)
+    if cache is not None:
+        key = job_key(job, logo)
+        img = cache.get(key)
+        if img is not None:
+            metrics.increment('cache_hit')
+            return img
+        metrics.increment('cache_miss')
+    _checkpoint(should_cancel)
+    if generator is None:
+        generator = QRGenerator()
+    matrix = generator.encode(job.data, job.error_correction)
+    _checkpoint(should_cancel)
+    size_px = job.target_px
+    if logo is not None:
+        matrix = knockout_logo(matrix, job, size_px)
+    if size_px:
+        img = generator.render_to_size(matrix, size_px, job.border, job.fill_color, job.back_color, job.rounded_modules, job.palette)
+        logo_border = job.logo_border * fit_scale(matrix.size, size_px, job.border)[0] // job.box_size
+    else:
+        img = generator.render(matrix, box_size=job.box_size, border=job.border, fill_color=job.fill_color, back_color=job.back_color, rounded_modules=job.rounded_modules, palette=job.palette)
+        logo_border = job.logo_border
+    _checkpoint(should_cancel)
+    if logo is not None:
+        img = add_logo(img, logo, job.logo_size, job.logo_opacity, position=job.logo_position, border_width=logo_border, back_color=job.back_color, palette_colors=job.logo_colors)
+    if cache is not None:
+        cache.put(key, img)
+    return img
+
+
+def save_options(target: str, dpi: int=None, compress_level: int=None, optimize: bool=False) -> dict:
+    target = target.lower()
+    options = {}
+    if dpi:
+        options.update({'resolution': float(dpi)} if target.endswith('pdf') else {'dpi': (dpi, dpi)})
+    if target.endswith('png'):
+        if compress_level is not None:
+            options['compress_level'] = compress_level
+        if optimize:
+            options['optimize'] = True
+    return options
+
+
+def save_render(job: RenderJob, img: Image.Image) -> str:
+    directory = os.path.dirname(job.output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if img.mode == 'P' and not job.output_path.lower().endswith(('.png', '.gif', '.bmp', '.tif', '.tiff')):
+        img = img.convert('RGB')
+    img.save(job.output_path, **save_options(job.output_path, job.output_dpi, job.png_compress_level, job.png_optimize))
+    return job.output_path
@@ -0,0 +1,109 @@
+from functools import lru_cache
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Same geometry as qrcode's RoundedModuleDrawer: each module is four
+# quarter tiles, and a quarter is rounded when both of its orthogonal
+# neighbours are off. Tiles are drawn black on the background and then
+# recoloured with SolidFillColorMask, exactly like StyledPilImage does.
+PAINT_COLOR = (0, 0, 0)
+ANTIALIASING_FACTOR = 4
+EYE_SIZE = 7
+BACK_TILE = 16
+SQUARE_TILE = 17
+
+
+def _corner_tiles(corner_width: int, back_rgb: tuple) -> tuple:
+    square = Image.new('RGB', (corner_width, corner_width), PAINT_COLOR)
+    fake_width = corner_width * ANTIALIASING_FACTOR
+    radius = fake_width
+    base = Image.new('RGB', (fake_width, fake_width), back_rgb)
+    base_draw = ImageDraw.Draw(base)
+    base_draw.ellipse((0, 0, radius * 2, radius * 2), fill=PAINT_COLOR)
+    base_draw.rectangle((radius, 0, fake_width, fake_width), fill=PAINT_COLOR)
+    base_draw.rectangle((0, radius, fake_width, fake_width), fill=PAINT_COLOR)
+    nw = base.resize((corner_width, corner_width), Image.Resampling.LANCZOS)
+    ne = nw.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+    se = nw.transpose(Image.Transpose.ROTATE_180)
+    sw = nw.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+    return (square, nw, ne, se, sw)
+
+
+@lru_cache(maxsize=64)
+def module_tiles(box_size: int, fill_rgb: tuple, back_rgb: tuple, rounded: bool) -> np.ndarray:
+    from qrcode.image.styles.colormasks import SolidFillColorMask
+    mask = SolidFillColorMask(back_color=back_rgb, front_color=fill_rgb)
+    mask.paint_color = PAINT_COLOR
+    tiles = [Image.new('RGB', (box_size, box_size), back_rgb) for _ in range(SQUARE_TILE + 1)]
+    ImageDraw.Draw(tiles[SQUARE_TILE]).rectangle((0, 0, box_size - 1, box_size - 1), fill=PAINT_COLOR)
+    cw = int(box_size / 2)
+    if not rounded:
+        for pattern in range(BACK_TILE):
+            tiles[pattern] = tiles[SQUARE_TILE].copy()
+    elif cw > 0:
+        (square, nw, ne, se, sw) = _corner_tiles(cw, back_rgb)
+        for pattern in range(BACK_TILE):
+            tile = tiles[pattern]
+            tile.paste(nw if pattern & 1 else square, (0, 0))
+            tile.paste(ne if pattern & 2 else square, (cw, 0))
+            tile.paste(se if pattern & 4 else square, (cw, cw))
+            tile.paste(sw if pattern & 8 else square, (0, cw))
+    for tile in tiles:
+        mask.apply_mask(tile)
+    stack = np.stack([np.asarray(tile) for tile in tiles])
+    stack.flags.writeable = False
+    return stack
+
+
+def tile_indices(modules: np.ndarray, rounded: bool) -> np.ndarray:
+    active = modules.astype(bool)
+    if not rounded:
+        return np.where(active, SQUARE_TILE, BACK_TILE).astype(np.uint8)
+    padded = np.pad(active, 1)
+    north = padded[:-2, 1:-1]
+    south = padded[2:, 1:-1]
+    west = padded[1:-1, :-2]
+    east = padded[1:-1, 2:]
+    pattern = (~north & ~west).astype(np.uint8)
+    pattern |= (~north & ~east).astype(np.uint8) << 1
+    pattern |= (~south & ~east).astype(np.uint8) << 2
+    pattern |= (~south & ~west).astype(np.uint8) << 3
+    indices = np.where(active, pattern, BACK_TILE).astype(np.uint8)
+    count = active.shape[0]
+    eyes = np.zeros_like(active)
+    eyes[:EYE_SIZE, :EYE_SIZE] = True
+    eyes[:EYE_SIZE, count - EYE_SIZE:] = True
+    eyes[count - EYE_SIZE:, :EYE_SIZE] = True
+    indices[eyes & active] = SQUARE_TILE
+    return indices
+
+
+@lru_cache(maxsize=64)
+def palette_tiles(box_size: int, fill_rgb: tuple, back_rgb: tuple, rounded: bool) -> tuple | None:
+    tiles = module_tiles(box_size, fill_rgb, back_rgb, rounded)
+    (colors, inverse) = np.unique(tiles.reshape(-1, 3), axis=0, return_inverse=True)
+    if len(colors) > 256:
+        return None
+    # Background goes first so padding a palette image with index 0 keeps
+    # the quiet zone colour.
+    order = np.argsort(~np.all(colors == back_rgb, axis=1), kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    indexed = rank[inverse.reshape(-1)].astype(np.uint8).reshape(tiles.shape[:3])
+    indexed.flags.writeable = False
+    return (indexed, colors[order].astype(np.uint8).tobytes())
+
+
+def render_modules(modules, box_size: int, border: int, fill_rgb: tuple, back_rgb: tuple, rounded: bool=True, palette: bool=False) -> Image.Image:
+    modules = np.asarray(modules, dtype=bool)
+    indices = np.pad(tile_indices(modules, rounded), border, constant_values=BACK_TILE)
+    count = indices.shape[0]
+    indexed = palette_tiles(box_size, tuple(fill_rgb), tuple(back_rgb), rounded) if palette else None
+    if indexed is not None:
+        (tiles, colors) = indexed
+        img = Image.fromarray(tiles[indices].transpose(0, 2, 1, 3).reshape(count * box_size, count * box_size), 'L')
+        img.putpalette(colors)
+        return img
+    tiles = module_tiles(box_size, tuple(fill_rgb), tuple(back_rgb), rounded)
+    pixels = tiles[indices].transpose(0, 2, 1, 3, 4).reshape(count * box_size, count * box_size, 3)
+    return Image.fromarray(pixels, 'RGB')
@@ -0,0 +1,360 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+from urllib.parse import parse_qsl, urlsplit
+from qrcode.exceptions import DataOverflowError
+from core.batch import _as_bool, build_payload
+from core.ec_policy import AUTO, resolve_error_correction
+from core.generator import QRGenerator
+from core.logger import log_levels, setup_logging, stop_logging
+from core.metrics import metrics
+from core.render import RenderJob, job_key, render_job, resolve_logo, save_options
+from core.vector import svg_document
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+INT_LIMITS = {'box_size': (1, 40), 'border': (0, 20), 'logo_size': (5, 40), 'logo_opacity': (0, 100), 'logo_pad': (0, 10), 'size_px': (21, 4096), 'dpi': (72, 2400)}
+LOGO_POSITIONS = ('center', 'top-left', 'top', 'top-right', 'left', 'right', 'bottom-left', 'bottom', 'bottom-right')
+COLOR_PATTERN = re.compile('^(#[0-9a-fA-F]{6}|black|white)$')
+MAX_BODY = 64 * 1024
+DATA_TOO_LONG = 'data does not fit in a QR code at this error correction level'
+
+_generator = None
+
+
+class HttpError(Exception):
+
+    def __init__(self, status: int, message: str=None):
+        super().__init__(message or REASONS.get(status, ''))
+        self.status = status
+
+
+def _init_worker():
+    global _generator
+    _generator = QRGenerator()
+
+
+def render_bytes(job: RenderJob, fmt: str) -> bytes:
+    global _generator
+    if fmt == 'svg':
+        return svg_document(job).encode('utf-8')
+    if _generator is None:
+        _generator = QRGenerator()
+    buffer = BytesIO()
+    render_job(job, _generator).save(buffer, 'PNG', **save_options('png', job.output_dpi))
+    return buffer.getvalue()
+
+
+def _int_option(params: dict, name: str) -> int | None:
+    value = str(params.get(name) or '').strip()
+    if not value:
+        return None
+    (low, high) = INT_LIMITS[name]
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+    if not low <= number <= high:
+        raise ValueError(f"'{name}' must be between {low} and {high}")
+    return number
+
+
+def request_job(params: dict, logo_dir: str=None) -> tuple:
+    fmt = str(params.get('format') or 'png').strip().lower()
+    if fmt not in CONTENT_TYPES:
+        raise ValueError(f"unsupported format '{fmt}'")
+    options = {}
+    ec = str(params.get('ec') or 'H').strip().upper()
+    if ec not in ('L', 'M', 'Q', 'H', AUTO):
+        raise ValueError(f"invalid error correction level '{ec}'")
+    options['error_correction'] = ec
+    for name in INT_LIMITS:
+        number = _int_option(params, name)
+        if number is not None:
+            options[name] = number
+    for name in ('fill_color', 'back_color'):
+        value = str(params.get(name) or '').strip()
+        if value:
+            if not COLOR_PATTERN.match(value):
+                raise ValueError(f"invalid color '{value}' for '{name}' (use #rrggbb)")
+            options[name] = value
+    if _as_bool(params.get('square')):
+        options['rounded_modules'] = False
+    if _as_bool(params.get('palette')):
+        options['palette'] = True
+    position = str(params.get('logo_pos') or '').strip()
+    if position:
+        if position not in LOGO_POSITIONS:
+            raise ValueError(f"invalid logo position '{position}'")
+        options['logo_position'] = position
+    name = str(params.get('logo') or '').strip()
+    if name:
+        if not logo_dir:
+            raise ValueError('logos are not enabled on this server')
+        path = os.path.join(logo_dir, name)
+        if os.path.basename(name) != name or name.startswith('.') or not os.path.isfile(path):
+            raise ValueError(f"unknown logo '{name}'")
+        options['logo_path'] = path
+    (job, _) = resolve_error_correction(RenderJob(data=build_payload(params), **options))
+    return (job, fmt)
+
+
+class ResponseCache:
+
+    def __init__(self, max_bytes: int=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+
+    def get(self, etag: str) -> bytes | None:
+        data = self._entries.get(etag)
+        if data is not None:
+            self._entries.move_to_end(etag)
+        return data
+
+    def put(self, etag: str, data: bytes):
+        if len(data) > self.max_bytes or etag in self._entries:
+            return
+        self._entries[etag] = data
+        self.current_bytes += len(data)
+        while self.current_bytes > self.max_bytes:
+            (_, evicted) = self._entries.popitem(last=False)
+            self.current_bytes -= len(evicted)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RenderServer:
+
+    def __init__(self, executor: Executor=None, workers: int=None, max_queue: int=64, cache_bytes: int=32 * 1024 * 1024, logo_dir: str=None, max_age: int=3600):
+        self._owns_executor = executor is None
+        if executor is None:
+            workers = workers or os.cpu_count() or 1
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        self.executor = executor
+        self.max_queue = max_queue
+        self.cache = ResponseCache(cache_bytes)
+        self.logo_dir = logo_dir
+        self.max_age = max_age
+        self.requests = 0
+        self.renders = 0
+        self.cache_hits = 0
+        self.deduplicated = 0
+        self.not_modified = 0
+        self.rejected = 0
+        self._inflight = {}
+
+    def close(self):
+        if self._owns_executor:
+            self.executor.shutdown(cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {'requests': self.requests, 'renders': self.renders, 'cache_hits': self.cache_hits, 'deduplicated': self.deduplicated, 'not_modified': self.not_modified, 'rejected': self.rejected, 'in_flight': len(self._inflight), 'max_queue': self.max_queue, 'cached_responses': len(self.cache), 'cache_bytes': self.cache.current_bytes}
+
+    def etag(self, job: RenderJob, fmt: str) -> str:
+        logo = resolve_logo(job)
+        if job.logo_path and logo is None:
+            raise ValueError('logo could not be loaded')
+        return f'"{job_key(job, logo)}.{fmt}"'
+
+    async def render(self, job: RenderJob, fmt: str, etag: str) -> bytes:
+        data = self.cache.get(etag)
+        if data is not None:
+            self.cache_hits += 1
+            metrics.increment('cache_hit')
+            return data
+        future = self._inflight.get(etag)
+        if future is not None:
+            self.deduplicated += 1
+            metrics.increment('deduplicated')
+        else:
+            if len(self._inflight) >= self.max_queue:
+                self.rejected += 1
+                metrics.increment('rejected')
+                raise HttpError(503, 'render queue is full')
+            future = asyncio.get_running_loop().run_in_executor(self.executor, render_bytes, job, fmt)
+            future.add_done_callback(partial(self._finished, etag))
+            self._inflight[etag] = future
+        # Shielded so a client hanging up does not cancel a render that other
+        # identical requests are still waiting on.
+        return await asyncio.shield(future)
+
+    def _finished(self, etag: str, future: asyncio.Future):
+        self._inflight.pop(etag, None)
+        if not future.cancelled() and future.exception() is None:
+            self.renders += 1
+            metrics.increment('cache_miss')
+            self.cache.put(etag, future.result())
+
+    async def respond(self, method: str, target: str, headers: dict, body: bytes) -> tuple:
+        url = urlsplit(target)
+        if url.path == '/health':
+            return (200, {'Content-Type': 'application/json'}, json.dumps(self.stats()).encode('utf-8'))
+        if url.path == '/metrics':
+            if 'json' in url.query:
+                return (200, {'Content-Type': 'application/json'}, metrics.to_json().encode('utf-8'))
+            return (200, {'Content-Type': 'text/plain; version=0.0.4'}, metrics.to_prometheus().encode('utf-8'))
+        if url.path != '/qr':
+            raise HttpError(404)
+        if method not in ('GET', 'HEAD', 'POST'):
+            raise HttpError(405)
+        params = dict(parse_qsl(url.query))
+        if method == 'POST' and body:
+            try:
+                payload = json.loads(body)
+            except json.JSONDecodeError as e:
+                raise HttpError(400, f'invalid JSON body: {e}')
+            if not isinstance(payload, dict):
+                raise HttpError(400, 'JSON body must be an object')
+            params.update(payload)
+        try:
+            (job, fmt) = request_job(params, self.logo_dir)
+            etag = self.etag(job, fmt)
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        except DataOverflowError:
+            raise HttpError(413, DATA_TOO_LONG)
+        cache_headers = {'ETag': etag, 'Cache-Control': f'public, max-age={self.max_age}'}
+        if etag in (tag.strip() for tag in headers.get('if-none-match', '').split(',')):
+            self.not_modified += 1
+            metrics.increment('not_modified')
+            return (304, cache_headers, b'')
+        try:
+            data = await self.render(job, fmt, etag)
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        except DataOverflowError:
+            raise HttpError(413, DATA_TOO_LONG)
+        return (200, {'Content-Type': CONTENT_TYPES[fmt], **cache_headers}, data)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HttpError as e:
+                    await _write_response(writer, e.status, {}, _error_body(e), keep_alive=False)
+                    break
+                if request is None:
+                    break
+                (method, target, version, headers, body) = request
+                self.requests += 1
+                start_time = time.perf_counter()
+                try:
+                    (status, response_headers, data) = await self.respond(method, target, headers, body)
+                except HttpError as e:
+                    (status, response_headers, data) = (e.status, {'Content-Type': 'application/json'}, _error_body(e))
+                    if e.status == 503:
+                        response_headers['Retry-After'] = '1'
+                except Exception as e:
+                    logger.error('%s %s: %s', method, target, e)
+                    (status, response_headers, data) = (500, {'Content-Type': 'application/json'}, _error_body(HttpError(500)))
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+                await _write_response(writer, status, response_headers, b'' if method == 'HEAD' else data, keep_alive, len(data))
+                metrics.observe('request', time.perf_counter() - start_time)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _error_body(error: HttpError) -> bytes:
+    return json.dumps({'error': str(error)}).encode('utf-8')
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple | None:
+    try:
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        parts = line.decode('latin-1').split()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+            raise HttpError(400, 'malformed request line')
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            (name, _, value) = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+            if len(headers) > 100:
+                raise HttpError(400, 'too many headers')
+    except (ValueError, asyncio.LimitOverrunError):
+        raise HttpError(400, 'request line or header too long')
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise HttpError(400, 'invalid Content-Length')
+    if length > MAX_BODY:
+        raise HttpError(413)
+    body = await reader.readexactly(length) if length > 0 else b''
+    return (parts[0].upper(), parts[1], parts[2], headers, body)
+
+
+async def _write_response(writer: asyncio.StreamWriter, status: int, headers: dict, body: bytes, keep_alive: bool, length: int=None):
+    lines = [f'HTTP/1.1 {status} {REASONS.get(status, "")}']
+    headers = {**headers, 'Content-Length': str(len(body) if length is None else length), 'Connection': 'keep-alive' if keep_alive else 'close'}
+    lines.extend(f'{name}: {value}' for (name, value) in headers.items())
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+    await writer.drain()
+
+
+async def serve(server: RenderServer, host: str='127.0.0.1', port: int=8080):
+    tcp = await asyncio.start_server(server.handle, host, port)
+    logger.info('Render server listening on http://%s:%s (queue %s)', host, port, server.max_queue)
+    async with tcp:
+        await tcp.serve_forever()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='server', description='Serviço HTTP local que devolve QR Codes em PNG/SVG, sem interface gráfica.')
+    parser.add_argument('--host', default='127.0.0.1', help='Endereço de escuta')
+    parser.add_argument('--port', type=int, default=8080, help='Porta de escuta')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1, help='Processos de renderização (0 usa threads no próprio processo)')
+    parser.add_argument('--queue', type=int, default=64, help='Renderizações simultâneas na fila antes de responder 503')
+    parser.add_argument('--cache-mb', type=int, default=32, help='Memória do cache de respostas, em MB')
+    parser.add_argument('--max-age', type=int, default=3600, help='Valor de max-age do Cache-Control, em segundos')
+    parser.add_argument('--logo-dir', help='Diretório com as logos que podem ser pedidas pelo parâmetro logo')
+    parser.add_argument('--metrics', metavar='ARQUIVO', help='Grava latências e contadores ao encerrar (.prom para Prometheus, senão JSON); também expostos em /metrics')
+    parser.add_argument('--log-level', type=log_levels, metavar='MÓDULO=NÍVEL', help='Níveis de log por módulo, separados por vírgula (ex.: core.server=DEBUG)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Exibe logs detalhados')
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    setup_logging('server', verbose=args.verbose, levels=args.log_level)
+    metrics.enabled = True
+    executor = ThreadPoolExecutor(max_workers=2) if args.workers <= 0 else None
+    server = RenderServer(executor=executor, workers=args.workers, max_queue=max(1, args.queue), cache_bytes=args.cache_mb * 1024 * 1024, logo_dir=args.logo_dir, max_age=args.max_age)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        logger.info('Render server stopped: %s', server.stats())
+    finally:
+        server.close()
+        if executor is not None:
+            executor.shutdown()
+        if args.metrics:
+            metrics.write(args.metrics)
+        stop_logging()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
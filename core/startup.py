@@ -0,0 +1,32 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+TARGET_MS = 300
+
+
+class StartupTimer:
+
+    def __init__(self, start: float=None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = []
+
+    def mark(self, name: str):
+        self.marks.append((name, time.perf_counter()))
+
+    def report(self) -> dict:
+        phases = {}
+        previous = self.start
+        for (name, moment) in self.marks:
+            phases[name] = (moment - previous) * 1000
+            previous = moment
+        phases['total'] = (previous - self.start) * 1000
+        return phases
+
+    def log(self, target_ms: float=TARGET_MS) -> dict:
+        phases = self.report()
+        detail = ', '.join(f'{name} {ms:.0f}ms' for (name, ms) in phases.items() if name != 'total')
+        level = logging.WARNING if phases['total'] > target_ms else logging.INFO
+        logger.log(level, 'Startup: %.0fms to first frame (target %.0fms): %s', phases['total'], target_ms, detail)
+        return phases
@@ -3,39 +3,30 @@ import logging
 import subprocess
 import shutil
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtGui import QImage, QPixmap
-from PyQt6.QtCore import QBuffer, QIODevice
+from PyQt6.QtGui import QPixmap
 from PIL import Image
+from core.qt_image import to_qimage, to_qpixmap
 
 logger = logging.getLogger(__name__)
 
+_clipboard_image = None
+
 def save_image(image: Image.Image, path: str):
     directory = os.path.dirname(path)
     if directory and not os.path.exists(directory):
         os.makedirs(directory)
     image.save(path)
-    logger.info(f'Image saved successfully to: {path}')
+    logger.info('Image saved successfully to: %s', path)
 
 def copy_to_clipboard(image: Image.Image):
-    if image.mode not in ('RGB', 'RGBA'):
-        image = image.convert('RGBA')
-    if image.mode == 'RGB':
-        r, g, b = image.split()
-        image = Image.merge('RGB', (b, g, r))
-    elif image.mode == 'RGBA':
-        r, g, b, a = image.split()
-        image = Image.merge('RGBA', (b, g, r, a))
-    im_data = image.tobytes('raw', image.mode)
-    qim = QImage(im_data, image.size[0], image.size[1], QImage.Format.Format_ARGB32 if image.mode == 'RGBA' else QImage.Format.Format_RGB888)
-    clipboard = QApplication.clipboard()
-    clipboard.setImage(qim)
+    global _clipboard_image
+    # The clipboard keeps a shallow copy of the QImage, so the Pillow buffer
+    # behind it stays referenced until the next copy replaces it.
+    _clipboard_image = to_qimage(image)
+    QApplication.clipboard().setImage(_clipboard_image)
 
 def pil_to_qpixmap(pil_image: Image.Image) -> QPixmap:
-    if pil_image.mode != 'RGBA':
-        pil_image = pil_image.convert('RGBA')
-    im_data = pil_image.tobytes('raw', 'RGBA')
-    qim = QImage(im_data, pil_image.size[0], pil_image.size[1], QImage.Format.Format_RGBA8888)
-    return QPixmap.fromImage(qim)
+    return to_qpixmap(pil_image)
 
 def save_image_dialog(image: Image.Image, parent=None):
     from PyQt6.QtWidgets import QFileDialog
@@ -52,12 +43,12 @@ def get_wifi_ssid_linux() -> str:
         for line in result.stdout.splitlines():
             if line.startswith('yes:') or line.startswith('sim:'):
                 ssid = line.split(':', 1)[1]
-                logger.info(f'Wi-Fi Detected: {ssid}')
+                logger.info('Wi-Fi Detected: %s', ssid)
                 return ssid
     except FileNotFoundError:
         logger.error('nmcli not found. Install network-manager.')
     except subprocess.CalledProcessError as e:
-        logger.error(f'nmcli failed: {e.stderr}')
+        logger.error('nmcli failed: %s', e.stderr)
     except Exception as e:
-        logger.error(f'Wi-Fi detection error: {e}')
+        logger.error('Wi-Fi detection error: %s', e)
     return None
\ No newline at end of file
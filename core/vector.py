@@ -0,0 +1,344 @@
+import base64
+import logging
+import os
+from functools import lru_cache
+import numpy as np
+from core.generator import MM_PER_INCH, QRGenerator, QRMatrix, encode_matrix
+from core.layout import knockout_logo
+from core.logo_handler import LogoAsset, logo_origin
+from core.metrics import metrics
+from core.pdf import PdfWriter, image_streams, pdf_color
+from core.render import RenderJob, resolve_logo
+from core.renderer import EYE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Outlines are traced on the grid of module corners with the dark side on
+# the right, so outer edges run clockwise and holes counter-clockwise and a
+# nonzero fill needs no hole bookkeeping. At diagonal touches the tracer
+# turns right, keeping 4-connected regions apart like RoundedModuleDrawer.
+RIGHT, DOWN, LEFT, UP = range(4)
+STEPS = np.array([(1, 0), (0, 1), (-1, 0), (0, -1)])
+RADIUS = 0.5
+KAPPA = 0.5523
+PDF_DPI = 100
+LOGO_EMBED_MAX = 1024
+VECTOR_EXTENSIONS = ('.svg', '.pdf')
+
+_rgb = QRGenerator()._hex_to_rgb
+
+
+class Outline:
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, turn_in: np.ndarray, turn_out: np.ndarray, rounded: np.ndarray, starts: np.ndarray):
+        self.x = x
+        self.y = y
+        self.turn_in = turn_in
+        self.turn_out = turn_out
+        self.rounded = rounded
+        self.starts = starts
+
+    def __len__(self):
+        return len(self.starts)
+
+    def points(self, offset: int=0) -> tuple:
+        # Doubled coordinates keep every entry/exit point on the integer grid.
+        corner = np.stack([self.x, self.y], axis=1) * 2 + offset * 2
+        radius = self.rounded.astype(np.int64)[:, None]
+        return (corner, corner - radius * STEPS[self.turn_in], corner + radius * STEPS[self.turn_out])
+
+    def ends(self) -> np.ndarray:
+        ends = np.zeros(len(self.x), dtype=bool)
+        ends[self.starts[1:] - 1] = True
+        if len(ends):
+            ends[-1] = True
+        return ends
+
+
+def trace_outline(modules: np.ndarray, rounded: bool=True) -> Outline:
+    dark = np.pad(np.asarray(modules, dtype=bool), 1)
+    (nw, ne, sw, se) = (dark[:-1, :-1], dark[:-1, 1:], dark[1:, :-1], dark[1:, 1:])
+    incoming = (sw & ~nw, nw & ~ne, ne & ~se, se & ~sw)
+    outgoing = (se & ~ne, sw & ~se, nw & ~sw, ne & ~nw)
+    (xs, ys, turn_in, turn_out) = ([], [], [], [])
+    for direction in range(4):
+        right_turn = incoming[direction] & outgoing[(direction + 1) % 4]
+        left_turn = incoming[direction] & ~right_turn & outgoing[(direction + 3) % 4]
+        for (mask, turn) in ((right_turn, 1), (left_turn, 3)):
+            (y, x) = np.nonzero(mask)
+            xs.append(x)
+            ys.append(y)
+            turn_in.append(np.full(len(x), direction))
+            turn_out.append(np.full(len(x), (direction + turn) % 4))
+    x = np.concatenate(xs)
+    y = np.concatenate(ys)
+    turn_in = np.concatenate(turn_in)
+    turn_out = np.concatenate(turn_out)
+    count = dark.shape[0] - 2
+    (order, starts) = _loops(_successors(x, y, turn_in, turn_out, count + 2))
+    (x, y, turn_in, turn_out) = (x[order], y[order], turn_in[order], turn_out[order])
+    convex = turn_out == (turn_in + 1) % 4
+    eyes = ((x <= EYE_SIZE) | (x >= count - EYE_SIZE)) & (y <= EYE_SIZE) | (x <= EYE_SIZE) & (y >= count - EYE_SIZE)
+    return Outline(x, y, turn_in, turn_out, convex & ~eyes & rounded, starts)
+
+
+def _successors(x: np.ndarray, y: np.ndarray, turn_in: np.ndarray, turn_out: np.ndarray, stride: int) -> np.ndarray:
+    # The edge leaving a corner ends at the nearest corner further along the
+    # same grid line that is entered from that direction.
+    successor = np.zeros(len(x), dtype=np.int64)
+    for direction in range(4):
+        (line, along) = (y, x) if direction in (RIGHT, LEFT) else (x, y)
+        keys = line * stride + along
+        targets = np.nonzero(turn_in == direction)[0]
+        order = np.argsort(keys[targets])
+        sorted_keys = keys[targets][order]
+        sources = np.nonzero(turn_out == direction)[0]
+        if direction in (RIGHT, DOWN):
+            index = np.searchsorted(sorted_keys, keys[sources], side='right')
+        else:
+            index = np.searchsorted(sorted_keys, keys[sources], side='left') - 1
+        successor[sources] = targets[order[index]]
+    return successor
+
+
+def _loops(successor: np.ndarray) -> tuple:
+    # Pointer doubling: label every cycle by its smallest node, then rank the
+    # nodes by their distance to the node just before that leader.
+    index = np.arange(len(successor))
+    rounds = max(1, len(successor).bit_length())
+    leader = index.copy()
+    jump = successor.copy()
+    # Both passes stop as soon as the longest cycle is covered: a round that
+    # changes no leader means every window already spans its whole cycle.
+    for _ in range(rounds):
+        merged = np.minimum(leader, leader[jump])
+        if np.array_equal(merged, leader):
+            break
+        leader = merged
+        jump = jump[jump]
+    tail = leader[successor] == successor
+    distance = np.where(tail, 0, 1)
+    jump = np.where(tail, index, successor)
+    for _ in range(rounds):
+        if tail[jump].all():
+            break
+        distance = distance + distance[jump]
+        jump = jump[jump]
+    # Cycles laid out by leader, each starting at its leader: a direct
+    # placement instead of sorting by (leader, -distance).
+    sizes = np.bincount(leader, minlength=len(successor))
+    first = np.cumsum(sizes) - sizes
+    order = np.empty_like(index)
+    order[first[leader] + sizes[leader] - 1 - distance] = index
+    return (order, first[sizes > 0])
+
+
+def _num(value: float) -> str:
+    return f'{value:g}'
+
+
+@lru_cache(maxsize=32)
+def _half_tokens(limit: int, shift: float=0.0) -> np.ndarray:
+    # String for every doubled coordinate in [-limit, limit], looked up with
+    # fancy indexing instead of formatting each path node.
+    values = [f'{index / 2 + shift:.3f}'.rstrip('0').rstrip('.') for index in range(-limit, limit + 1)]
+    return np.array([value.replace('0.', '.', 1) if value.startswith(('0.', '-0.')) else value or '0' for value in values], dtype=object)
+
+
+@lru_cache(maxsize=8)
+def _svg_tokens(limit: int) -> np.ndarray:
+    # Every node token an outline can need, as arc prefix x move: no arc or
+    # one of the four corner arcs, then an h or v step in [-limit, limit],
+    # or z. Zero steps are empty, since the node is a straight pass-through.
+    numbers = _half_tokens(limit)
+    arcs = [''] + [f'a.5.5 0 0 1 {numbers[dx + limit]} {numbers[dy + limit]}'.replace(' -', '-') for (dx, dy) in (STEPS + np.roll(STEPS, -1, axis=0))]
+    moves = ['h' + number for number in numbers] + ['v' + number for number in numbers] + ['z']
+    moves[limit] = moves[3 * limit + 1] = ''
+    return np.array([arc + move for arc in arcs for move in moves], dtype=object)
+
+
+def svg_path_data(outline: Outline, offset: int=0) -> str:
+    if not len(outline):
+        return ''
+    (_, entry, exit_) = outline.points(offset)
+    limit = int(np.abs(entry).max()) + 2
+    numbers = _half_tokens(limit)
+    table = _svg_tokens(limit)
+    ends = outline.ends()
+    horizontal = outline.turn_out % 2 == 0
+    following = np.roll(np.arange(len(entry)), -1)
+    following[ends] = outline.starts
+    step = np.where(horizontal, entry[following, 0] - exit_[:, 0], entry[following, 1] - exit_[:, 1])
+    # One gather per node into the cached token table instead of building
+    # each token from string pieces.
+    move = np.where(horizontal, step + limit, step + 3 * limit + 1)
+    move[ends] = 4 * limit + 2
+    arc = np.where(outline.rounded, outline.turn_in + 1, 0)
+    tokens = table[arc * (4 * limit + 3) + move]
+    starts = entry[outline.starts] + limit
+    tokens[outline.starts] = 'M' + numbers[starts[:, 0]] + ' ' + numbers[starts[:, 1]] + tokens[outline.starts]
+    return ''.join(tokens.tolist())
+
+
+@lru_cache(maxsize=8)
+def _digit_table(width: int, decimals: int=0) -> np.ndarray:
+    powers = 10 ** np.arange(width + decimals - 1, -1, -1)
+    digits = (np.arange(10 ** (width + decimals))[:, None] // powers % 10 + 48).astype(np.uint8)
+    if decimals:
+        digits = np.insert(digits, width, ord('.'), axis=1)
+    # Rows padded to eight bytes and viewed as one uint64 each, so a lookup
+    # gathers a machine word per number instead of copying bytes row by row.
+    padded = np.zeros((len(digits), 8), dtype=np.uint8)
+    padded[:, :digits.shape[1]] = digits
+    table = padded.view(np.uint64).ravel()
+    table.flags.writeable = False
+    return table
+
+
+def _fields(values: np.ndarray, width: int, decimals: int=0) -> np.ndarray:
+    # Zero-padded ASCII numbers looked up from a digit table; PDF accepts
+    # leading zeros, so every node of a kind has the same byte layout.
+    # values are integers already scaled by 10 ** decimals.
+    size = width + decimals + 1 if decimals else width
+    return _digit_table(width, decimals)[values].view(np.uint8).reshape(-1, 8)[:, :size]
+
+
+def _literal(text: str, count: int) -> np.ndarray:
+    return np.broadcast_to(np.frombuffer(text.encode('ascii'), dtype=np.uint8), (count, len(text)))
+
+
+def pdf_path_ops(outline: Outline, offset: int=0) -> bytes:
+    # Coordinates are emitted doubled (half modules); the caller scales by 1/2.
+    if not len(outline):
+        return b''
+    (_, entry, exit_) = outline.points(offset)
+    count = len(entry)
+    width = len(str(int(entry.max()) + 1))
+    ends = outline.ends()
+    following = np.roll(np.arange(count), -1)
+    following[ends] = outline.starts
+    first = np.zeros(count, dtype=bool)
+    first[outline.starts] = True
+    space = _literal(' ', count)
+
+    def point(points, decimals=0):
+        return [_fields(points[:, 0], width, decimals), space, _fields(points[:, 1], width, decimals), space]
+    # Control points in hundredths, kept in integers so no float is rounded.
+    bend = round(KAPPA * 2 * RADIUS * 100)
+    segments = [
+        (lambda: point(entry) + [_literal('m\n', count)], first),
+        (lambda: point(entry * 100 + bend * STEPS[outline.turn_in], 2) + point(exit_ * 100 - bend * STEPS[outline.turn_out], 2) + point(exit_) + [_literal('c\n', count)], outline.rounded),
+        (lambda: point(entry[following]) + [_literal('l\n', count)], ~ends & (entry[following] != exit_).any(axis=1)),
+        (lambda: [_literal('h\n', count)], ends),
+    ]
+    columns = []
+    keep = []
+    for (parts, include) in segments:
+        # Square modules never curve; skip formatting a column nobody keeps.
+        if not include.any():
+            continue
+        block = np.concatenate(parts(), axis=1)
+        columns.append(block)
+        keep.append(np.broadcast_to(include[:, None], block.shape))
+    return np.concatenate(columns, axis=1)[np.concatenate(keep, axis=1)].tobytes()
+
+
+def logo_placement(job: RenderJob, logo, total: int) -> tuple | None:
+    if logo is None:
+        return None
+    asset = logo if isinstance(logo, LogoAsset) else LogoAsset.from_image(logo)
+    pixels = total * job.box_size
+    logo_px = int(pixels * (job.logo_size / 100))
+    if logo_px == 0:
+        return None
+    (pos_x, pos_y) = logo_origin(pixels, pixels, logo_px, job.logo_position, job.logo_border)
+    embed_px = max(logo_px, min(max(asset.source.size), LOGO_EMBED_MAX))
+    scale = job.box_size
+    return (asset.variant(embed_px, job.logo_opacity), pos_x / scale, pos_y / scale, logo_px / scale)
+
+
+def page_points(job: RenderJob, total: int) -> float:
+    if job.size_mm:
+        return job.size_mm * 72 / MM_PER_INCH
+    return (job.size_px or total * job.box_size) * 72 / (job.dpi or PDF_DPI)
+
+
+def svg_size(job: RenderJob, total: int) -> str:
+    if job.size_mm or job.dpi:
+        return f'{_num(page_points(job, total) * MM_PER_INCH / 72)}mm'
+    return str(job.size_px or total * job.box_size)
+
+
+@metrics.timed('svg')
+def _asset(logo):
+    if logo is None or isinstance(logo, LogoAsset):
+        return logo
+    return LogoAsset.from_image(logo)
+
+
+def svg_document(job: RenderJob, matrix: QRMatrix=None, logo=None) -> str:
+    matrix = matrix or encode_matrix(job.data, job.error_correction)
+    total = matrix.size + 2 * job.border
+    side = svg_size(job, total)
+    fill = '#%02x%02x%02x' % _rgb(job.fill_color or 'black')
+    back = '#%02x%02x%02x' % _rgb(job.back_color or 'white')
+    logo = _asset(resolve_logo(job, logo))
+    placement = logo_placement(job, logo, total)
+    if placement is not None:
+        matrix = knockout_logo(matrix, job)
+    outline = trace_outline(matrix.modules, job.rounded_modules)
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" width="{side}" height="{side}" viewBox="0 0 {total} {total}">', f'<rect width="{total}" height="{total}" fill="{back}"/>', f'<path fill="{fill}" d="{svg_path_data(outline, job.border)}"/>']
+    if placement is not None:
+        (image, x, y, size) = placement
+        encoded = base64.b64encode(logo.png(image.width, job.logo_opacity)).decode('ascii')
+        parts.append(f'<image x="{_num(x)}" y="{_num(y)}" width="{_num(size)}" height="{_num(size)}" preserveAspectRatio="none" xlink:href="data:image/png;base64,{encoded}"/>')
+    parts.append('</svg>\n')
+    return '\n'.join(parts)
+
+
+def pdf_qr_content(job: RenderJob, matrix: QRMatrix, placement: tuple | None, logo_name: str='Logo') -> bytes:
+    if placement is not None:
+        matrix = knockout_logo(matrix, job)
+    outline = trace_outline(matrix.modules, job.rounded_modules)
+    total = matrix.size + 2 * job.border
+    ops = [f'{pdf_color(_rgb(job.back_color or "white"))} rg', f'0 0 {total} {total} re f', f'{pdf_color(_rgb(job.fill_color or "black"))} rg', 'q .5 0 0 .5 0 0 cm']
+    content = '\n'.join(ops).encode('latin-1') + b'\n' + pdf_path_ops(outline, job.border) + b'f Q\n'
+    if placement is not None:
+        (_, x, y, size) = placement
+        content += f'q {_num(size)} 0 0 {_num(-size)} {_num(x)} {_num(y + size)} cm /{logo_name} Do Q\n'.encode('latin-1')
+    return content
+
+
+@metrics.timed('pdf')
+def write_pdf(job: RenderJob, path: str, matrix: QRMatrix=None, logo=None):
+    matrix = matrix or encode_matrix(job.data, job.error_correction)
+    total = matrix.size + 2 * job.border
+    side = page_points(job, total)
+    scale = side / total
+    logo = _asset(resolve_logo(job, logo))
+    placement = logo_placement(job, logo, total)
+    with open(path, 'wb') as stream:
+        writer = PdfWriter(stream)
+        resources = ''
+        if placement is not None:
+            image = placement[0]
+            resources = f'/XObject << /Logo {writer.add_image(image, logo.encoded(image.width, job.logo_opacity, image_streams))} 0 R >>'
+        content = f'{_num(scale)} 0 0 {_num(-scale)} 0 {_num(side)} cm\n'.encode('latin-1') + pdf_qr_content(job, matrix, placement)
+        content_id = writer.add_stream('', content)
+        pages_id = writer.reserve()
+        page_id = writer.add(f'<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {_num(side)} {_num(side)}] /Resources << {resources} >> /Contents {content_id} 0 R >>')
+        writer.add(f'<< /Type /Pages /Kids [{page_id} 0 R] /Count 1 >>', pages_id)
+        writer.close(writer.add(f'<< /Type /Catalog /Pages {pages_id} 0 R >>'))
+
+
+def export_vector(job: RenderJob, path: str, logo=None) -> str:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.lower().endswith('.pdf'):
+        write_pdf(job, path, logo=logo)
+    else:
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(svg_document(job, logo=logo))
+    logger.info('Vector export saved to: %s', path)
+    return path
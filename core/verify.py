@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
+from PIL import Image
+from core.ec_policy import block_errors, correctable
+from core.encoder import data_positions, format_positions
+from core.generator import QRGenerator, QRMatrix, encode_matrix, fit_scale
+from core.metrics import metrics
+
+# Minimum luma gap between background and modules, as a fraction of full
+# scale; ISO/IEC 15415 grades symbol contrast below 40% as C or worse.
+MIN_CONTRAST = 0.4
+# Share of timing pattern modules that may be lost before the grid can no
+# longer be tracked reliably.
+TIMING_TOLERANCE = 0.25
+LUMA_WEIGHTS = (299, 587, 114)
+
+
+def luma(rgb: tuple) -> float:
+    return sum(channel * weight for (channel, weight) in zip(rgb, LUMA_WEIGHTS)) / 255000
+
+
+@lru_cache(maxsize=None)
+def check_positions(version: int) -> tuple:
+    count = version * 4 + 17
+    finders = np.zeros((count, count), dtype=bool)
+    finders[:7, :7] = finders[:7, -7:] = finders[-7:, :7] = True
+    timing = np.zeros((count, count), dtype=bool)
+    timing[6, 8:count - 8] = timing[8:count - 8, 6] = True
+    (format_rows, format_cols) = np.array(format_positions(count), dtype=np.intp).T
+    (rows, cols) = data_positions(version)
+    # Flat indices into the sampled grid: finders, timing, both format
+    # copies, and the data modules in placement order.
+    positions = (np.flatnonzero(finders), np.flatnonzero(timing), format_rows * count + format_cols, rows * count + cols)
+    for flat in positions:
+        flat.flags.writeable = False
+    return positions
+
+
+@dataclass(frozen=True)
+class ScanReport:
+    contrast: float
+    finder_errors: int
+    timing_errors: int
+    timing_modules: int
+    format_ok: bool
+    damaged: int
+    budget: int
+
+    @property
+    def issues(self) -> list:
+        issues = []
+        if self.contrast <= 0:
+            issues.append('modules lighter than the background')
+        elif self.contrast < MIN_CONTRAST:
+            issues.append(f'low contrast ({self.contrast:.0%})')
+        if self.finder_errors:
+            issues.append(f'{self.finder_errors} finder pattern modules damaged')
+        if self.timing_errors > self.timing_modules * TIMING_TOLERANCE:
+            issues.append(f'{self.timing_errors} of {self.timing_modules} timing modules damaged')
+        if not self.format_ok:
+            issues.append('both format information copies damaged')
+        if self.damaged > self.budget:
+            issues.append(f'{self.damaged} codewords lost in one block, {self.budget} correctable')
+        return issues
+
+    @property
+    def readable(self) -> bool:
+        return not self.issues
+
+
+def sample_modules(img: Image.Image, count: int, box_size: int, border: int, offset: int=0) -> np.ndarray:
+    start = offset + border * box_size
+    end = start + count * box_size
+    # Nearest-neighbour resize onto the module grid reads exactly one pixel,
+    # the centre, per module without converting the full image.
+    grid = img.resize((count, count), Image.Resampling.NEAREST, box=(start, start, end, end))
+    return np.asarray(grid if grid.mode == 'L' else grid.convert('L'))
+
+
+def verify_render(img: Image.Image, matrix: QRMatrix, box_size: int, border: int, fill_rgb: tuple, back_rgb: tuple, offset: int=0) -> ScanReport:
+    (fill, back) = (luma(fill_rgb), luma(back_rgb))
+    samples = sample_modules(img, matrix.size, box_size, border, offset)
+    dark = samples < (fill + back) * 127.5
+    wrong = (dark != matrix.modules if back > fill else dark == matrix.modules).ravel()
+    (finders, timing, format_bits, data_bits) = check_positions(matrix.version)
+    format_wrong = wrong[format_bits]
+    damaged = block_errors(matrix.version, matrix.error_correction, np.flatnonzero(wrong[data_bits]))
+    return ScanReport(contrast=back - fill, finder_errors=int(wrong[finders].sum()), timing_errors=int(wrong[timing].sum()), timing_modules=len(timing), format_ok=not format_wrong[:15].any() or not format_wrong[15:].any(), damaged=int(damaged.max()), budget=correctable(matrix.version, matrix.error_correction, 0))
+
+
+@metrics.timed('verify')
+def verify_job(job, img: Image.Image, generator: QRGenerator=None) -> ScanReport:
+    if generator is None:
+        generator = QRGenerator()
+    # Straight to the encoder cache so the 'encode' span counts each code once.
+    matrix = encode_matrix(job.data, job.error_correction, generator.engine)
+    size_px = job.target_px
+    if size_px:
+        (box_size, border) = fit_scale(matrix.size, size_px, job.border)
+        offset = max(size_px - (matrix.size + 2 * border) * box_size, 0) // 2
+    else:
+        (box_size, border, offset) = (job.box_size, job.border, 0)
+    return verify_render(img, matrix, box_size, border, generator._hex_to_rgb(job.fill_color or 'black'), generator._hex_to_rgb(job.back_color or 'white'), offset)
@@ -1,62 +1,141 @@
 import os
 import logging
-import time
-from PyQt6.QtCore import QThread, pyqtSignal
+import threading
+from dataclasses import dataclass
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal
 from PIL import Image, ImageDraw
+from core.cache import render_cache
 from core.generator import QRGenerator
-from core.logo_handler import add_logo
+from core.metrics import metrics
+from core.render import RenderCancelled, RenderJob, preview_job, render_job
 from ui.styles import DraculaTheme
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class RenderRequest:
+    request_id: int
+    job: RenderJob | None
+    logo_img: Image.Image | None = None
+    easter_egg: bool = False
+    preview_px: int | None = None
+
+
+def easter_egg_image() -> Image.Image:
+    size = 1000
+    img = Image.new('RGB', (size, size), color='black')
+    draw = ImageDraw.Draw(img)
+    center = size // 2
+    radius = 150
+    draw.ellipse((center - radius, center - radius, center + radius, center + radius), outline=DraculaTheme.PURPLE, width=10)
+    draw.ellipse((center - 50, center - 50, center + 50, center + 50), fill=DraculaTheme.PURPLE)
+    return img
+
+
 class QRWorker(QThread):
     finished = pyqtSignal(object, int)
     error = pyqtSignal(str, int)
+    superseded = pyqtSignal(int)
 
-    def __init__(self, request_id, data, ec, size, rounded, logo_img, logo_size, logo_opacity, logo_pos='center', easter_egg=False, fill_color='black', back_color='white'):
+    def __init__(self, cache=render_cache):
         super().__init__()
-        self.request_id = request_id
-        self.data = data
-        self.ec = ec
-        self.size = size
-        self.rounded = rounded
-        self.logo_img = logo_img
-        self.logo_size = logo_size
-        self.logo_opacity = logo_opacity
-        self.logo_pos = logo_pos
-        self.easter_egg = easter_egg
-        self.fill_color = fill_color
-        self.back_color = back_color
         self.generator = QRGenerator()
+        self.cache = cache
+        self._condition = threading.Condition()
+        self._pending = None
+        self._latest_id = None
+        self._running = True
+
+    def submit(self, request: RenderRequest):
+        with self._condition:
+            dropped = self._pending
+            self._pending = request
+            self._latest_id = request.request_id
+            self._condition.notify()
+        if dropped is not None:
+            self.superseded.emit(dropped.request_id)
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._pending = None
+            self._condition.notify()
+        self.wait()
+
+    def is_current(self, request_id: int) -> bool:
+        return request_id == self._latest_id
 
     def run(self):
-        worker_start = time.time()
+        while True:
+            with self._condition:
+                while self._pending is None and self._running:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                request = self._pending
+                self._pending = None
+            self._process(request)
+
+    @metrics.timed('worker')
+    def _process(self, request: RenderRequest):
+        request_id = request.request_id
         try:
-            logger.debug(f'Worker started for Request ID: {self.request_id}')
-            if self.easter_egg:
-                size = 1000
-                img = Image.new('RGB', (size, size), color='black')
-                draw = ImageDraw.Draw(img)
-                center = size // 2
-                radius = 150
-                draw.ellipse((center - radius, center - radius, center + radius, center + radius), outline=DraculaTheme.PURPLE, width=10)
-                draw.ellipse((center - 50, center - 50, center + 50, center + 50), fill=DraculaTheme.PURPLE)
-                self.finished.emit(img, self.request_id)
+            if request.easter_egg:
+                img = easter_egg_image()
             else:
-                qr_start = time.time()
-                qr_img = self.generator.generate_qr(data=self.data, error_correction=self.ec, box_size=10, border=4, fill_color=self.fill_color, back_color=self.back_color, rounded_modules=self.rounded)
-                qr_time = time.time() - qr_start
-                logger.info(f'QR generation: {qr_time*1000:.2f}ms')
-                
-                if self.logo_img:
-                    logo_start = time.time()
-                    qr_img = add_logo(qr_img, self.logo_img, self.logo_size, self.logo_opacity, position=self.logo_pos, border_width=40, back_color=self.back_color)
-                    logo_time = time.time() - logo_start
-                    logger.info(f'Logo overlay: {logo_time*1000:.2f}ms')
-                
-                self.finished.emit(qr_img, self.request_id)
-            
-            worker_total = time.time() - worker_start
-            logger.info(f'Worker total time: {worker_total*1000:.2f}ms (Request ID: {self.request_id})')
+                job = request.job
+                if request.preview_px:
+                    job = preview_job(job, self.generator.encode(job.data, job.error_correction).size, request.preview_px)
+                img = render_job(job, self.generator, request.logo_img, cache=self.cache, should_cancel=lambda: not self.is_current(request_id))
+            if not self.is_current(request_id):
+                raise RenderCancelled()
+            self.finished.emit(img, request_id)
+        except RenderCancelled:
+            logger.debug('Request ID %s superseded, result dropped', request_id)
+            self.superseded.emit(request_id)
         except Exception as e:
-            logger.error(f'Error in QRWorker (ID: {self.request_id}): {e}', exc_info=True)
-            self.error.emit(str(e), self.request_id)
\ No newline at end of file
+            logger.error('Error in QRWorker (ID: %s): %s', request_id, e, exc_info=True)
+            self.error.emit(str(e), request_id)
+
+
+class RenderScheduler(QObject):
+    finished = pyqtSignal(object, int)
+    error = pyqtSignal(str, int)
+
+    def __init__(self, debounce_ms: int=40, parent=None):
+        super().__init__(parent)
+        self.debounce_ms = debounce_ms
+        self.superseded_count = 0
+        self._queued = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._dispatch)
+        self.worker = QRWorker()
+        self.worker.finished.connect(self.finished)
+        self.worker.error.connect(self.error)
+        self.worker.superseded.connect(self._on_superseded)
+        self.worker.start()
+
+    def submit(self, request: RenderRequest, immediate: bool=False):
+        if self._queued is not None:
+            self._on_superseded(self._queued.request_id)
+        self._queued = request
+        if immediate:
+            self._timer.stop()
+            self._dispatch()
+        else:
+            self._timer.start(self.debounce_ms)
+
+    def shutdown(self):
+        self._timer.stop()
+        self._queued = None
+        self.worker.stop()
+
+    def _dispatch(self):
+        (request, self._queued) = (self._queued, None)
+        if request is not None:
+            self.worker.submit(request)
+
+    def _on_superseded(self, request_id: int):
+        self.superseded_count += 1
+        metrics.increment('superseded')
@@ -1,23 +1,25 @@
+import time
+START_TIME = time.perf_counter()
 import sys
 import os
 import platform
 import logging
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import qVersion
-import PIL
-from ui.main_window import MainWindow
 from core.logger import setup_logging
+from core.startup import StartupTimer
 
 def main():
+    timer = StartupTimer(START_TIME)
     setup_logging()
     logger = logging.getLogger(__name__)
     logger.info('=' * 40)
     logger.info('   QR CODE VOID GENERATOR - STARTUP   ')
     logger.info('=' * 40)
-    logger.info(f'Python Version: {sys.version}')
-    logger.info(f'OS: {platform.system()} {platform.release()} ({platform.version()})')
-    logger.info(f'PyQt6 Version: {qVersion()}')
-    logger.info(f'Pillow (PIL) Version: {PIL.__version__}')
+    logger.info('Python Version: %s', sys.version)
+    logger.info('OS: %s %s (%s)', platform.system(), platform.release(), platform.version())
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QTimer, qVersion
+    timer.mark('qt import')
+    logger.info('PyQt6 Version: %s', qVersion())
     logger.info('Initializing Asset Manager...')
     icon_path = os.path.join(os.path.dirname(__file__), 'assets', 'icon.png')
     try:
@@ -28,12 +30,23 @@ def main():
         if os.path.exists(icon_path):
             from PyQt6.QtGui import QIcon
             app.setWindowIcon(QIcon(icon_path))
+        timer.mark('qt init')
+        from ui.main_window import MainWindow
+        timer.mark('ui import')
         window = MainWindow()
+        timer.mark('window build')
         window.show()
         logger.info('Main window shown successfully.')
+
+        def first_frame():
+            timer.mark('first frame')
+            timer.log()
+            if '--startup-time' in sys.argv:
+                app.quit()
+        QTimer.singleShot(0, first_frame)
         sys.exit(app.exec())
     except Exception as e:
-        logger.critical(f'Fatal error during execution: {e}', exc_info=True)
+        logger.critical('Fatal error during execution: %s', e, exc_info=True)
         sys.exit(1)
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,91 @@
+"""Testes para core.batch."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.batch import build_parser, build_payload, job_defaults, read_rows, run_batch
+from core.payloads import PixPayload, WifiPayload
+
+
+def test_build_payload_texto_bruto():
+    assert build_payload({"data": "https://exemplo.com"}) == "https://exemplo.com"
+
+
+def test_build_payload_wifi_igual_ao_payload_direto():
+    row = {"type": "wifi", "ssid": "Rede", "password": "senha", "hidden": "true"}
+    assert build_payload(row) == WifiPayload("Rede", "senha", "WPA", True).to_string()
+
+
+def test_build_payload_pix_igual_ao_payload_direto():
+    row = {"type": "pix", "key": "teste@email.com", "name": "FULANO", "city": "SP", "amount": "10.50"}
+    esperado = PixPayload(key="teste@email.com", name="FULANO", city="SP", amount="10.50").to_string()
+    assert build_payload(row) == esperado
+
+
+def test_build_payload_social_usa_plataforma():
+    assert build_payload({"type": "social", "platform": "GitHub", "value": "@void"}) == "https://github.com/void"
+
+
+def test_build_payload_campo_obrigatorio_ausente():
+    with pytest.raises(ValueError):
+        build_payload({"type": "pix", "name": "FULANO", "city": "SP"})
+
+
+def test_read_rows_jsonl_marca_linhas_invalidas(tmp_path):
+    arquivo = tmp_path / "entrada.jsonl"
+    arquivo.write_text(json.dumps({"data": "a"}) + "\nnao-e-json\n", encoding="utf-8")
+    linhas = list(read_rows(str(arquivo)))
+    assert linhas[0] == {"data": "a"}
+    assert "__error__" in linhas[1]
+
+
+def test_run_batch_gera_arquivos_e_conta_falhas(tmp_path):
+    arquivo = tmp_path / "entrada.csv"
+    arquivo.write_text("type,data,filename\ntext,https://a.com,a.png\ntext,,\ntext,https://b.com,\n", encoding="utf-8")
+    saida = tmp_path / "saida"
+    feitos, falhas = run_batch(read_rows(str(arquivo)), str(saida), {"box_size": 2, "border": 1})
+    assert (feitos, falhas) == (2, 1)
+    assert (saida / "a.png").exists()
+    assert (saida / "000003.png").exists()
+
+
+def test_run_batch_tamanho_fisico(tmp_path):
+    from PIL import Image
+    arquivo = tmp_path / "entrada.csv"
+    arquivo.write_text("type,data,filename\ntext,https://a.com,a.png\n", encoding="utf-8")
+    opcoes = job_defaults(build_parser().parse_args([str(arquivo), "--size-mm", "20", "--dpi", "600"]))
+    run_batch(read_rows(str(arquivo)), str(tmp_path), opcoes)
+    with Image.open(tmp_path / "a.png") as imagem:
+        assert imagem.size == (472, 472)
+        assert round(imagem.info["dpi"][0]) == 600
+
+
+def test_batch_nao_importa_pyqt():
+    codigo = "import sys, core.batch; sys.exit(any(m.startswith('PyQt6') for m in sys.modules))"
+    raiz = Path(__file__).resolve().parent.parent
+    assert subprocess.run([sys.executable, "-c", codigo], cwd=raiz).returncode == 0
+
+
+def test_run_batch_correcao_automatica(tmp_path):
+    from PIL import Image
+    arquivo = tmp_path / "entrada.csv"
+    arquivo.write_text("type,data,filename\ntext,https://exemplo.com/produtos?id=1234567890,a.png\n", encoding="utf-8")
+    opcoes = job_defaults(build_parser().parse_args([str(arquivo), "--ec", "auto", "--box-size", "1", "--border", "0"]))
+    assert opcoes["error_correction"] == "AUTO"
+    run_batch(read_rows(str(arquivo)), str(tmp_path), opcoes)
+    with Image.open(tmp_path / "a.png") as imagem:
+        assert imagem.size == (29, 29)
+
+
+def test_cores_da_logo_fora_da_faixa_sao_recusadas(capsys):
+    assert build_parser().parse_args(["entrada.csv", "--logo-colors", "256"]).logo_colors == 256
+    for valor in ("0", "1", "257"):
+        with pytest.raises(SystemExit):
+            build_parser().parse_args(["entrada.csv", "--logo-colors", valor])
+    assert "2-256" in capsys.readouterr().err
@@ -0,0 +1,54 @@
+"""Testes para benchmarks.suite."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import benchmarks.suite
+from benchmarks.suite import compare, load_baseline, main, over_target, payload, run_suite, save_baseline, stage_totals
+from core.generator import encode_matrix
+
+
+def test_payload_v40_ocupa_a_maior_versao():
+    for nivel in "LMQH":
+        assert encode_matrix(payload("v40", nivel), nivel).version == 40
+
+
+def test_regressao_exige_razao_e_diferenca_minima():
+    base = {"draw/a": 0.010, "encode/a": 0.0001, "save_png/a": 0.050}
+    atual = {"draw/a": 0.020, "encode/a": 0.0005, "save_png/a": 0.060, "nova/a": 1.0}
+    regressoes = compare(base, atual, threshold=1.5, min_delta=0.002)
+    assert [item["stage"] for item in regressoes] == ["draw/a"]
+    assert regressoes[0]["ratio"] == 2.0
+
+
+def test_suite_mede_cada_etapa(tmp_path):
+    resultados = run_suite(sizes=("short",), levels=("M",), styles=("square",), stages=("encode", "draw", "add_logo", "save_png", "save_svg", "save_pdf"), repeat=1, budget=0)
+    assert set(resultados) == {"encode/short/M", "draw/short/M/square", "add_logo/short/M/square/logo", "save_png/short/M/square/plain", "save_png/short/M/square/logo", "save_svg/short/M/square/plain", "save_svg/short/M/square/logo", "save_pdf/short/M/square/plain", "save_pdf/short/M/square/logo"}
+    assert all(segundos > 0 for segundos in resultados.values())
+    assert set(stage_totals(resultados)) == {"encode", "draw", "add_logo", "save_png", "save_svg", "save_pdf"}
+    destino = tmp_path / "base.json"
+    save_baseline(str(destino), resultados)
+    assert load_baseline(str(destino))["results"] == resultados
+
+
+def test_casos_acima_da_meta():
+    resultados = {"save_svg/v40/M": 0.030, "save_pdf/v40/M": 0.012, "save_pdf/short/M": 0.002, "draw/v40/M": 0.5}
+    assert over_target(resultados, {"save_svg": 0.010, "save_pdf": 0.010}) == [("save_svg/v40/M", 0.030, 0.010), ("save_pdf/v40/M", 0.012, 0.010)]
+    assert over_target(resultados, {"save_svg": 0.010, "save_pdf": 0.001, "save_svg/v40": 0.040, "save_pdf/v40": 0.020}) == [("save_pdf/short/M", 0.002, 0.001)]
+
+
+def test_cli_falha_acima_da_meta(tmp_path, monkeypatch):
+    argumentos = ["--quick", "--stages", "encode", "--repeat", "1", "--baseline", str(tmp_path / "nenhuma.json")]
+    assert main(argumentos) == 0
+    monkeypatch.setattr(benchmarks.suite, "TARGETS", {"encode": 1e-9})
+    assert main(argumentos) == 1
+
+
+def test_cli_falha_com_regressao(tmp_path):
+    destino = tmp_path / "base.json"
+    save_baseline(str(destino), {"encode/short/M": 1e-9, "encode/v40/M": 1e-9})
+    argumentos = ["--quick", "--stages", "encode", "--repeat", "1", "--baseline", str(destino), "--min-delta-ms", "0"]
+    assert main(argumentos) == 1
+    assert main(argumentos + ["--threshold", "1e12"]) == 0
@@ -0,0 +1,63 @@
+"""Testes para core.cache."""
+
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.cache import RenderCache, logo_digest
+from core.render import RenderJob, job_key, render_job
+
+
+def _img(lado, cor="white"):
+    return Image.new("RGB", (lado, lado), cor)
+
+
+def test_lru_respeita_orcamento_em_bytes():
+    cache = RenderCache(max_bytes=3 * 10 * 10 * 2)
+    cache.put("a", _img(10))
+    cache.put("b", _img(10))
+    cache.get("a")
+    cache.put("c", _img(10))
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.evictions == 1
+    assert cache.current_bytes <= cache.max_bytes
+
+
+def test_estatisticas_de_hit_e_miss():
+    cache = RenderCache()
+    assert cache.get("x") is None
+    cache.put("x", _img(4))
+    assert cache.get("x") is not None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_camada_em_disco_sobrevive_a_nova_instancia(tmp_path):
+    RenderCache(disk_dir=str(tmp_path)).put("k", _img(5, "red"))
+    nova = RenderCache(disk_dir=str(tmp_path))
+    img = nova.get("k")
+    assert img.getpixel((0, 0)) == (255, 0, 0)
+    assert nova.disk_hits == 1
+
+
+def test_chave_muda_com_parametros_e_logo():
+    job = RenderJob(data="abc")
+    logo = _img(8, "blue")
+    assert job_key(job) == job_key(RenderJob(data="abc", output_path="outro.png"))
+    assert job_key(job) != job_key(RenderJob(data="abc", fill_color="#ff0000"))
+    assert job_key(job) != job_key(job, logo)
+    assert job_key(job, logo) != job_key(RenderJob(data="abc", logo_opacity=50), logo)
+    assert logo_digest(logo) != logo_digest(_img(8, "green"))
+
+
+def test_render_job_reaproveita_imagem_do_cache():
+    cache = RenderCache()
+    job = RenderJob(data="https://exemplo.com", box_size=2)
+    primeira = render_job(job, cache=cache)
+    segunda = render_job(job, cache=cache)
+    assert segunda is primeira
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,92 @@
+"""Testes para core.ec_policy."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+from qrcode import base
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.ec_policy import AUTO, DEFAULT_MARGIN, LEVEL_ORDER, choose_error_correction, correctable, damaged_codewords, resolve_error_correction
+from core.encoder import EC_LEVELS, codeword_blocks, plan_segments
+from core.generator import QRGenerator
+from core.layout import logo_area
+from core.logo_handler import add_logo
+from core.render import RenderJob
+
+URL = "https://exemplo.com/produtos/categoria/item?id=1234567890&ref=campanha-de-lancamento"
+
+
+def test_blocos_dos_codewords_seguem_a_tabela_rs():
+    for versao in (1, 5, 13, 40):
+        for nivel in EC_LEVELS.values():
+            blocos = base.rs_blocks(versao, nivel)
+            dono = codeword_blocks(versao, nivel)
+            assert len(dono) == sum(bloco.total_count for bloco in blocos)
+            assert np.bincount(dono).tolist() == [bloco.total_count for bloco in blocos]
+
+
+def test_sem_logo_usa_nivel_l():
+    escolha = choose_error_correction(URL)
+    assert escolha.level == "L"
+    assert escolha.version < escolha.baseline_version
+    assert escolha.saved_modules == (escolha.baseline_version * 4 + 17) ** 2 - (escolha.version * 4 + 17) ** 2
+
+
+def test_logo_central_escolhe_menor_nivel_seguro():
+    escolha = choose_error_correction(URL, logo_size=15)
+    assert escolha.safe
+    assert LEVEL_ORDER.index(escolha.level) < LEVEL_ORDER.index("H")
+    assert escolha.damaged <= correctable(escolha.version, escolha.level)
+    for nivel in LEVEL_ORDER[:LEVEL_ORDER.index(escolha.level)]:
+        (versao, _) = plan_segments(URL, EC_LEVELS[nivel])
+        area = logo_area(versao * 4 + 17, 15)
+        assert damaged_codewords(versao, nivel, area).max() > correctable(versao, nivel)
+
+
+def test_escolha_reaproveita_o_plano_de_segmentos():
+    dados = URL + "&cache=1"
+    plan_segments.cache_clear()
+    choose_error_correction(dados, logo_size=15)
+    assert plan_segments.cache_info().misses == len(LEVEL_ORDER)
+    choose_error_correction(dados, logo_size=20)
+    assert plan_segments.cache_info().misses == len(LEVEL_ORDER)
+    assert plan_segments(dados, EC_LEVELS["H"]) is plan_segments(dados, EC_LEVELS["H"])
+
+
+def test_margem_maior_nunca_baixa_o_nivel():
+    niveis = [LEVEL_ORDER.index(choose_error_correction(URL, 20, margin=margem).level) for margem in (0.0, DEFAULT_MARGIN, 0.6, 0.9)]
+    assert niveis == sorted(niveis)
+
+
+def test_logo_sobre_padrao_de_posicao_volta_para_h():
+    escolha = choose_error_correction(URL, logo_size=15, position="top-left")
+    assert (escolha.level, escolha.safe) == ("H", False)
+    assert escolha.saved_modules == 0
+
+
+def test_area_estimada_cobre_todos_os_modulos_alterados():
+    gerador = QRGenerator()
+    for (posicao, tamanho) in (("center", 15), ("bottom-right", 20), ("top", 25)):
+        matriz = gerador.encode(URL, "H")
+        imagem = gerador.render(matriz, 10, 4, rounded_modules=False).convert("RGB")
+        logo = Image.new("RGBA", (50, 50), (255, 0, 0, 255))
+        com_logo = add_logo(imagem.copy(), logo, tamanho, 100, posicao, 40).convert("RGB")
+        diferenca = np.any(np.asarray(imagem) != np.asarray(com_logo), axis=2)
+        lado = matriz.size
+        modulos = diferenca[40:40 + lado * 10, 40:40 + lado * 10].reshape(lado, 10, lado, 10).any(axis=(1, 3))
+        (topo, esquerda, base_, direita) = logo_area(lado, tamanho, posicao)
+        fora = modulos.copy()
+        fora[topo:base_, esquerda:direita] = False
+        assert modulos.any() and not fora.any()
+
+
+def test_resolve_so_altera_jobs_automaticos():
+    job = RenderJob(data=URL, error_correction="Q")
+    assert resolve_error_correction(job) == (job, None)
+    (resolvido, escolha) = resolve_error_correction(RenderJob(data=URL, error_correction=AUTO, logo_path="logo.png"))
+    assert resolvido.error_correction == escolha.level != AUTO
+    (sem_logo, escolha) = resolve_error_correction(RenderJob(data=URL, error_correction="auto"))
+    assert sem_logo.error_correction == "L"
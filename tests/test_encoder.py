@@ -0,0 +1,143 @@
+"""Testes para core.encoder."""
+
+import random
+import string
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import qrcode
+from qrcode import base, util
+from qrcode.exceptions import DataOverflowError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.encoder import EC_LEVELS, codewords, encode_modules, fit_version, optimal_segments, plan_segments, rs_remainders, segment_bits
+from core.generator import EC_MAP, QRGenerator
+from core.payloads import PixPayload
+
+ALFANUMERICO = string.digits + string.ascii_uppercase + " $%*+-./:"
+
+
+def referencia(dados, ec):
+    qr = qrcode.QRCode(error_correction=EC_MAP[ec], border=0)
+    qr.add_data(dados)
+    qr.make(fit=True)
+    return qr.version, np.array(qr.modules, dtype=bool)
+
+
+def amostras():
+    rng = random.Random(8)
+    dados = [
+        "0",
+        "HELLO WORLD",
+        "https://exemplo.com/" + "a" * 60,
+        "WIFI:T:WPA;S:Rede;P:senha;;",
+        "ção ñ 漢字 🎉" * 6,
+    ]
+    for tamanho in (7, 40, 150, 600, 1100):
+        dados.append("".join(rng.choice(string.digits) for _ in range(tamanho)))
+        dados.append("".join(rng.choice(ALFANUMERICO) for _ in range(tamanho)))
+        dados.append("".join(rng.choice(string.printable) for _ in range(tamanho)))
+        terco = tamanho // 3
+        dados.append(
+            "".join(rng.choice(string.digits) for _ in range(terco))
+            + "".join(rng.choice(string.ascii_lowercase) for _ in range(terco))
+            + "".join(rng.choice(ALFANUMERICO) for _ in range(terco))
+        )
+    return dados
+
+
+@pytest.mark.parametrize("ec", ["L", "M", "Q", "H"])
+def test_matriz_identica_ao_qrcode(ec):
+    for dados in amostras():
+        try:
+            esperado = referencia(dados, ec)
+        except DataOverflowError:
+            with pytest.raises(DataOverflowError):
+                encode_modules(dados, ec)
+            continue
+        versao, modulos = encode_modules(dados, ec)
+        assert versao == esperado[0]
+        assert np.array_equal(modulos, esperado[1]), (dados[:20], ec)
+
+
+@pytest.mark.parametrize("versao", [1, 5, 10, 27, 40])
+def test_codewords_identicos_ao_create_data(versao):
+    nivel = EC_LEVELS["Q"]
+    capacidade = sum(bloco.data_count for bloco in base.rs_blocks(versao, nivel))
+    dados = "x" * (capacidade - 3)
+    segmentos = list(util.optimal_data_chunks(dados, minimum=20))
+    esperado = util.create_data(versao, nivel, list(util.optimal_data_chunks(dados, minimum=20)))
+    assert codewords(segmentos, versao, nivel).tolist() == esperado
+
+
+def test_versao_por_capacidade_igual_ao_best_fit():
+    for tamanho in range(0, 2900, 37):
+        segmentos = list(util.optimal_data_chunks("9" * tamanho, minimum=20))
+        qr = qrcode.QRCode(error_correction=EC_MAP["L"])
+        qr.add_data("9" * tamanho)
+        assert fit_version(segmentos, EC_LEVELS["L"]) == qr.best_fit()
+
+
+def test_resto_reed_solomon_de_bloco_zerado():
+    blocos = np.zeros((2, 10), dtype=np.uint8)
+    assert not rs_remainders(blocos, 7).any()
+
+
+def test_dados_grandes_demais_estouram():
+    with pytest.raises(DataOverflowError):
+        encode_modules("x" * 3000, "H")
+
+
+def test_motores_do_gerador_concordam():
+    rapido = QRGenerator(engine="fast").encode("https://exemplo.com/motor", "M")
+    original = QRGenerator(engine="qrcode").encode("https://exemplo.com/motor", "M")
+    assert rapido.version == original.version
+    assert np.array_equal(rapido.modules, original.modules)
+
+
+@pytest.mark.parametrize("ec", ["L", "H"])
+def test_segmentacao_otima_confere_com_qrcode(ec):
+    for dados in amostras():
+        try:
+            padrao = encode_modules(dados, ec)[0]
+        except DataOverflowError:
+            continue
+        (versao, segmentos) = plan_segments(dados, EC_LEVELS[ec])
+        qr = qrcode.QRCode(error_correction=EC_MAP[ec], border=0)
+        for segmento in segmentos:
+            qr.add_data(segmento)
+        qr.make(fit=True)
+        assert versao == qr.version <= padrao
+        assert np.array_equal(encode_modules(dados, ec, optimal=True)[1], np.array(qr.modules, dtype=bool)), (dados[:20], ec)
+
+
+def _menor_custo(dados, classe):
+    modos = {util.MODE_NUMBER: set(b"0123456789"), util.MODE_ALPHA_NUM: set(util.ALPHA_NUM), util.MODE_8BIT_BYTE: set(range(256))}
+    melhor = [0] + [None] * len(dados)
+    for fim in range(1, len(dados) + 1):
+        for inicio in range(fim):
+            for (modo, permitidos) in modos.items():
+                if melhor[inicio] is not None and set(dados[inicio:fim]) <= permitidos:
+                    custo = melhor[inicio] + segment_bits(util.QRData(dados[inicio:fim], mode=modo, check_data=False), classe)
+                    if melhor[fim] is None or custo < melhor[fim]:
+                        melhor[fim] = custo
+    return melhor[-1]
+
+
+def test_segmentacao_otima_e_minima():
+    rng = random.Random(21)
+    classe = util.mode_sizes_for_version(1)
+    for _ in range(300):
+        dados = bytes(rng.choice(b"0123456789AB:a") for _ in range(rng.randint(1, 14)))
+        segmentos = optimal_segments(dados, classe)
+        assert b"".join(segmento.data for segmento in segmentos) == dados
+        assert sum(segment_bits(segmento, classe) for segmento in segmentos) == _menor_custo(dados, classe)
+
+
+def test_pix_cabe_em_versao_menor():
+    dados = PixPayload(key="12345678909", name="LOJA EXEMPLO", city="RECIFE", amount="19.90", txid="PEDIDO123").to_string()
+    assert encode_modules(dados, "H", optimal=True)[0] < encode_modules(dados, "H")[0]
+    assert QRGenerator().encode(dados, "H").version == encode_modules(dados, "H", optimal=True)[0]
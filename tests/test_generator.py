@@ -0,0 +1,36 @@
+"""Testes para core.generator."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.generator import QRGenerator, encode_matrix
+
+
+def test_encode_reaproveita_matriz_por_dados_e_ec():
+    gerador = QRGenerator()
+    matriz = gerador.encode("https://exemplo.com/encode", "M")
+    assert gerador.encode("https://exemplo.com/encode", "M") is matriz
+    assert gerador.encode("https://exemplo.com/encode", "H") is not matriz
+    assert matriz.size == 17 + 4 * matriz.version
+
+
+def test_matriz_e_imutavel():
+    matriz = QRGenerator().encode("imutavel")
+    with pytest.raises(ValueError):
+        matriz.modules[0, 0] = False
+
+
+def test_reestilizar_nao_recodifica():
+    gerador = QRGenerator()
+    matriz = gerador.encode("https://exemplo.com/estilo")
+    antes = encode_matrix.cache_info()
+    for cor in ("#000000", "#440d5c", "#ff0000"):
+        gerador.generate_qr("https://exemplo.com/estilo", fill_color=cor, box_size=2)
+    depois = encode_matrix.cache_info()
+    assert depois.misses == antes.misses
+    assert depois.hits == antes.hits + 3
+    assert gerador.render(matriz, box_size=2, border=1).size == ((matriz.size + 2) * 2,) * 2
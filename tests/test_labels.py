@@ -0,0 +1,72 @@
+"""Testes para core.labels."""
+
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.batch import main
+from core.labels import MM, SheetLayout, fit_caption, pdf_string, text_width, write_label_sheet
+from core.render import RenderJob
+
+
+def etiquetas(quantidade, **opcoes):
+    for i in range(quantidade):
+        yield RenderJob(data=f"https://exemplo.com/{i}", **opcoes), f"Etiqueta {i}"
+
+
+def test_paginas_pela_grade(tmp_path):
+    destino = tmp_path / "folha.pdf"
+    paginas = write_label_sheet(etiquetas(13), str(destino), SheetLayout(rows=3, cols=2))
+    conteudo = destino.read_bytes()
+    assert paginas == 3
+    assert conteudo.count(b"/Type /Page ") == 3
+    assert b"/Count 3" in conteudo
+
+
+def test_logo_compartilhada_entre_paginas(tmp_path):
+    destino = tmp_path / "folha.pdf"
+    logo = Image.new("RGBA", (40, 40), (255, 0, 0, 255))
+    write_label_sheet(etiquetas(10, logo_size=20), str(destino), SheetLayout(rows=2, cols=2), logo=logo)
+    conteudo = destino.read_bytes()
+    assert conteudo.count(b"/Subtype /Image") == 1
+    assert conteudo.count(b"/Logo0 ") == 3
+
+
+def test_folha_vazia_ainda_e_pdf_valido(tmp_path):
+    destino = tmp_path / "vazia.pdf"
+    assert write_label_sheet([], str(destino)) == 1
+    assert destino.read_bytes().rstrip().endswith(b"%%EOF")
+
+
+def test_celulas_respeitam_margens():
+    layout = SheetLayout(page="Letter", rows=2, cols=3, margin_mm=10, gap_mm=5)
+    esquerda, topo, largura, altura = layout.cell(0)
+    assert esquerda == pytest.approx(10 * MM)
+    assert topo == pytest.approx(792 - 10 * MM)
+    ultima = layout.cell(5)
+    assert ultima[0] + ultima[2] == pytest.approx(612 - 10 * MM)
+    assert ultima[1] - ultima[3] == pytest.approx(10 * MM)
+
+
+def test_legenda_longa_e_truncada():
+    texto = fit_caption("Rede de convidados do evento principal", 8, 60)
+    assert texto.endswith("...")
+    assert text_width(texto, 8) <= 60
+
+
+def test_pdf_string_escapa_parenteses_e_acentos():
+    assert pdf_string("a(b)\\ção") == "(a\\(b\\)\\\\" + "ção".encode("cp1252").decode("latin-1") + ")"
+
+
+def test_batch_gera_folha(tmp_path):
+    entrada = tmp_path / "redes.csv"
+    entrada.write_text("type,ssid,password,caption\nwifi,Rede,senha,Sala 1\nwifi,,x,Sem SSID\n", encoding="utf-8")
+    destino = tmp_path / "saida" / "folha.pdf"
+    assert main([str(entrada), "--sheet", str(destino), "--grid", "2x2", "--page", "Letter"]) == 1
+    conteudo = destino.read_bytes()
+    assert conteudo.startswith(b"%PDF")
+    assert b"/Count 1" in conteudo
@@ -0,0 +1,76 @@
+"""Testes para core.layout."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.ec_policy import LEVEL_ORDER, choose_error_correction
+from core.encoder import function_patterns
+from core.generator import QRGenerator
+from core.layout import knockout, knockout_logo, logo_area
+from core.render import RenderJob, render_job
+from core.vector import svg_document
+
+URL = "https://exemplo.com/produtos/categoria/item?id=1234567890&ref=campanha-de-lancamento"
+LOGO = Image.new("RGBA", (64, 64), (200, 30, 30, 0))
+
+
+def test_folga_amplia_a_area_da_logo():
+    (topo, esquerda, base, direita) = logo_area(37, 15)
+    assert logo_area(37, 15, pad=2) == (topo - 2, esquerda - 2, base + 2, direita + 2)
+    assert logo_area(37, 15, pad=40) == (0, 0, 37, 37)
+    assert logo_area(37, 0) is None
+
+
+def test_knockout_limpa_modulos_e_preserva_padroes():
+    matriz = QRGenerator().encode(URL, "H")
+    area = logo_area(matriz.size, 30, pad=1)
+    limpa = knockout(matriz, area)
+    (topo, esquerda, base, direita) = area
+    reservado = function_patterns(matriz.version)[1]
+    regiao = limpa.modules[topo:base, esquerda:direita]
+    assert not regiao[~reservado[topo:base, esquerda:direita]].any()
+    assert np.array_equal(limpa.modules[reservado], matriz.modules[reservado])
+    assert limpa.cleared == int((~reservado[topo:base, esquerda:direita]).sum())
+    assert matriz.cleared == 0 and matriz.modules[topo:base, esquerda:direita].any()
+    assert knockout(matriz, None) is matriz
+
+
+def test_render_deixa_o_fundo_sob_a_logo():
+    gerador = QRGenerator()
+    job = RenderJob(data=URL, logo_size=20, logo_pad=1, back_color="#ffffff", rounded_modules=False)
+    matriz = knockout_logo(gerador.encode(URL, "H"), job)
+    assert matriz.cleared > 0
+    imagem = np.asarray(render_job(job, gerador, LOGO).convert("RGB"))
+    (topo, esquerda, base, direita) = logo_area(matriz.size, 20, pad=1)
+    reservado = function_patterns(matriz.version)[1][topo:base, esquerda:direita]
+    regiao = imagem[(topo + 4) * 10:(base + 4) * 10, (esquerda + 4) * 10:(direita + 4) * 10]
+    centros = regiao[5::10, 5::10]
+    assert (centros[~reservado] == 255).all()
+    sem_knockout = np.asarray(render_job(RenderJob(data=URL, logo_size=20, logo_knockout=False, rounded_modules=False), gerador, LOGO).convert("RGB"))
+    assert (sem_knockout[(topo + 4) * 10:(base + 4) * 10, (esquerda + 4) * 10:(direita + 4) * 10][5::10, 5::10] == 0).any()
+
+
+def test_logo_translucida_mantem_os_modulos():
+    gerador = QRGenerator()
+    matriz = gerador.encode(URL, "H")
+    for opacidade in (0, 50, 99):
+        job = RenderJob(data=URL, logo_size=20, logo_opacity=opacidade, logo_pad=2)
+        assert knockout_logo(matriz, job) is matriz
+        sem_knockout = RenderJob(data=URL, logo_size=20, logo_opacity=opacidade, logo_knockout=False)
+        assert render_job(job, gerador, LOGO).tobytes() == render_job(sem_knockout, gerador, LOGO).tobytes()
+    assert knockout_logo(matriz, RenderJob(data=URL, logo_size=20)).cleared > 0
+
+
+def test_vetorial_usa_a_mesma_matriz_limpa():
+    job = RenderJob(data=URL, logo_size=20)
+    assert svg_document(job, logo=LOGO) != svg_document(RenderJob(data=URL, logo_size=20, logo_knockout=False), logo=LOGO)
+
+
+def test_folga_entra_na_escolha_da_correcao():
+    niveis = [LEVEL_ORDER.index(choose_error_correction(URL, 15, pad=folga).level) for folga in (0, 1, 2, 3)]
+    assert niveis == sorted(niveis)
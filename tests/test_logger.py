@@ -0,0 +1,75 @@
+"""Testes para core.logger."""
+
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.logger import parse_levels, setup_logging, stop_logging
+from core.pool import RenderPool
+from core.render import RenderJob
+
+
+@pytest.fixture
+def registro(tmp_path):
+    raiz = logging.getLogger()
+    nivel = raiz.level
+    yield tmp_path / "app.log"
+    stop_logging()
+    raiz.setLevel(nivel)
+    for nome in ("core.generator", "core.render", "PIL", "core.server"):
+        logging.getLogger(nome).setLevel(logging.NOTSET)
+
+
+def test_parse_levels():
+    assert parse_levels("core.pool=DEBUG, core.cache=warning") == {"core.pool": logging.DEBUG, "core.cache": logging.WARNING}
+    assert parse_levels("INFO") == {"": logging.INFO}
+    assert parse_levels("") == {}
+    with pytest.raises(ValueError):
+        parse_levels("core.pool=ALTO")
+
+
+def test_modo_batch_silencia_caminho_quente(registro):
+    setup_logging("batch", levels={"core.server": logging.DEBUG}, log_file=str(registro))
+    assert not logging.getLogger("core.generator").isEnabledFor(logging.INFO)
+    assert logging.getLogger("core.render").isEnabledFor(logging.WARNING)
+    assert logging.getLogger("core.server").isEnabledFor(logging.DEBUG)
+    assert logging.getLogger("core.batch").isEnabledFor(logging.INFO)
+    setup_logging("batch", verbose=True, log_file=str(registro))
+    assert logging.getLogger("core.generator").isEnabledFor(logging.DEBUG)
+
+
+def test_fila_grava_em_segundo_plano(registro):
+    setup_logging("batch", log_file=str(registro))
+    logger = logging.getLogger("core.batch")
+    for indice in range(50):
+        logger.info("linha %d de %s", indice, "teste")
+    logging.getLogger("core.generator").info("nunca gravada")
+    stop_logging()
+    linhas = registro.read_text(encoding="utf-8").splitlines()
+    assert len(linhas) == 50
+    assert linhas[-1].endswith("linha 49 de teste")
+    assert not any("nunca" in linha for linha in linhas)
+
+
+def test_argumentos_nao_formatados_quando_nivel_desligado(registro):
+    class Caro:
+        def __str__(self):
+            raise AssertionError("formatado sem necessidade")
+
+    setup_logging("batch", log_file=str(registro))
+    logging.getLogger("core.render").debug("valor %s", Caro())
+
+
+def test_registros_dos_processos_chegam_ao_arquivo(registro):
+    setup_logging("batch", log_file=str(registro))
+    setup_logging("batch", log_file=str(registro))
+    assert len(logging.getLogger().handlers) == 1
+    jobs = [RenderJob(data=f"https://exemplo.com/{indice}", box_size=2, logo_path="/inexistente.png") for indice in range(2)]
+    with RenderPool(workers=2, chunk_size=1) as pool:
+        assert all(resultado.ok for resultado in pool.map(jobs))
+    stop_logging()
+    assert registro.read_text(encoding="utf-8").count("Error loading logo") == 2
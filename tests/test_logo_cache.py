@@ -0,0 +1,86 @@
+"""Testes para core.logo_cache e LogoAsset."""
+
+import os
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.logo_cache import LogoCache
+from core.logo_handler import LogoAsset, add_logo
+
+
+def _salvar_logo(caminho, cor):
+    Image.new("RGBA", (64, 64), cor).save(caminho)
+    return str(caminho)
+
+
+def test_reaproveita_asset_ate_o_arquivo_mudar(tmp_path):
+    caminho = _salvar_logo(tmp_path / "logo.png", (255, 0, 0, 255))
+    cache = LogoCache()
+    primeiro = cache.load(caminho)
+    assert cache.load(caminho) is primeiro
+    _salvar_logo(caminho, (0, 0, 255, 255))
+    os.utime(caminho, ns=(1, 1))
+    segundo = cache.load(caminho)
+    assert segundo is not primeiro
+    assert segundo.source.getpixel((0, 0)) == (0, 0, 255, 255)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_arquivo_inexistente_retorna_none(tmp_path):
+    assert LogoCache().load(str(tmp_path / "nao-existe.png")) is None
+
+
+def test_variantes_sao_memorizadas():
+    asset = LogoAsset(Image.new("RGBA", (64, 64), (10, 20, 30, 255)), "teste")
+    variante = asset.variant(16, 50)
+    assert asset.variant(16, 50) is variante
+    assert variante.size == (16, 16)
+    assert variante.getpixel((8, 8))[3] in (127, 128)
+    png = asset.png(16, 50)
+    assert asset.png(16, 50) is png
+    assert png.startswith(b"\x89PNG")
+
+
+def test_add_logo_com_asset_igual_a_imagem():
+    qr = Image.new("RGB", (200, 200), "white")
+    logo = Image.new("RGBA", (50, 50), (200, 0, 0, 255))
+    esperado = add_logo(qr.copy(), logo, 20, 60)
+    obtido = add_logo(qr.copy(), LogoAsset(logo, "teste"), 20, 60)
+    assert obtido.tobytes() == esperado.tobytes()
+
+
+def test_add_logo_altera_so_a_regiao_da_logo():
+    from core.generator import QRGenerator
+    from core.logo_handler import logo_origin
+    gerador = QRGenerator()
+    matriz = gerador.encode("https://exemplo.com", "H")
+    logo = Image.radial_gradient("L").convert("RGBA")
+    for paleta in (False, True):
+        base = gerador.render(matriz, 10, 4, "#440d5c", "#ffffff", palette=paleta)
+        imagem = base.copy()
+        assert add_logo(imagem, logo, 20, 60, "bottom-right", 40, palette_colors=32) is imagem
+        assert imagem.mode == base.mode
+        tamanho = int(imagem.width * 0.2)
+        (x, y) = logo_origin(imagem.width, imagem.height, tamanho, "bottom-right", 40)
+        regiao = (x, y, x + tamanho, y + tamanho)
+        assert imagem.crop(regiao).tobytes() != base.crop(regiao).tobytes()
+        fora = Image.new("L", imagem.size, 255)
+        fora.paste(0, regiao)
+        vazio = Image.new(base.mode, base.size)
+        assert Image.composite(imagem, vazio, fora).tobytes() == Image.composite(base, vazio, fora).tobytes()
+        if paleta:
+            cores = len(base.getpalette())
+            assert imagem.getpalette()[:cores] == base.getpalette()
+            assert len(imagem.getpalette()) // 3 <= 32
+
+
+def test_add_logo_rgba_com_logo_passando_da_borda():
+    logo = Image.new("RGBA", (50, 50), (200, 0, 0, 255))
+    rgb = add_logo(Image.new("RGB", (100, 100), "white"), logo, 95, 100, "right")
+    rgba = add_logo(Image.new("RGBA", (100, 100), "white"), logo, 95, 100, "right")
+    assert rgba.convert("RGB").tobytes() == rgb.tobytes()
+    assert rgba.getpixel((0, 50)) == (200, 0, 0, 255)
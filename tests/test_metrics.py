@@ -0,0 +1,79 @@
+"""Testes para core.metrics."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.batch import main
+from core.metrics import NULL_SPAN, Histogram, Metrics, metrics
+
+
+@pytest.fixture
+def metricas_globais():
+    estado = metrics.enabled
+    metrics.reset()
+    yield metrics
+    metrics.enabled = estado
+    metrics.reset()
+
+
+def test_desativado_nao_registra_nada():
+    medidor = Metrics(enabled=False)
+    assert medidor.span("encode") is NULL_SPAN
+    with medidor.span("encode"):
+        pass
+    medidor.increment("cache_hit")
+    medidor.observe("draw", 0.1)
+    assert medidor.timed("x")(lambda: 42)() == 42
+    assert medidor.snapshot() == {"counters": {}, "stages": {}}
+
+
+def test_percentis_do_histograma():
+    histograma = Histogram()
+    for milissegundos in range(1, 101):
+        histograma.observe(milissegundos / 1000)
+    assert histograma.count == 100
+    assert histograma.percentile(50) == pytest.approx(0.050, rel=0.2)
+    assert histograma.percentile(99) == pytest.approx(0.099, rel=0.2)
+    assert histograma.percentile(100) == pytest.approx(0.100)
+    assert Histogram().percentile(50) == 0.0
+
+
+def test_spans_e_contadores():
+    medidor = Metrics(enabled=True)
+    with medidor.span("encode"):
+        pass
+    medidor.timed("draw")(lambda: None)()
+    medidor.increment("superseded", 2)
+    resumo = medidor.snapshot()
+    assert resumo["counters"] == {"superseded": 2}
+    assert set(resumo["stages"]) == {"draw", "encode"}
+    assert resumo["stages"]["encode"]["count"] == 1
+
+
+def test_exportacao_prometheus():
+    medidor = Metrics(enabled=True)
+    for segundos in (0.001, 0.002, 0.5):
+        medidor.observe("render", segundos)
+    medidor.increment("cache_hit")
+    texto = medidor.to_prometheus()
+    assert 'void_qr_events_total{event="cache_hit"} 1' in texto
+    assert 'void_qr_stage_seconds_bucket{stage="render",le="+Inf"} 3' in texto
+    assert 'void_qr_stage_seconds_count{stage="render"} 3' in texto
+    cumulativos = [int(linha.rsplit(" ", 1)[1]) for linha in texto.splitlines() if "_bucket{" in linha]
+    assert cumulativos == sorted(cumulativos)
+
+
+def test_batch_grava_metricas(tmp_path, metricas_globais):
+    entrada = tmp_path / "linhas.csv"
+    entrada.write_text("type,data\ntext,a\ntext,b\n", encoding="utf-8")
+    destino = tmp_path / "metricas.json"
+    assert main([str(entrada), "-o", str(tmp_path / "saida"), "-j", "1", "--metrics", str(destino)]) == 0
+    resumo = json.loads(destino.read_text(encoding="utf-8"))
+    assert resumo["stages"]["job"]["count"] == 2
+    assert resumo["stages"]["encode"]["count"] == 2
+    assert resumo["counters"]["cache_miss"] == 2
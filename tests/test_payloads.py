@@ -5,7 +5,21 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from core.payloads import CRC16, PixPayload
+import random
+
+import pytest
+
+from core.payloads import CRC16, PixBuilder, PixPayload
+
+
+def crc16_bit_a_bit(payload):
+    crc = 0xFFFF
+    for byte in (payload + "6304").encode("utf-8"):
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = (crc << 1) ^ 0x1021 if crc & 0x8000 else crc << 1
+        crc &= 0xFFFF
+    return f"{crc:04X}"
 
 
 def test_crc16_retorna_4_hex_chars():
@@ -64,3 +78,32 @@ def test_pix_payload_txid_default_e_asteriscos():
         city="SP",
     )
     assert payload.txid == "***"
+
+
+def test_crc16_igual_a_implementacao_bit_a_bit():
+    rng = random.Random(11)
+    for tamanho in (0, 1, 7, 64, 300):
+        texto = "".join(rng.choice("abcXYZ019 çã@.") for _ in range(tamanho))
+        assert CRC16.calculate(texto) == crc16_bit_a_bit(texto)
+
+
+def test_crc16_vetor_conhecido_ccitt_false():
+    assert CRC16.update(b"123456789") == 0x29B1
+
+
+@pytest.mark.parametrize(
+    "amount,txid",
+    [(None, "***"), ("10.5", "PEDIDO1"), ("0", ""), ("abc", "X"), (12, "NF-é 99"), ("1999.999", "A" * 25)],
+)
+def test_pix_builder_igual_ao_pix_payload(amount, txid):
+    builder = PixBuilder("teste@email.com", "Fulano de Tal Comércio LTDA", "São Paulo")
+    esperado = PixPayload(key="teste@email.com", name="Fulano de Tal Comércio LTDA", city="São Paulo", amount=amount, txid=txid).to_string()
+    assert builder.build(amount, txid) == esperado
+
+
+def test_pix_builder_em_massa_confere_crc():
+    builder = PixBuilder("+5511999999999", "LOJA", "RIO")
+    linhas = [(f"{i / 100:.2f}", f"FAT{i}") for i in range(1, 500)]
+    for (amount, txid), payload in zip(linhas, builder.build_many(linhas)):
+        assert payload[-4:] == crc16_bit_a_bit(payload[:-8])
+        assert payload == PixPayload(key="+5511999999999", name="LOJA", city="RIO", amount=amount, txid=txid).to_string()
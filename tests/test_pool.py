@@ -0,0 +1,39 @@
+"""Testes para core.pool."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.pool import RenderPool
+from core.render import RenderJob, render_job
+
+
+def _jobs(n):
+    return [RenderJob(data=f"https://exemplo.com/{i}", box_size=2, border=1) for i in range(n)]
+
+
+def test_imap_ordenado_preserva_ordem_e_pixels():
+    jobs = _jobs(6)
+    with RenderPool(workers=2, chunk_size=2, max_pending=2) as pool:
+        resultados = pool.map(jobs)
+    assert [r.index for r in resultados] == list(range(6))
+    assert all(r.ok for r in resultados)
+    assert resultados[3].image.tobytes() == render_job(jobs[3]).tobytes()
+
+
+def test_imap_desordenado_entrega_todos():
+    with RenderPool(workers=2, chunk_size=1) as pool:
+        indices = sorted(r.index for r in pool.imap(_jobs(5), ordered=False))
+    assert indices == list(range(5))
+
+
+def test_imap_salva_em_disco_e_reporta_erros(tmp_path):
+    jobs = [
+        RenderJob(data="ok", box_size=2, output_path=str(tmp_path / "ok.png")),
+        RenderJob(data="x" * 5000, box_size=2, output_path=str(tmp_path / "grande.png")),
+    ]
+    with RenderPool(workers=1) as pool:
+        resultados = pool.map(jobs, save=True)
+    assert resultados[0].ok and Path(resultados[0].path).exists()
+    assert not resultados[1].ok
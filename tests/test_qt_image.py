@@ -0,0 +1,56 @@
+"""Testes para core.qt_image."""
+
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+QtGui = pytest.importorskip("PyQt6.QtGui")
+(QColor, QImage) = (QtGui.QColor, QtGui.QImage)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.qt_image import native_mode, to_qimage
+
+
+def _amostra(modo):
+    imagem = Image.new("RGBA", (13, 7), (255, 255, 255, 255))
+    for x in range(13):
+        imagem.putpixel((x, x % 7), (200, 30, 90, 128 if x % 2 else 255))
+    if modo == "RGBA":
+        return imagem
+    if modo == "P":
+        return imagem.convert("RGB").convert("P", palette=Image.Palette.ADAPTIVE, colors=4)
+    return imagem.convert(modo)
+
+
+@pytest.mark.parametrize("modo, formato", [("RGBA", QImage.Format.Format_RGBA8888), ("RGB", QImage.Format.Format_RGB888), ("L", QImage.Format.Format_Grayscale8), ("1", QImage.Format.Format_Mono), ("P", QImage.Format.Format_Indexed8)])
+def test_formato_nativo_e_pixels_identicos(modo, formato):
+    imagem = _amostra(modo)
+    qimagem = to_qimage(imagem)
+    assert qimagem.format() == formato
+    assert (qimagem.width(), qimagem.height()) == imagem.size
+    rgba = imagem.convert("RGBA")
+    for y in range(imagem.height):
+        for x in range(imagem.width):
+            cor = QColor.fromRgba(qimagem.pixel(x, y))
+            (r, g, b, a) = rgba.getpixel((x, y))
+            assert (cor.red(), cor.green(), cor.blue()) == (r, g, b)
+            if modo == "RGBA":
+                assert cor.alpha() == a
+
+
+def test_modos_sem_formato_nativo_sao_convertidos():
+    assert native_mode(Image.new("LA", (2, 2))) == "RGBA"
+    assert native_mode(Image.new("CMYK", (2, 2))) == "RGB"
+    paleta = Image.new("P", (2, 2))
+    paleta.info["transparency"] = 0
+    assert native_mode(paleta) == "RGBA"
+    assert to_qimage(paleta).format() == QImage.Format.Format_RGBA8888
+
+
+def test_buffer_sobrevive_ao_original():
+    qimagem = to_qimage(Image.new("RGB", (5, 3), (1, 2, 3)))
+    assert QColor(qimagem.pixel(4, 2)).getRgb()[:3] == (1, 2, 3)
+    assert QColor(qimagem.copy().pixel(0, 0)).getRgb()[:3] == (1, 2, 3)
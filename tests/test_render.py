@@ -0,0 +1,95 @@
+"""Testes para core.render."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.generator import QRGenerator, fit_scale, target_pixels
+from core.render import RenderJob, preview_job, render_job, save_render
+
+
+def test_caixa_cabe_no_alvo():
+    assert fit_scale(21, 560, 4) == (19, 4)
+    assert fit_scale(177, 560, 4) == (3, 4)
+    assert fit_scale(21, 300, 4) == (10, 4)
+    assert fit_scale(25, 300, 4) == (9, 4)
+    assert fit_scale(21, 57, 4) == (1, 18)
+    assert fit_scale(177, 100, 4)[0] == 1
+
+
+def test_tamanho_fisico_em_pixels():
+    assert target_pixels(size_px=300) == 300
+    assert target_pixels(size_mm=30, dpi=600) == 709
+    assert target_pixels(size_mm=25.4) == 300
+    assert target_pixels() is None
+
+
+def test_previa_renderiza_no_tamanho_do_rotulo():
+    gerador = QRGenerator()
+    job = RenderJob(data="https://exemplo.com/" + "x" * 300, logo_border=40)
+    modulos = gerador.encode(job.data, job.error_correction).size
+    previa = preview_job(job, modulos, 560)
+    assert previa.box_size == 560 // (modulos + 8)
+    assert previa.logo_border == 40 * previa.box_size // 10
+    imagem = render_job(previa, gerador)
+    assert imagem.width <= 560
+    assert imagem.width == (modulos + 8) * previa.box_size
+    assert render_job(job, gerador).width == (modulos + 8) * 10
+
+
+def test_previa_sem_mudanca_devolve_o_mesmo_job():
+    job = RenderJob(data="x", box_size=19)
+    assert preview_job(job, 21, 560) is job
+
+
+def test_tamanho_exato_sem_reamostragem(tmp_path):
+    job = RenderJob(data="https://exemplo.com", error_correction="M", size_px=300, fill_color="#000000", back_color="#ffffff", rounded_modules=False)
+    imagem = render_job(job)
+    assert imagem.size == (300, 300)
+    assert set(cor for _, cor in imagem.getcolors()) == {(0, 0, 0), (255, 255, 255)}
+
+
+def test_tamanho_menor_que_o_codigo_e_recusado():
+    dados = "https://exemplo.com/" + "a" * 600
+    matriz = QRGenerator().encode(dados, "M")
+    minimo = matriz.size + 8
+    with pytest.raises(ValueError, match=f"{minimo}px"):
+        render_job(RenderJob(data=dados, error_correction="M", size_px=minimo - 1))
+    assert render_job(RenderJob(data=dados, error_correction="M", size_px=minimo)).size == (minimo, minimo)
+
+
+def test_dpi_gravado_no_png_e_no_pdf(tmp_path):
+    from PIL import Image
+    job = RenderJob(data="https://exemplo.com", size_mm=30, dpi=600, output_path=str(tmp_path / "qr.png"))
+    imagem = render_job(job)
+    assert imagem.size == (709, 709)
+    with Image.open(save_render(job, imagem)) as salvo:
+        assert tuple(round(valor) for valor in salvo.info["dpi"]) == (600, 600)
+    pdf = RenderJob(data="https://exemplo.com", size_mm=30, output_path=str(tmp_path / "qr.pdf"))
+    conteudo = open(save_render(pdf, render_job(pdf)), "rb").read()
+    assert b"/MediaBox [ 0 0 84.96 84.96 ]" in conteudo
+
+
+def test_paleta_com_logo_preserva_cores_dos_modulos(tmp_path):
+    from PIL import Image
+    from core.logo_handler import LogoAsset
+    logo = LogoAsset.from_image(Image.radial_gradient("L").convert("RGBA"))
+    job = RenderJob(data="https://exemplo.com", fill_color="#440d5c", palette=True, logo_colors=16, output_path=str(tmp_path / "qr.png"), png_compress_level=9)
+    imagem = render_job(job, logo=logo)
+    assert imagem.mode == "P"
+    cores = {cor for _, cor in imagem.convert("RGB").getcolors(maxcolors=256)}
+    assert len(cores) <= 16
+    assert {(0x44, 0x0D, 0x5C), (255, 255, 255)} <= cores
+    rgb = render_job(RenderJob(data="https://exemplo.com", fill_color="#440d5c", output_path=str(tmp_path / "rgb.png")), logo=logo)
+    assert Path(save_render(job, imagem)).stat().st_size < Path(save_render(RenderJob(data="x", output_path=str(tmp_path / "rgb.png")), rgb)).stat().st_size
+
+
+def test_opcoes_de_png_ficam_fora_da_chave():
+    from core.render import job_key, save_options
+    assert job_key(RenderJob(data="x")) == job_key(RenderJob(data="x", png_compress_level=9, png_optimize=True))
+    assert job_key(RenderJob(data="x")) != job_key(RenderJob(data="x", palette=True))
+    assert save_options("a.png", 300, 9, True) == {"dpi": (300, 300), "compress_level": 9, "optimize": True}
+    assert save_options("a.pdf", 300, 9, True) == {"resolution": 300.0}
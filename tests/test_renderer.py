@@ -0,0 +1,37 @@
+"""Testes para core.renderer."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.generator import QRGenerator
+
+
+@pytest.mark.parametrize("rounded", [True, False])
+@pytest.mark.parametrize("box_size", [1, 3, 10])
+@pytest.mark.parametrize("cores", [("black", "white"), ("#440d5c", "#ffffff"), ("#ffffff", "#000000")])
+def test_numpy_identico_ao_styled_pil(rounded, box_size, cores):
+    fill, back = cores
+    kwargs = dict(box_size=box_size, border=2, fill_color=fill, back_color=back, rounded_modules=rounded)
+    rapido = QRGenerator().generate_qr("https://exemplo.com/void?id=42", **kwargs)
+    referencia = QRGenerator(renderer="styled").generate_qr("https://exemplo.com/void?id=42", **kwargs)
+    assert rapido.mode == referencia.mode
+    assert rapido.size == referencia.size
+    assert rapido.tobytes() == referencia.tobytes()
+
+
+@pytest.mark.parametrize("rounded", [True, False])
+@pytest.mark.parametrize("box_size", [1, 3, 10])
+def test_paleta_identica_ao_rgb(rounded, box_size):
+    gerador = QRGenerator()
+    matriz = gerador.encode("https://exemplo.com/void?id=42")
+    rgb = gerador.render(matriz, box_size, 2, "#440d5c", "#ffffff", rounded)
+    paleta = gerador.render(matriz, box_size, 2, "#440d5c", "#ffffff", rounded, palette=True)
+    assert paleta.mode == "P"
+    assert paleta.getpalette()[:3] == [255, 255, 255]
+    assert paleta.convert("RGB").tobytes() == rgb.tobytes()
+    if not rounded:
+        assert len(paleta.getcolors()) == 2
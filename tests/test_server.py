@@ -0,0 +1,150 @@
+"""Testes para core.server."""
+
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.loadtest import percentile, request_paths, run_load
+from core.server import HttpError, RenderServer, request_job
+
+
+@pytest.fixture
+def servidor():
+    executor = ThreadPoolExecutor(max_workers=2)
+    server = RenderServer(executor=executor)
+    yield server
+    executor.shutdown()
+
+
+async def pedir(porta, caminho, metodo="GET", cabecalhos=None, corpo=b""):
+    (reader, writer) = await asyncio.open_connection("127.0.0.1", porta)
+    linhas = [f"{metodo} {caminho} HTTP/1.1", "Host: teste", "Connection: close", f"Content-Length: {len(corpo)}"]
+    linhas += [f"{nome}: {valor}" for nome, valor in (cabecalhos or {}).items()]
+    writer.write(("\r\n".join(linhas) + "\r\n\r\n").encode() + corpo)
+    resposta = await reader.read()
+    writer.close()
+    (cabeca, _, dados) = resposta.partition(b"\r\n\r\n")
+    (status, *resto) = cabeca.decode().split("\r\n")
+    return int(status.split()[1]), {k.lower(): v for k, v in (linha.split(": ", 1) for linha in resto)}, dados
+
+
+def com_servidor(server, corrotina):
+    async def executar():
+        tcp = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        porta = tcp.sockets[0].getsockname()[1]
+        async with tcp:
+            return await corrotina(porta)
+    return asyncio.run(executar())
+
+
+def test_png_com_etag_e_304(servidor):
+    async def cenario(porta):
+        primeira = await pedir(porta, "/qr?type=wifi&ssid=Casa&password=segredo")
+        segunda = await pedir(porta, "/qr?type=wifi&ssid=Casa&password=segredo", cabecalhos={"If-None-Match": primeira[1]["etag"]})
+        return primeira, segunda
+    (primeira, segunda) = com_servidor(servidor, cenario)
+    assert primeira[0] == 200
+    assert primeira[1]["content-type"] == "image/png"
+    assert primeira[1]["cache-control"].startswith("public, max-age=")
+    assert Image.open(BytesIO(primeira[2])).format == "PNG"
+    assert segunda[0] == 304
+    assert segunda[2] == b""
+    assert servidor.renders == 1
+
+
+def test_svg_por_post_json(servidor):
+    corpo = json.dumps({"type": "pix", "key": "chave@exemplo.com", "name": "Loja", "city": "Recife", "amount": "9.90", "format": "svg"}).encode()
+    (status, cabecalhos, dados) = com_servidor(servidor, lambda porta: pedir(porta, "/qr", "POST", corpo=corpo))
+    assert status == 200
+    assert cabecalhos["content-type"] == "image/svg+xml"
+    assert dados.startswith(b"<svg")
+
+
+def test_parametros_invalidos_dao_400(servidor):
+    async def cenario(porta):
+        return [await pedir(porta, caminho) for caminho in ("/qr?type=pix&key=a", "/qr?data=x&box_size=999", "/qr?data=x&format=gif", "/nada")]
+    respostas = com_servidor(servidor, cenario)
+    assert [status for status, _, _ in respostas] == [400, 400, 400, 404]
+    assert "name" in json.loads(respostas[0][2])["error"]
+
+
+def test_dados_grandes_demais_dao_413(servidor, caplog):
+    async def cenario(porta):
+        return [await pedir(porta, f"/qr?data={'x' * 5000}{extra}") for extra in ("", "&ec=auto", "&format=svg")]
+    respostas = com_servidor(servidor, cenario)
+    assert [status for status, _, _ in respostas] == [413, 413, 413]
+    assert "does not fit" in json.loads(respostas[0][2])["error"]
+    assert "ERROR" not in caplog.text
+
+
+def test_tamanho_pequeno_demais_da_400(servidor):
+    caminho = f"/qr?data=https://exemplo.com/{'a' * 600}&size_px=100"
+    (status, _, dados) = com_servidor(servidor, lambda porta: pedir(porta, caminho))
+    assert status == 400
+    assert "larger than the requested 100px" in json.loads(dados)["error"]
+
+
+def test_requisicoes_identicas_renderizam_uma_vez(servidor):
+    async def cenario():
+        (job, fmt) = request_job({"data": "https://exemplo.com/dedup"})
+        etag = servidor.etag(job, fmt)
+        return await asyncio.gather(*(servidor.render(job, fmt, etag) for _ in range(5)))
+    resultados = asyncio.run(cenario())
+    assert len(set(resultados)) == 1
+    assert servidor.renders == 1
+    assert servidor.deduplicated == 4
+
+
+def test_fila_cheia_responde_503():
+    executor = ThreadPoolExecutor(max_workers=1)
+    servidor = RenderServer(executor=executor, max_queue=1)
+
+    async def cenario():
+        jobs = [request_job({"data": f"fila {i}"}) for i in range(3)]
+        return await asyncio.gather(*(servidor.render(job, fmt, servidor.etag(job, fmt)) for job, fmt in jobs), return_exceptions=True)
+    resultados = asyncio.run(cenario())
+    executor.shutdown()
+    assert isinstance(resultados[0], bytes)
+    assert all(isinstance(erro, HttpError) and erro.status == 503 for erro in resultados[1:])
+    assert servidor.rejected == 2
+
+
+def test_logo_restrita_ao_diretorio(tmp_path):
+    Image.new("RGBA", (20, 20), (255, 0, 0, 255)).save(tmp_path / "marca.png")
+    (job, _) = request_job({"data": "x", "logo": "marca.png"}, str(tmp_path))
+    assert job.logo_path == str(tmp_path / "marca.png")
+    for nome in ("../marca.png", "inexistente.png"):
+        with pytest.raises(ValueError):
+            request_job({"data": "x", "logo": nome}, str(tmp_path))
+    with pytest.raises(ValueError):
+        request_job({"data": "x", "logo": "marca.png"})
+
+
+def test_correcao_automatica_resolvida_na_requisicao(tmp_path):
+    Image.new("RGBA", (20, 20), (255, 0, 0, 255)).save(tmp_path / "marca.png")
+    (sem_logo, _) = request_job({"data": "https://exemplo.com", "ec": "auto"})
+    assert sem_logo.error_correction == "L"
+    (com_logo, _) = request_job({"data": "https://exemplo.com", "ec": "auto", "logo": "marca.png"}, str(tmp_path))
+    assert com_logo.error_correction in ("M", "Q", "H")
+
+
+def test_teste_de_carga_reporta_latencias(servidor):
+    relatorio = com_servidor(servidor, lambda porta: run_load(f"http://127.0.0.1:{porta}", requests=40, concurrency=4, paths=request_paths(5)))
+    assert relatorio["requests"] == 40
+    assert relatorio["statuses"] == {"200": 40}
+    assert relatorio["p50_ms"] <= relatorio["p99_ms"]
+    assert servidor.renders == 5
+
+
+def test_percentil():
+    assert percentile([], 50) == 0.0
+    assert percentile([3, 1, 2, 4], 50) == 2
+    assert percentile(list(range(1, 101)), 99) == 99
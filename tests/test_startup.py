@@ -0,0 +1,41 @@
+"""Testes para core.startup."""
+
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.startup import StartupTimer
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def test_relatorio_por_etapa():
+    timer = StartupTimer(start=10.0)
+    timer.marks = [("qt import", 10.05), ("window build", 10.2)]
+    fases = timer.report()
+    assert round(fases["qt import"]) == 50
+    assert round(fases["window build"]) == 150
+    assert round(fases["total"]) == 200
+
+
+def test_aviso_acima_da_meta(caplog):
+    timer = StartupTimer(start=0.0)
+    timer.marks = [("first frame", 0.5)]
+    with caplog.at_level(logging.INFO, logger="core.startup"):
+        timer.log(target_ms=300)
+        timer.log(target_ms=1000)
+    assert [registro.levelno for registro in caplog.records] == [logging.WARNING, logging.INFO]
+
+
+def test_janela_nao_importa_pipeline_de_renderizacao():
+    pytest.importorskip("PyQt6")
+    codigo = "import sys; import ui.main_window; print(','.join(m for m in ('core.generator', 'numpy', 'PIL.Image', 'PyQt6.QtPrintSupport') if m in sys.modules))"
+    ambiente = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, env=ambiente, capture_output=True, text=True, check=True)
+    assert saida.stdout.strip() == ""
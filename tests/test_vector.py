@@ -0,0 +1,116 @@
+"""Testes para core.vector."""
+
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.generator import encode_matrix
+from core.render import RenderJob
+from core.vector import svg_document, trace_outline, write_pdf
+
+
+def matriz_vazia(tamanho=21):
+    return np.zeros((tamanho, tamanho), dtype=bool)
+
+
+def area_assinada(contorno):
+    area = 0
+    limites = list(contorno.starts) + [len(contorno.x)]
+    for inicio, fim in zip(limites, limites[1:]):
+        x = contorno.x[inicio:fim].astype(float)
+        y = contorno.y[inicio:fim].astype(float)
+        area += (np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+    return area
+
+
+def test_modulo_isolado_vira_um_circulo():
+    modulos = matriz_vazia()
+    modulos[10, 10] = True
+    contorno = trace_outline(modulos)
+    assert len(contorno) == 1
+    assert len(contorno.x) == 4
+    assert contorno.rounded.all()
+
+
+def test_anel_tem_contorno_externo_e_buraco():
+    modulos = matriz_vazia()
+    modulos[9:12, 9:12] = True
+    modulos[10, 10] = False
+    contorno = trace_outline(modulos, rounded=False)
+    assert len(contorno) == 2
+    assert area_assinada(contorno) == 8
+
+
+def test_toque_diagonal_separa_regioes():
+    modulos = matriz_vazia()
+    modulos[10, 10] = True
+    modulos[11, 11] = True
+    contorno = trace_outline(modulos)
+    assert len(contorno) == 2
+    assert contorno.rounded.all()
+
+
+def test_area_do_contorno_igual_aos_modulos_escuros():
+    matriz = encode_matrix("https://exemplo.com/vetor", "M")
+    contorno = trace_outline(matriz.modules, rounded=False)
+    assert area_assinada(contorno) == matriz.modules.sum()
+
+
+def test_olhos_nao_sao_arredondados():
+    matriz = encode_matrix("olhos", "H")
+    contorno = trace_outline(matriz.modules)
+    limite = 7
+    olho = (contorno.x <= limite) & (contorno.y <= limite)
+    assert olho.any()
+    assert not contorno.rounded[olho].any()
+    assert contorno.rounded[~olho].any()
+
+
+def test_svg_com_cores_e_logo_embutida_uma_vez():
+    logo = Image.new("RGBA", (32, 32), (255, 0, 0, 128))
+    job = RenderJob(data="https://exemplo.com/svg", fill_color="#440d5c", back_color="#ffffff", logo_size=20)
+    svg = svg_document(job, logo=logo)
+    raiz = ET.fromstring(svg)
+    ns = "{http://www.w3.org/2000/svg}"
+    assert len(raiz.findall(f"{ns}path")) == 1
+    assert raiz.find(f"{ns}path").get("fill") == "#440d5c"
+    assert raiz.find(f"{ns}rect").get("fill") == "#ffffff"
+    assert len(raiz.findall(f"{ns}image")) == 1
+    total = encode_matrix(job.data, job.error_correction).size + 2 * job.border
+    assert raiz.get("viewBox") == f"0 0 {total} {total}"
+
+
+def test_svg_sem_logo_e_pequeno():
+    svg = svg_document(RenderJob(data="https://exemplo.com"))
+    assert "<image" not in svg
+    assert len(svg) < 10_000
+
+
+def test_pdf_valido_com_logo_compartilhada(tmp_path):
+    destino = tmp_path / "qr.pdf"
+    logo = Image.new("RGBA", (32, 32), (0, 0, 255, 200))
+    write_pdf(RenderJob(data="https://exemplo.com/pdf"), str(destino), logo=logo)
+    conteudo = destino.read_bytes()
+    assert conteudo.startswith(b"%PDF-1.4")
+    assert conteudo.rstrip().endswith(b"%%EOF")
+    assert conteudo.count(b"/Subtype /Image") == 2
+    assert b"/SMask" in conteudo
+    inicio_xref = int(re.search(rb"startxref\n(\d+)", conteudo).group(1))
+    entradas = re.findall(rb"(\d{10}) 00000 n", conteudo[inicio_xref:])
+    for numero, deslocamento in enumerate(entradas, start=1):
+        assert conteudo[int(deslocamento):].startswith(f"{numero} 0 obj".encode())
+
+
+def test_tamanho_fisico_no_svg_e_no_pdf(tmp_path):
+    raiz = ET.fromstring(svg_document(RenderJob(data="https://exemplo.com", size_mm=30)))
+    assert raiz.get("width") == "30mm"
+    assert ET.fromstring(svg_document(RenderJob(data="https://exemplo.com", size_px=300))).get("width") == "300"
+    caminho = tmp_path / "qr.pdf"
+    write_pdf(RenderJob(data="https://exemplo.com", size_mm=25.4), str(caminho))
+    assert b"/MediaBox [0 0 72 72]" in caminho.read_bytes()
@@ -0,0 +1,79 @@
+"""Testes para core.verify."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.batch import read_rows, run_batch
+from core.generator import QRGenerator
+from core.render import RenderJob, render_job
+from core.verify import sample_modules, verify_job
+
+URL = "https://exemplo.com/produtos/categoria/item?id=1234567890&ref=campanha-de-lancamento"
+LOGO = Image.new("RGBA", (64, 64), (200, 30, 30, 255))
+
+
+def test_amostra_le_o_centro_de_cada_modulo():
+    gerador = QRGenerator()
+    matriz = gerador.encode(URL, "M")
+    for arredondado in (True, False):
+        imagem = gerador.render(matriz, 7, 3, rounded_modules=arredondado)
+        amostras = sample_modules(imagem, matriz.size, 7, 3)
+        assert np.array_equal(amostras < 128, matriz.modules)
+
+
+def test_codigos_sem_logo_passam():
+    gerador = QRGenerator()
+    for opcoes in ({}, {"rounded_modules": False}, {"palette": True}, {"size_px": 300}, {"size_mm": 20, "dpi": 300}):
+        job = RenderJob(data=URL, **opcoes)
+        relatorio = verify_job(job, render_job(job, gerador), gerador)
+        assert relatorio.readable
+        assert (relatorio.finder_errors, relatorio.timing_errors, relatorio.damaged) == (0, 0, 0)
+
+
+def test_logo_central_cabe_no_orcamento():
+    gerador = QRGenerator()
+    job = RenderJob(data=URL, logo_size=15)
+    relatorio = verify_job(job, render_job(job, gerador, LOGO), gerador)
+    assert 0 < relatorio.damaged <= relatorio.budget
+    assert relatorio.readable
+
+
+def test_logo_no_canto_cobre_padrao_de_posicao():
+    gerador = QRGenerator()
+    job = RenderJob(data=URL, logo_size=15, logo_position="top-left")
+    relatorio = verify_job(job, render_job(job, gerador, LOGO), gerador)
+    assert relatorio.finder_errors > 0
+    assert not relatorio.readable
+
+
+def test_dano_alem_da_correcao_e_baixo_contraste():
+    gerador = QRGenerator()
+    job = RenderJob(data=URL, error_correction="L", rounded_modules=False)
+    imagem = render_job(job, gerador).copy()
+    lado = imagem.width
+    ImageDraw.Draw(imagem).rectangle((lado // 3, lado // 3, 2 * lado // 3, 2 * lado // 3), fill=(0, 0, 0))
+    relatorio = verify_job(job, imagem, gerador)
+    assert relatorio.damaged > relatorio.budget
+    assert not relatorio.readable
+    claro = RenderJob(data=URL, fill_color="#cccccc")
+    relatorio = verify_job(claro, render_job(claro, gerador), gerador)
+    assert relatorio.contrast < 0.4
+    assert not relatorio.readable
+
+
+def test_lote_avisa_codigos_ilegiveis(tmp_path, caplog):
+    arquivo = tmp_path / "entrada.csv"
+    arquivo.write_text("type,data,filename\ntext,https://a.com,a.png\ntext,https://b.com,b.png\n", encoding="utf-8")
+    opcoes = {"box_size": 2, "logo_size": 20, "logo_position": "top-left", "logo_border": 0}
+    with caplog.at_level("WARNING", logger="core.batch"):
+        assert run_batch(read_rows(str(arquivo)), str(tmp_path), opcoes, LOGO) == (2, 0)
+    assert "2 codes may not scan" in caplog.text
+    caplog.clear()
+    with caplog.at_level("WARNING", logger="core.batch"):
+        run_batch(read_rows(str(arquivo)), str(tmp_path), opcoes, LOGO, verify=False)
+    assert "may not scan" not in caplog.text
@@ -0,0 +1,71 @@
+"""Testes para core.worker."""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt6.QtCore")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.render import RenderCancelled, RenderJob, render_job
+from core.worker import QRWorker, RenderRequest, RenderScheduler
+
+URL = "https://exemplo.com/produtos/categoria/item?id=1234567890"
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication(sys.argv[:1])
+
+
+def _esperar(app, condicao, limite=5.0):
+    fim = time.monotonic() + limite
+    while not condicao() and time.monotonic() < fim:
+        app.processEvents()
+        time.sleep(0.005)
+    app.processEvents()
+
+
+def test_render_cancelado_antes_de_codificar():
+    with pytest.raises(RenderCancelled):
+        render_job(RenderJob(data=URL), should_cancel=lambda: True)
+    chamadas = []
+
+    def cancelar_depois_do_qr():
+        chamadas.append(1)
+        return len(chamadas) > 1
+    with pytest.raises(RenderCancelled):
+        render_job(RenderJob(data=URL), should_cancel=cancelar_depois_do_qr)
+
+
+def test_worker_descarta_resultado_superado(app):
+    worker = QRWorker(cache=None)
+    (finalizados, superados) = ([], [])
+    worker.finished.connect(lambda imagem, indice: finalizados.append(indice))
+    worker.superseded.connect(superados.append)
+    antigo = RenderRequest(1, RenderJob(data=URL))
+    worker.submit(antigo)
+    worker.submit(RenderRequest(2, RenderJob(data=URL + "&v=2")))
+    worker._process(antigo)
+    assert finalizados == []
+    assert superados == [1, 1]
+
+
+def test_agendador_entrega_so_o_ultimo_pedido(app):
+    agendador = RenderScheduler(debounce_ms=20)
+    (finalizados, erros) = ([], [])
+    agendador.finished.connect(lambda imagem, indice: finalizados.append(indice))
+    agendador.error.connect(lambda mensagem, indice: erros.append(indice))
+    try:
+        for indice in range(1, 4):
+            agendador.submit(RenderRequest(indice, RenderJob(data=f"{URL}&v={indice}")))
+        agendador.submit(RenderRequest(4, RenderJob(data=f"{URL}&v=4")), immediate=True)
+        _esperar(app, lambda: finalizados or erros)
+        _esperar(app, lambda: False, 0.1)
+    finally:
+        agendador.shutdown()
+    assert (finalizados, erros) == ([4], [])
+    assert agendador.superseded_count == 3
@@ -3,6 +3,7 @@ from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout, QDialog, QGridLayout,
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QSize, QUrl
 from PyQt6.QtGui import QIcon, QPixmap, QPainter, QColor, QDesktopServices, QPainterPath
 from ui.styles import DraculaTheme
+from core.metrics import metrics
 import random
 
 class SocialPlatformSelector(QWidget):
@@ -142,6 +143,35 @@ class Toast(QWidget):
     def hide_toast(self):
         self.hide()
 
+class MetricsOverlay(QLabel):
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+        self.setStyleSheet(f'background-color: rgba(33, 34, 44, 225); color: {DraculaTheme.GREEN}; font-family: monospace; font-size: 11px; border: 1px solid {DraculaTheme.COMMENT}; border-radius: 6px; padding: 6px;')
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self.timer.stop()
+            self.hide()
+            return
+        metrics.enabled = True
+        self.refresh()
+        self.show()
+        self.raise_()
+        self.timer.start(500)
+
+    def refresh(self):
+        lines = metrics.summary_lines() or ['Sem medições ainda: gere um QR Code.']
+        self.setText('\n'.join(lines))
+        self.adjustSize()
+        self.move(8, 8)
+
+
 class PreviewLabel(QLabel):
     leftClicked = pyqtSignal()
     actionRequested = pyqtSignal(str)
@@ -184,7 +214,10 @@ class PreviewLabel(QLabel):
         if not self.original_pixmap:
             self.clear()
             return
-        scaled_pixmap = self.original_pixmap.scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        scaled_pixmap = self.original_pixmap
+        # Previews are rendered to fit the label; only rescale what does not.
+        if scaled_pixmap.width() > self.width() or scaled_pixmap.height() > self.height():
+            scaled_pixmap = scaled_pixmap.scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
         rounded = QPixmap(scaled_pixmap.size())
         rounded.fill(Qt.GlobalColor.transparent)
         painter = QPainter(rounded)
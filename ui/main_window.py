@@ -1,18 +1,16 @@
 import os
 import sys
+from dataclasses import replace
 from PyQt6.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QListWidget, QStackedWidget, QLabel, QLineEdit, QPushButton, QFrame, QFileDialog, QColorDialog, QSlider, QGroupBox, QCheckBox, QListWidgetItem, QScrollArea, QComboBox, QGridLayout, QSizePolicy, QDialog
 from PyQt6.QtCore import Qt, QSize, QTimer, QUrl
-from PyQt6.QtPrintSupport import QPrinter, QPrintDialog
-from PyQt6.QtGui import QIcon, QPixmap, QColor, QAction, QImage, QPainter, QDesktopServices
-from PIL import Image
+from PyQt6.QtGui import QIcon, QPixmap, QColor, QAction, QImage, QPainter, QDesktopServices, QKeySequence, QShortcut
 import logging
 logger = logging.getLogger(__name__)
 from ui.styles import DraculaTheme
-from ui.components import Toast, PreviewLabel, ClickableLabel, LogoPositionSelector, SocialPlatformSelector, LogoLabel
-from core.worker import QRWorker
-from core.utils import save_image_dialog, copy_to_clipboard, pil_to_qpixmap, get_wifi_ssid_linux
+from ui.components import Toast, PreviewLabel, ClickableLabel, LogoPositionSelector, SocialPlatformSelector, LogoLabel, MetricsOverlay
 from core.payloads import WifiPayload, PixPayload, SocialPayload
 from core.config import cfg
+SVG_RASTER_SIZE = 1000
 
 class MainWindow(QMainWindow):
 
@@ -28,12 +26,30 @@ class MainWindow(QMainWindow):
         self.theme = DraculaTheme()
         self.setStyleSheet(self.theme.STYLESHEET)
         self.current_qr_image = None
+        self.current_preview = None
+        self.current_request = None
+        self.latest_request = None
         self.logo_path = None
         self.fg_color = '#440d5c'
         self.bg_color = '#ffffff'
         self.request_id_counter = 0
+        # The render pipeline (numpy, qrcode, PIL) is imported after the
+        # window is on screen, while the user has not typed anything yet.
+        self.scheduler = None
         self.setup_ui()
-        QTimer.singleShot(500, lambda : self.generate_qr(manual=False))
+        QTimer.singleShot(500, self.finish_startup)
+
+    def finish_startup(self):
+        self.ensure_scheduler()
+        self.generate_qr(manual=False)
+
+    def ensure_scheduler(self):
+        if self.scheduler is None:
+            from core.worker import RenderScheduler
+            self.scheduler = RenderScheduler(parent=self)
+            self.scheduler.finished.connect(self.on_generation_finished)
+            self.scheduler.error.connect(self.on_generation_error)
+        return self.scheduler
 
     def setup_ui(self):
         central_widget = QWidget()
@@ -136,13 +152,24 @@ class MainWindow(QMainWindow):
         self.stacked_widget = QStackedWidget()
         layout.addWidget(self.stacked_widget)
         self.page_link = self.create_link_page()
-        self.page_wifi = self.create_wifi_page()
-        self.page_pix = self.create_pix_page()
-        self.page_social = self.create_social_page()
         self.stacked_widget.addWidget(self.page_link)
-        self.stacked_widget.addWidget(self.page_wifi)
-        self.stacked_widget.addWidget(self.page_pix)
-        self.stacked_widget.addWidget(self.page_social)
+        # The other pages are built on first visit; empty placeholders keep
+        # the stack indexes aligned with the sidebar rows.
+        self.pending_pages = {1: ('page_wifi', self.create_wifi_page), 2: ('page_pix', self.create_pix_page), 3: ('page_social', self.create_social_page)}
+        for _ in self.pending_pages:
+            self.stacked_widget.addWidget(QWidget())
+
+    def ensure_page(self, index):
+        pending = self.pending_pages.pop(index, None)
+        if pending is None:
+            return
+        (name, factory) = pending
+        placeholder = self.stacked_widget.widget(index)
+        page = factory()
+        setattr(self, name, page)
+        self.stacked_widget.insertWidget(index, page)
+        self.stacked_widget.removeWidget(placeholder)
+        placeholder.deleteLater()
 
     def create_page_header(self, title):
         label = QLabel(title)
@@ -185,6 +212,7 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.create_page_header(f'<html><head/><body><p><span style="color:#ffffff;">Gerar</span><span style="color:#bd93f9;"> Link / URL</span></p></body></html>'))
         self.link_input = QLineEdit()
         self.link_input.setPlaceholderText('https://seu-site.com')
+        self.link_input.textChanged.connect(self.auto_generate)
         layout.addWidget(QLabel('URL do Site'))
         layout.addWidget(self.link_input)
         layout.addStretch()
@@ -305,6 +333,8 @@ class MainWindow(QMainWindow):
         self.qr_label.leftClicked.connect(self.open_qr_link)
         self.qr_label.actionRequested.connect(self.handle_preview_action)
         layout.addWidget(self.qr_label, alignment=Qt.AlignmentFlag.AlignCenter)
+        self.metrics_overlay = MetricsOverlay(self.qr_label)
+        QShortcut(QKeySequence('Ctrl+Shift+M'), self, activated=self.metrics_overlay.toggle)
 
         def make_header(text):
             lbl = QLabel(text)
@@ -379,8 +409,11 @@ class MainWindow(QMainWindow):
         layout.addStretch(1)
 
     def change_page(self, index):
+        self.ensure_page(index)
         self.stacked_widget.setCurrentIndex(index)
         self.current_qr_image = None
+        self.current_preview = None
+        self.current_request = None
         self.qr_label.clear()
         self.qr_label.setText('')
         if index != 3:
@@ -411,6 +444,7 @@ class MainWindow(QMainWindow):
                 self.logo_preview_sidebar.setStyleSheet(f'border: 2px dashed {DraculaTheme.COMMENT}; border-radius: 8px; color: {DraculaTheme.COMMENT}; font-size: 14px; padding: 10px; font-weight: bold;')
 
     def detect_wifi(self):
+        from core.utils import get_wifi_ssid_linux
         ssid = get_wifi_ssid_linux()
         if ssid:
             self.wifi_ssid.setText(ssid)
@@ -495,32 +529,7 @@ class MainWindow(QMainWindow):
             value = self.social_input.text().strip()
             if not value:
                 return None
-            platform_key = platform.lower().replace('-', '')
-            if 'email' in platform_key:
-                return SocialPayload.email(value)
-            elif 'whatsapp' in platform_key:
-                return SocialPayload.whatsapp(value)
-            elif 'instagram' in platform_key:
-                return SocialPayload.instagram(value)
-            elif 'twitter' in platform_key or 'x' == platform_key:
-                return SocialPayload.twitter(value)
-            elif 'facebook' in platform_key:
-                return SocialPayload.facebook(value)
-            elif 'linkedin' in platform_key:
-                return SocialPayload.linkedin(value)
-            elif 'github' in platform_key:
-                return SocialPayload.github(value)
-            elif 'youtube' in platform_key:
-                return SocialPayload.youtube(value)
-            elif 'discord' in platform_key:
-                return SocialPayload.discord(value)
-            elif 'telegram' in platform_key:
-                return SocialPayload.telegram(value)
-            elif 'steam' in platform_key:
-                return SocialPayload.steam(value)
-            elif 'pinterest' in platform_key:
-                return SocialPayload.pinterest(value)
-            return value
+            return SocialPayload.for_platform(platform, value)
         return None
 
     def auto_generate(self):
@@ -535,37 +544,45 @@ class MainWindow(QMainWindow):
                 current_page = self.stacked_widget.currentWidget()
                 self.toast.show_message('Preencha os campos obrigatórios!', target_widget=self.content_container)
             return
-        ec = 'H'
-        if hasattr(self, 'worker') and self.worker.isRunning():
-            self.worker.quit()
-            self.worker.wait()
-        logo_img = self.load_logo_to_pil(self.logo_path)
-        self.worker = QRWorker(request_id=req_id, data=data, ec=ec, size=15, rounded=True, logo_img=logo_img, logo_size=15, logo_opacity=self.logo_opacity_slider.value(), logo_pos=self.logo_pos_selector.current_pos, fill_color=self.fg_color, back_color=self.bg_color)
-        self.worker.finished.connect(self.on_generation_finished)
-        self.worker.error.connect(self.on_generation_error)
-        self.worker.start()
-
-    def load_logo_to_pil(self, path):
+        from core.ec_policy import AUTO, resolve_error_correction
+        from core.render import RenderJob
+        from core.worker import RenderRequest
+        logo_img = self.load_logo_asset(self.logo_path)
+        job = RenderJob(data=data, error_correction=AUTO, box_size=10, border=4, fill_color=self.fg_color, back_color=self.bg_color, rounded_modules=True, logo_size=15, logo_opacity=self.logo_opacity_slider.value(), logo_position=self.logo_pos_selector.current_pos, logo_border=40)
+        try:
+            (job, _) = resolve_error_correction(job, logo_img)
+        except Exception as e:
+            # Data too long for any level; the worker reports it at level H.
+            logger.debug('Automatic error correction failed: %s', e)
+            job = replace(job, error_correction='H')
+        self.latest_request = RenderRequest(req_id, job, logo_img, preview_px=min(self.qr_label.width(), self.qr_label.height()))
+        self.ensure_scheduler().submit(self.latest_request, immediate=manual)
+
+    def load_logo_asset(self, path):
         if not path or not os.path.exists(path):
             return None
+        from core.logo_cache import logo_cache
+        if path.lower().endswith('.svg'):
+            return logo_cache.load(path, raster_size=SVG_RASTER_SIZE, loader=self.rasterize_svg)
+        return logo_cache.load(path)
+
+    def rasterize_svg(self, path):
         try:
-            if path.lower().endswith('.svg'):
-                icon = QIcon(path)
-                pixmap = icon.pixmap(1000, 1000)
-                if pixmap.isNull():
-                    return None
-                qimg = pixmap.toImage()
-                qimg = qimg.convertToFormat(QImage.Format.Format_RGBA8888)
-                width = qimg.width()
-                height = qimg.height()
-                ptr = qimg.bits()
-                ptr.setsize(height * width * 4)
-                arr = ptr.asstring()
-                return Image.frombytes('RGBA', (width, height), arr)
-            else:
-                return Image.open(path).convert('RGBA')
+            icon = QIcon(path)
+            pixmap = icon.pixmap(SVG_RASTER_SIZE, SVG_RASTER_SIZE)
+            if pixmap.isNull():
+                return None
+            qimg = pixmap.toImage()
+            qimg = qimg.convertToFormat(QImage.Format.Format_RGBA8888)
+            width = qimg.width()
+            height = qimg.height()
+            ptr = qimg.bits()
+            ptr.setsize(height * width * 4)
+            arr = ptr.asstring()
+            from PIL import Image
+            return Image.frombytes('RGBA', (width, height), arr)
         except Exception as e:
-            logger.error(f'Error loading logo in UI: {e}', exc_info=True)
+            logger.error('Error loading logo in UI: %s', e, exc_info=True)
             return None
 
     def handle_preview_action(self, action):
@@ -578,11 +595,25 @@ class MainWindow(QMainWindow):
         elif action == 'print':
             self.print_qr()
 
+    def full_resolution_image(self):
+        # The worker only renders at preview size; save, copy and print get
+        # the full-size image on demand, usually straight from render_cache.
+        if self.current_qr_image is None and self.current_request is not None:
+            request = self.current_request
+            if request.job is None:
+                self.current_qr_image = self.current_preview
+            else:
+                from core.cache import render_cache
+                from core.render import render_job
+                self.current_qr_image = render_job(request.job, logo=request.logo_img, cache=render_cache)
+        return self.current_qr_image
+
     def save_qr(self):
-        if not self.current_qr_image:
+        if self.current_request is None:
             self.toast.show_message('Nenhum QR Code para salvar!')
             return
-        from PyQt6.QtWidgets import QFileDialog, QMessageBox, QDialog, QHBoxLayout
+        from PyQt6.QtWidgets import QFileDialog, QDialog, QHBoxLayout
+        from core.vector import VECTOR_EXTENSIONS, export_vector
         filters = 'Todos os Arquivos (*);;Imagens PNG (*.png);;Imagens JPG (*.jpg);;Imagens JPEG (*.jpeg);;Documento PDF (*.pdf);;Vetor SVG (*.svg)'
         (file_path, selected_filter) = QFileDialog.getSaveFileName(self, 'Salvar QR Code', 'qrcode', filters)
         if file_path:
@@ -597,13 +628,15 @@ class MainWindow(QMainWindow):
                     elif not current_ext or current_ext.lower() != expected_ext:
                         file_path = root + expected_ext
             try:
-                if file_path.lower().endswith('.pdf'):
-                    self.current_qr_image.save(file_path, 'PDF', resolution=100.0)
+                if file_path.lower().endswith(VECTOR_EXTENSIONS) and self.current_request is not None:
+                    export_vector(self.current_request.job, file_path, logo=self.current_request.logo_img)
+                elif file_path.lower().endswith('.pdf'):
+                    self.full_resolution_image().save(file_path, 'PDF', resolution=100.0)
                 else:
-                    self.current_qr_image.save(file_path)
+                    self.full_resolution_image().save(file_path)
                 self.show_save_success_popup(file_path)
             except Exception as e:
-                logger.error(f'Error saving image: {e}', exc_info=True)
+                logger.error('Error saving image: %s', e, exc_info=True)
                 self.toast.show_message(f'Erro ao salvar: {e}')
 
     def show_save_success_popup(self, file_path):
@@ -651,23 +684,28 @@ class MainWindow(QMainWindow):
             QDesktopServices.openUrl(QUrl(data))
 
     def print_qr(self):
-        if not self.current_qr_image:
+        if self.current_request is None:
             self.toast.show_message('Nenhum QR Code para imprimir!')
             return
+        from PyQt6.QtPrintSupport import QPrinter, QPrintDialog
+        from core.qt_image import to_qimage
         printer = QPrinter(QPrinter.PrinterMode.HighResolution)
         dialog = QPrintDialog(printer, self)
         if dialog.exec() == QPrintDialog.DialogCode.Accepted:
             painter = QPainter(printer)
             rect = painter.viewport()
-            size = self.current_qr_image.size()
+            image = to_qimage(self.full_resolution_image())
+            size = image.size()
             size.scale(rect.size(), Qt.AspectRatioMode.KeepAspectRatio)
             painter.setViewport(rect.x(), rect.y(), size.width(), size.height())
-            painter.setWindow(self.current_qr_image.rect())
-            painter.drawPixmap(0, 0, self.current_qr_image)
+            painter.setWindow(image.rect())
+            painter.drawImage(0, 0, image)
             painter.end()
 
     def clear_qr(self):
         self.current_qr_image = None
+        self.current_preview = None
+        self.current_request = None
         self.qr_label.clear()
         self.qr_label.original_pixmap = None
         self.clear_logo()
@@ -680,16 +718,25 @@ class MainWindow(QMainWindow):
     def on_generation_finished(self, img, req_id):
         if req_id != self.request_id_counter:
             return
-        self.current_qr_image = img
-        qpixmap = pil_to_qpixmap(img)
+        self.current_qr_image = None
+        self.current_preview = img
+        self.current_request = self.latest_request
+        from core.qt_image import to_qpixmap
+        qpixmap = to_qpixmap(img)
         self.qr_label.setPixmap(qpixmap)
 
+    def closeEvent(self, event):
+        if self.scheduler is not None:
+            self.scheduler.shutdown()
+        super().closeEvent(event)
+
     def on_generation_error(self, error_msg):
         self.toast.show_message(f'Erro: {error_msg}')
 
     def copy_to_clipboard(self):
-        if self.current_qr_image:
-            copy_to_clipboard(self.current_qr_image)
+        if self.current_request is not None:
+            from core.utils import copy_to_clipboard
+            copy_to_clipboard(self.full_resolution_image())
             self.toast.show_message('Copiado para a área de transferência!', target_widget=self.generate_btn)
         else:
             self.toast.show_message('Nenhum QR Code gerado!', target_widget=self.generate_btn)
\ No newline at end of file